@@ -0,0 +1,107 @@
+"""
+反復領域に対する gist と冗長制約の除去で、合法性判定がどれだけ速くなるかを測ります。
+
+`workloads.generate_suite` の各カーネルについて、メモリベースのフロー依存と元の
+スケジュールを `compact_relation` で反復領域に対して縮め、表現の大きさ（基本集合の数と
+制約の数）と `validate_schedule_legality` の所要時間を縮約前後で比較して JSON に
+書き出します。縮約後の判定には同じ反復領域を `context` として渡します。
+
+    uv run python benchmarks/bench_compaction.py --sizes 16 64 --output bench_compaction.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_SRC = _ROOT / "src"
+
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+import islpy as isl  # noqa: E402
+
+from isl_practice import level02_dependence_analysis as lvl02  # noqa: E402
+from isl_practice import workloads  # noqa: E402
+
+
+def _median_time(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def measure(workload: workloads.Workload, repeat: int) -> dict[str, object] | None:
+    """1 つのカーネルについて縮約前後の大きさと判定時間を返します。依存が無ければ None です。"""
+    dependences = lvl02.construct_flow_dependences(workload.domain, workload.reads, workload.writes)
+    if dependences is None:
+        return None
+    context = isl.UnionSet(workload.domain)
+    schedule = isl.UnionMap(workload.schedule)
+
+    start = time.perf_counter()
+    deps = lvl02.compact_relation(dependences, context)
+    theta = lvl02.compact_relation(schedule, context)
+    compaction_s = time.perf_counter() - start
+
+    verdict = lvl02.validate_schedule_legality(dependences, schedule)
+    if lvl02.validate_schedule_legality(deps.result, theta.result, context=context) != verdict:
+        raise RuntimeError(f"{workload.label}: 縮約後の判定が一致しません")
+
+    before = _median_time(lambda: lvl02.validate_schedule_legality(dependences, schedule), repeat)
+    after = _median_time(
+        lambda: lvl02.validate_schedule_legality(deps.result, theta.result, context=context), repeat
+    )
+    return {
+        "dependences": {"before": asdict(deps.before), "after": asdict(deps.after), "steps": deps.steps},
+        "schedule": {"before": asdict(theta.before), "after": asdict(theta.after), "steps": theta.steps},
+        "compaction_s": compaction_s,
+        "legality_before_s": before,
+        "legality_after_s": after,
+        "speedup": before / after,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args(argv)
+
+    report: dict[str, object] = {
+        "meta": {
+            "python": platform.python_version(),
+            "islpy": isl.VERSION_TEXT,
+            "machine": platform.machine(),
+        },
+        "kernels": {},
+    }
+    for workload in workloads.generate_suite(sizes=args.sizes):
+        result = measure(workload, args.repeat)
+        if result is None:
+            continue
+        report["kernels"][workload.label] = result
+        deps = result["dependences"]
+        print(
+            f"{workload.label:<60} constraints {deps['before']['constraints']:>4} -> "
+            f"{deps['after']['constraints']:<4} legality x{result['speedup']:.2f}"
+        )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
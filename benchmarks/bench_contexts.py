@@ -0,0 +1,110 @@
+"""
+複数のカーネルを同時に解析したときの、バックエンドごとのスケーリングを測ります。
+
+`workloads.generate_suite` の各カーネルについて、値ベースの依存解析と元の
+スケジュールの合法性判定を行うジョブを、直列・スレッド（ワーカーごとに専用の
+isl コンテキストを持つ `ContextThreadPool`）・プロセスプールで実行し、
+ワーカー数ごとの所要時間と直列に対する速度比を JSON に書き出します。
+
+スレッドでの速度向上は、使っている islpy のビルドが isl の呼び出し中に GIL を
+解放するかどうかに依存します。解放しない場合でも、スレッドバックエンドは
+プロセス間の直列化と起動のコストを払わずに安全に実行できます。
+
+    uv run python benchmarks/bench_contexts.py --workers 1 2 4 --output bench_contexts.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import statistics
+import sys
+import time
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_SRC = _ROOT / "src"
+
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+import islpy as isl  # noqa: E402
+
+from isl_practice import level02_dependence_analysis as lvl02  # noqa: E402
+from isl_practice import workloads  # noqa: E402
+from isl_practice.parallel import run_batch  # noqa: E402
+
+
+def analyze_kernel(domain: str, reads: str, writes: str, schedule: str) -> tuple[str, bool | None]:
+    """ジョブ: 依存を求めて元のスケジュールの合法性を判定し、文字列で返します。"""
+    dataflow = lvl02.compute_dataflow_dependences(domain, reads, writes, schedule)
+    if dataflow is None:
+        return "{ }", None
+    deps = dataflow.union().coalesce()
+    return str(deps), lvl02.validate_schedule_legality(deps, schedule)
+
+
+def _run(backend: str, kernels: list[workloads.Workload], workers: int) -> list[tuple[str, bool | None]]:
+    return run_batch(
+        analyze_kernel,
+        [w.domain for w in kernels],
+        [w.reads for w in kernels],
+        [w.writes for w in kernels],
+        [w.schedule for w in kernels],
+        backend=backend,
+        max_workers=workers,
+    )
+
+
+def _median_time(backend: str, kernels: list[workloads.Workload], workers: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(backend, kernels, workers)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--copies", type=int, default=4, help="カーネル群を何回複製して投入するか")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args(argv)
+
+    kernels = list(workloads.generate_suite(sizes=args.sizes)) * args.copies
+    expected = _run("serial", kernels, 1)
+    serial = _median_time("serial", kernels, 1, args.repeat)
+
+    report: dict[str, object] = {
+        "meta": {
+            "python": platform.python_version(),
+            "islpy": isl.VERSION_TEXT,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "kernels": len(kernels),
+        },
+        "serial_s": serial,
+        "thread": {},
+        "process": {},
+    }
+    print(f"{'serial':<8} {'':>3}  {serial * 1e3:9.1f} ms")
+    for backend in ("thread", "process"):
+        for workers in args.workers:
+            if _run(backend, kernels, workers) != expected:
+                raise RuntimeError(f"{backend} の結果が直列実行と一致しません")
+            elapsed = _median_time(backend, kernels, workers, args.repeat)
+            report[backend][str(workers)] = {"median_s": elapsed, "speedup": serial / elapsed}
+            print(f"{backend:<8} {workers:>3}  {elapsed * 1e3:9.1f} ms  (x{serial / elapsed:.2f})")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+Level 01–03 の公開関数を生成ワークロードで計測するベンチマークです。
+
+`src/isl_practice/workloads.py` の GEMM・2D 畳み込み・Jacobi・パイプラインを
+問題サイズごとに生成し、各関数の実行時間（中央値・最小値）を JSON に書き出します。
+パースキャッシュは各試行の前に空にするため、中央値はキャッシュのヒットではなく
+1 回の呼び出し全体（呼び出し内での再利用は含む）の時間になります。Level 03 の
+タイル化などの入力は、演習の骨組みに頼らず `schedule_tree.schedule_from_map` で作ります。
+`--baseline` に以前の JSON を渡すと、閾値を超えて遅くなった項目を回帰として
+報告し、終了コード 1 を返します。
+
+    uv run python benchmarks/bench_levels.py --output bench.json
+    uv run python benchmarks/bench_levels.py --baseline bench.json --threshold 1.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_SRC = _ROOT / "src"
+
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+import islpy as isl  # noqa: E402
+
+from isl_practice import level01_iteration_sets as lvl01  # noqa: E402
+from isl_practice import level02_dependence_analysis as lvl02  # noqa: E402
+from isl_practice import level03_scheduling as lvl03  # noqa: E402
+from isl_practice import parse_cache, workloads  # noqa: E402
+from isl_practice.schedule_tree import schedule_from_map  # noqa: E402
+
+
+def _time_call(func: Callable[[], object], repeat: int) -> dict[str, object]:
+    """`func` を `repeat` 回実行し、計測結果を辞書で返します。各試行の前にパースキャッシュを空にします。"""
+    samples = []
+    for _ in range(repeat):
+        parse_cache.get_parse_cache().clear()
+        start = time.perf_counter()
+        try:
+            func()
+        except NotImplementedError:
+            return {"status": "not_implemented"}
+        samples.append(time.perf_counter() - start)
+    return {
+        "status": "ok",
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "repeat": repeat,
+    }
+
+
+def _first_self_dependence(deps: isl.UnionMap | None) -> isl.Map | None:
+    """ヘルパー: `compute_min_distance_vector` に渡せる同一空間の依存写像を探します。"""
+    if deps is None:
+        return None
+    maps: list[isl.Map] = []
+    deps.foreach_map(maps.append)
+    for dep in maps:
+        space = dep.get_space()
+        if space.domain().is_equal(space.range()):
+            return dep
+    return None
+
+
+def _cases(workload: workloads.Workload) -> dict[str, Callable[[], object]]:
+    """ワークロードに対して計測する関数呼び出しを列挙します。"""
+    primary = isl.Set(workload.primary_domain)
+    first_dim = primary.get_dim_name(isl.dim_type.set, 0)
+    last_dim = primary.get_dim_name(isl.dim_type.set, primary.dim(isl.dim_type.set) - 1)
+    half_space = f"{{ [{', '.join(primary.get_var_names(isl.dim_type.set))}] : {first_dim} >= 1 }}"
+
+    deps = lvl02.construct_flow_dependences(
+        workload.domain, workload.reads, workload.writes
+    )
+    self_dep = _first_self_dependence(deps)
+    mapped = schedule_from_map(workload.domain, workload.schedule)
+    n_members = mapped.get_root().get_child(0).band_n_member()
+    statements: list[isl.Set] = []
+    isl.UnionSet(workload.domain).foreach_set(statements.append)
+    filters = tuple(str(statement) for statement in statements)
+    innermost = {statement.get_tuple_name(): [(0, n_members - 1)] for statement in statements}
+
+    cases: dict[str, Callable[[], object]] = {
+        "level01.canonical_intersection": lambda: lvl01.canonical_intersection(
+            workload.primary_domain, half_space
+        ),
+        "level01.eliminate_dim": lambda: lvl01.eliminate_dim(
+            workload.primary_domain, last_dim
+        ),
+        "level01.find_lexmin_point": lambda: lvl01.find_lexmin_point(
+            workload.primary_domain
+        ),
+        "level02.construct_flow_dependences": lambda: lvl02.construct_flow_dependences(
+            workload.domain, workload.reads, workload.writes
+        ),
+    }
+    if deps is not None:
+        cases["level02.simplify_dependence_domain"] = (
+            lambda: lvl02.simplify_dependence_domain(deps)
+        )
+        cases["level02.validate_schedule_legality"] = (
+            lambda: lvl02.validate_schedule_legality(deps, workload.schedule)
+        )
+    if self_dep is not None:
+        cases["level02.compute_min_distance_vector"] = (
+            lambda: lvl02.compute_min_distance_vector(self_dep)
+        )
+    cases["level03.build_multiband_schedule"] = lambda: lvl03.build_multiband_schedule(
+        workload.domain, workload.schedule, split_at=1
+    )
+    cases["level03.arrange_filters_with_strategy"] = lambda: lvl03.arrange_filters_with_strategy(
+        workload.domain,
+        workload.schedule,
+        filters=(workload.domain,),
+        mode="fusion",
+    )
+    cases["level03.apply_band_tiling"] = lambda: lvl03.apply_band_tiling(
+        mapped, (0,), (32,) * n_members
+    )
+    cases["level03.plan_filter_fusion"] = lambda: lvl03.plan_filter_fusion(
+        workload.domain, workload.schedule, filters, workload.reads, workload.writes
+    )
+    cases["level03.collect_vectorization_candidates"] = (
+        lambda: lvl03.collect_vectorization_candidates(mapped)
+    )
+    cases["level03.rank_vectorization_candidates"] = lambda: lvl03.rank_vectorization_candidates(
+        mapped, innermost, workload.reads, workload.writes
+    )
+    return cases
+
+
+def run_suite(
+    sizes: tuple[int, ...],
+    statement_counts: tuple[int, ...],
+    repeat: int,
+    use_parse_cache: bool,
+) -> dict[str, object]:
+    """全ワークロード × 全関数を計測し、JSON 化できる辞書を返します。"""
+    parse_cache.set_parse_cache_enabled(use_parse_cache)
+    results = []
+    for workload in workloads.generate_suite(sizes, statement_counts):
+        for function, call in _cases(workload).items():
+            record = {"workload": workload.label, "function": function}
+            record.update(_time_call(call, repeat))
+            results.append(record)
+            print(f"{workload.label:<60} {function:<45} {_format(record)}", file=sys.stderr)
+    return {
+        "meta": {
+            "islpy": isl.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "parse_cache": use_parse_cache,
+        },
+        "results": results,
+    }
+
+
+def _format(record: dict[str, object]) -> str:
+    if record["status"] != "ok":
+        return str(record["status"])
+    return f"{record['median_s'] * 1e3:10.3f} ms"
+
+
+def compare_with_baseline(
+    current: dict[str, object],
+    baseline: dict[str, object],
+    threshold: float,
+) -> list[dict[str, object]]:
+    """
+    中央値が `baseline` の `threshold` 倍を超えた項目を回帰として返します。
+
+    どちらかが計測できなかった項目は比較しません。
+    """
+    previous = {
+        (r["workload"], r["function"]): r
+        for r in baseline["results"]
+        if r.get("status") == "ok"
+    }
+    regressions = []
+    for record in current["results"]:
+        old = previous.get((record["workload"], record["function"]))
+        if old is None or record.get("status") != "ok":
+            continue
+        ratio = record["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        if ratio > threshold:
+            regressions.append(
+                {
+                    "workload": record["workload"],
+                    "function": record["function"],
+                    "baseline_s": old["median_s"],
+                    "current_s": record["median_s"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--statements", type=int, nargs="+", default=[2, 8, 32])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-parse-cache", action="store_true")
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--baseline", type=pathlib.Path)
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        tuple(args.sizes),
+        tuple(args.statements),
+        args.repeat,
+        use_parse_cache=not args.no_parse_cache,
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.baseline is None:
+        return 0
+    regressions = compare_with_baseline(
+        report, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for item in regressions:
+        print(
+            f"REGRESSION {item['workload']} {item['function']}: "
+            f"{item['baseline_s'] * 1e3:.3f} ms -> {item['current_s'] * 1e3:.3f} ms "
+            f"(x{item['ratio']:.2f})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+常駐解析サーバーと、呼び出しごとに Python を起動する方式のレイテンシを比べます。
+
+「コールド」は 1 リクエストごとに新しい Python プロセスで islpy を import して
+`operations.execute` を 1 回呼ぶ方式、「ウォーム」は起動済みのサーバーへ Unix
+ソケット（または標準入出力）経由で同じリクエストを送る方式です。各方式について
+往復時間の中央値・p90・最小値を JSON に書き出します。
+
+    uv run python benchmarks/bench_server.py --output bench_server.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_SRC = _ROOT / "src"
+
+if str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
+
+from isl_practice.client import AnalysisClient  # noqa: E402
+
+_REQUESTS: list[tuple[str, list[object]]] = [
+    (
+        "level01.canonical_intersection",
+        ["{ [i, j] : 0 <= i < 64 and 0 <= j < 64 }", "{ [i, j] : i <= j }"],
+    ),
+    (
+        "level02.construct_flow_dependences",
+        [
+            "{ S[i, j] : 0 <= i < 64 and 0 <= j < 64 }",
+            "{ S[i, j] -> A[i, j - 1] : j >= 1 }",
+            "{ S[i, j] -> A[i, j] }",
+        ],
+    ),
+]
+
+_COLD_SNIPPET = """\
+import json, sys
+sys.path.insert(0, {src!r})
+from isl_practice import operations
+op, args = json.loads(sys.argv[1])
+print(json.dumps(operations.execute(op, args)))
+"""
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "median_s": statistics.median(ordered),
+        "p90_s": ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))],
+        "min_s": ordered[0],
+        "repeat": len(ordered),
+    }
+
+
+def _measure(call: Callable[[str, list[object]], object], repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for op, args in _REQUESTS:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call(op, args)
+            samples.append(time.perf_counter() - start)
+        results[op] = _summary(samples)
+    return results
+
+
+def measure_cold(repeat: int) -> dict[str, dict[str, float]]:
+    """1 リクエストごとに Python を起動して処理する場合のレイテンシを測ります。"""
+    snippet = _COLD_SNIPPET.format(src=str(_SRC))
+
+    def call(op: str, args: list[object]) -> object:
+        completed = subprocess.run(
+            [sys.executable, "-c", snippet, json.dumps([op, args])],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return json.loads(completed.stdout)
+
+    return _measure(call, repeat)
+
+
+def measure_socket(repeat: int, workers: int) -> dict[str, dict[str, float]]:
+    """Unix ソケットで待ち受けるサーバーへの往復レイテンシを測ります。"""
+    with tempfile.TemporaryDirectory(prefix="isl_server_") as tmp:
+        path = os.path.join(tmp, "isl.sock")
+        env = dict(os.environ, PYTHONPATH=str(_SRC))
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "isl_practice.server",
+                "--socket",
+                path,
+                "--workers",
+                str(workers),
+            ],
+            env=env,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while not os.path.exists(path):
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("サーバーが起動しませんでした")
+                time.sleep(0.01)
+            with AnalysisClient.connect(path) as client:
+                client.ping()
+                return _measure(lambda op, args: client.call(op, *args), repeat)
+        finally:
+            # SIGINT で止めると、サーバーはプロセスプールを閉じてから終了します。
+            process.send_signal(signal.SIGINT)
+            process.wait()
+
+
+def measure_stdio(repeat: int, workers: int) -> dict[str, dict[str, float]]:
+    """標準入出力で接続したサーバーへの往復レイテンシを測ります。"""
+    with AnalysisClient.spawn(max_workers=workers) as client:
+        client.ping()
+        return _measure(lambda op, args: client.call(op, *args), repeat)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cold-repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "workers": args.workers,
+        },
+        "cold": measure_cold(args.cold_repeat),
+        "socket": measure_socket(args.repeat, args.workers),
+        "stdio": measure_stdio(args.repeat, args.workers),
+    }
+    for op, _ in _REQUESTS:
+        cold = report["cold"][op]["median_s"]
+        line = [f"{op:<40} cold {cold * 1e3:9.3f} ms"]
+        for mode in ("socket", "stdio"):
+            warm = report[mode][op]["median_s"]
+            line.append(f"{mode} {warm * 1e3:8.3f} ms (x{cold / warm:.0f})")
+        print("  ".join(line))
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,16 @@
-def main():
-    print("Hello from isl-practice!")
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    """引数が無ければ挨拶を表示し、あれば JSONL バッチ CLI に処理を渡します。"""
+    if not argv:
+        print("Hello from isl-practice!")
+        return 0
+
+    from src.isl_practice import cli
+
+    return cli.main(argv)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main(sys.argv[1:]))
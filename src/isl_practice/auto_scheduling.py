@@ -0,0 +1,286 @@
+"""
+isl のスケジューラで自動的にスケジュールを計算し、オプションを掃引する仕組みです。
+
+Level 03 は手で書いた `schedule_map` を前提にしていますが、ここでは依存関係から
+validity / coincidence / proximity 制約を組み立て、`isl.ScheduleConstraints.compute_schedule`
+に任せます。`compute_dataflow_dependences` の結果を渡すと RAW/WAR/WAW のすべてを
+validity と coincidence に、RAW だけを proximity に使います。
+
+スケジューラのオプション（アルゴリズム、fusion 戦略、outer coincidence、SCC の
+直列化、係数の上限）は isl コンテキストごとの設定なので、1 回の計算ごとに新しい
+コンテキストを作って適用します。これによりオプションが他の計算へ漏れず、
+組み合わせをプロセスプールで並列に試せます。ワーカーとの受け渡しは文字列だけです。
+
+公開関数の `ctx` は、戻り値のスケジュールを載せる isl コンテキストです（省略時は
+`contexts.current_context()`）。計算自体は常にワーカーが作る専用のコンテキストで行います。
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Iterable, Literal, Sequence, Union
+
+import islpy as isl
+
+from .budget import run_with_budget
+from .contexts import resolve_context
+from .level02_dependence_analysis import DataflowDependences
+from .parallel import Backend, create_executor
+from .parse_cache import parse_union_set
+
+Algorithm = Literal["isl", "feautrier"]
+Fusion = Literal["incremental", "whole_component"]
+Status = Literal["ok", "budget_exceeded", "timeout", "error"]
+
+
+@dataclass(frozen=True)
+class SchedulerOptions:
+    """
+    1 回のスケジュール計算で使う isl スケジューラのオプションです。
+
+    `fusion` は `"whole_component"` のとき連結成分全体を一度にスケジュールし、
+    `"incremental"` のときは SCC を順に併合していきます。`max_coefficient` が -1 なら
+    係数に上限を設けません。
+    """
+
+    algorithm: Algorithm = "isl"
+    fusion: Fusion = "incremental"
+    outer_coincidence: bool = False
+    serialize_sccs: bool = False
+    max_coefficient: int = -1
+
+    def apply(self, ctx: isl.Context) -> None:
+        """コンテキスト `ctx` にオプションを設定します。"""
+        algorithm = (
+            isl.schedule_algorithm.FEAUTRIER
+            if self.algorithm == "feautrier"
+            else isl.schedule_algorithm.ISL
+        )
+        ctx.set_schedule_algorithm(int(algorithm))
+        ctx.set_schedule_whole_component(int(self.fusion == "whole_component"))
+        ctx.set_schedule_outer_coincidence(int(self.outer_coincidence))
+        ctx.set_schedule_serialize_sccs(int(self.serialize_sccs))
+        ctx.set_schedule_max_coefficient(self.max_coefficient)
+
+
+@dataclass(frozen=True)
+class ScheduleResult:
+    """
+    1 つのオプションの組み合わせに対する計算結果です。
+
+    `coincidence` はスケジュール木のバンドを深さ優先で並べた、各メンバーの
+    coincident フラグです。計算できなかった場合 `schedule` は None です。
+    """
+
+    options: SchedulerOptions
+    status: Status
+    schedule: isl.Schedule | None
+    coincidence: tuple[tuple[bool, ...], ...]
+    seconds: float
+
+    @property
+    def outer_parallelism(self) -> int:
+        """最外バンドの先頭から連続する coincident メンバーの数です。"""
+        if not self.coincidence:
+            return 0
+        count = 0
+        for flag in self.coincidence[0]:
+            if not flag:
+                break
+            count += 1
+        return count
+
+
+def option_grid(
+    algorithms: Sequence[Algorithm] = ("isl", "feautrier"),
+    fusions: Sequence[Fusion] = ("incremental", "whole_component"),
+    outer_coincidence: Sequence[bool] = (False, True),
+    serialize_sccs: Sequence[bool] = (False, True),
+    max_coefficients: Sequence[int] = (-1,),
+) -> list[SchedulerOptions]:
+    """各オプションの候補の直積を `SchedulerOptions` の列として返します。"""
+    return [
+        SchedulerOptions(algorithm, fusion, outer, serialize, max_coefficient)
+        for algorithm in algorithms
+        for fusion in fusions
+        for outer in outer_coincidence
+        for serialize in serialize_sccs
+        for max_coefficient in max_coefficients
+    ]
+
+
+def coincidence_profile(schedule: isl.Schedule) -> tuple[tuple[bool, ...], ...]:
+    """スケジュール木のバンドを深さ優先で辿り、各メンバーの coincident フラグを返します。"""
+    profile: list[tuple[bool, ...]] = []
+
+    def visit(node: isl.ScheduleNode) -> None:
+        if node.get_type() == isl.schedule_node_type.band:
+            profile.append(
+                tuple(bool(node.band_member_get_coincident(k)) for k in range(node.band_n_member()))
+            )
+        for child in range(node.n_children()):
+            visit(node.get_child(child))
+
+    visit(schedule.get_root())
+    return tuple(profile)
+
+
+def _schedule_worker(
+    domain: str,
+    dependences: tuple[str, str],
+    options: SchedulerOptions,
+    max_operations: int | None,
+) -> tuple[Status, str | None, float]:
+    """
+    ワーカー: 新しいコンテキストでスケジュールを計算し、`(状態, YAML 文字列, 秒数)` を返します。
+
+    `dependences` は `(validity と coincidence に使う依存, proximity に使う依存)` の
+    文字列です。プロセスプールから呼ばれるため、引数と戻り値は文字列と単純な値だけにしています。
+    """
+    ctx = isl.Context()
+    options.apply(ctx)
+    validity, proximity = (isl.UnionMap(text, context=ctx) for text in dependences)
+    constraints = (
+        isl.ScheduleConstraints.on_domain(isl.UnionSet(domain, context=ctx))
+        .set_validity(validity)
+        .set_coincidence(validity)
+        .set_proximity(proximity)
+    )
+
+    start = time.perf_counter()
+    try:
+        done, schedule = run_with_budget(constraints.compute_schedule, max_operations, ctx)
+    except isl.Error:
+        return "error", None, time.perf_counter() - start
+    seconds = time.perf_counter() - start
+    if not done or schedule is None:
+        return "budget_exceeded", None, seconds
+    return "ok", schedule.to_str(), seconds
+
+
+def _to_result(
+    options: SchedulerOptions,
+    outcome: tuple[Status, str | None, float],
+    ctx: isl.Context,
+) -> ScheduleResult:
+    status, text, seconds = outcome
+    schedule = isl.Schedule(text, context=ctx) if text is not None else None
+    return ScheduleResult(
+        options=options,
+        status=status,
+        schedule=schedule,
+        coincidence=coincidence_profile(schedule) if schedule is not None else (),
+        seconds=seconds,
+    )
+
+
+Dependences = Union[DataflowDependences, isl.UnionMap, str, None]
+
+
+def _dependences_text(dependences: Dependences, domain: str, ctx: isl.Context) -> tuple[str, str]:
+    """ヘルパー: `(validity と coincidence に使う依存, proximity に使う依存)` の文字列を返します。"""
+    if dependences is None:
+        # 依存が無い場合も、空の関係を同じ空間で渡せば制約なしで計算できます。
+        empty = str(isl.UnionMap.empty(parse_union_set(domain, ctx).get_space()))
+        return empty, empty
+    if isinstance(dependences, DataflowDependences):
+        return str(dependences.union()), str(dependences.raw)
+    return str(dependences), str(dependences)
+
+
+def compute_schedule(
+    iteration_domain: str,
+    dependences: Dependences,
+    options: SchedulerOptions = SchedulerOptions(),
+    max_operations: int | None = None,
+    ctx: isl.Context | None = None,
+) -> ScheduleResult:
+    """
+    依存関係を validity / coincidence / proximity 制約としてスケジュールを計算します。
+
+    `dependences` には `compute_dataflow_dependences` の戻り値を渡してください。RAW/WAR/WAW
+    をすべて validity に使うため、配列を上書きするカーネルでも合法なスケジュールになります。
+    `isl.UnionMap`（または文字列）を渡した場合はそのまま 3 種類の制約すべてに使うので、
+    呼び出し側がすべての種類の依存を含めておく必要があります。フロー依存だけを渡すと、
+    Jacobi のような in-place のカーネルでは WAR/WAW に違反するスケジュールが返り得ます。
+    None は依存なしとして扱います。`max_operations` を指定すると isl の演算回数で
+    計算を打ち切り、状態 `"budget_exceeded"` の結果を返します。
+    """
+    ctx = resolve_context(ctx)
+    outcome = _schedule_worker(
+        iteration_domain,
+        _dependences_text(dependences, iteration_domain, ctx),
+        options,
+        max_operations,
+    )
+    return _to_result(options, outcome, ctx)
+
+
+def sweep_scheduler_options(
+    iteration_domain: str,
+    dependences: Dependences,
+    grid: Iterable[SchedulerOptions] | None = None,
+    *,
+    backend: Backend = "process",
+    max_workers: int | None = None,
+    time_budget_s: float | None = None,
+    max_operations: int | None = None,
+    ctx: isl.Context | None = None,
+) -> list[ScheduleResult]:
+    """
+    オプションの組み合わせごとにスケジュールを計算し、`grid` と同じ順序で結果を返します。
+
+    `dependences` の扱いは `compute_schedule` と同じです。`grid` を省略すると
+    `option_grid()` の既定の組み合わせを試します。`time_budget_s` 秒を過ぎても終わらなかった組み合わせは状態 `"timeout"` になります。プールの
+    バックエンドでは、実行中のワーカーの終了を待たずに結果を返します。個々の計算を
+    確実に止めたい場合は `max_operations` を併用してください。
+    """
+    ctx = resolve_context(ctx)
+    grid = list(option_grid() if grid is None else grid)
+    deps = _dependences_text(dependences, iteration_domain, ctx)
+    deadline = None if time_budget_s is None else time.monotonic() + time_budget_s
+    outcomes: list[tuple[Status, str | None, float] | None] = [None] * len(grid)
+
+    if backend == "serial":
+        for idx, options in enumerate(grid):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            outcomes[idx] = _schedule_worker(iteration_domain, deps, options, max_operations)
+    else:
+        executor = create_executor(backend, max_workers)
+        try:
+            futures: dict[Future, int] = {
+                executor.submit(_schedule_worker, iteration_domain, deps, options, max_operations): idx
+                for idx, options in enumerate(grid)
+            }
+            pending = set(futures)
+            while pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[futures[future]] = future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return [
+        _to_result(options, outcome if outcome is not None else ("timeout", None, 0.0), ctx)
+        for options, outcome in zip(grid, outcomes)
+    ]
+
+
+def select_schedule(results: Iterable[ScheduleResult]) -> ScheduleResult | None:
+    """
+    計算できた結果のうち、最外の並列性が高く、次に coincident メンバーの総数が多く、
+    最後に計算時間が短いものを選びます。該当が無ければ None です。
+    """
+    candidates = [result for result in results if result.status == "ok"]
+    if not candidates:
+        return None
+    return min(
+        candidates,
+        key=lambda r: (-r.outer_parallelism, -sum(map(sum, r.coincidence)), r.seconds),
+    )
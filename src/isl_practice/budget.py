@@ -0,0 +1,71 @@
+"""
+isl コンテキストの演算回数上限（max_operations）を使った時間制限の補助です。
+
+isl は `isl_ctx_set_max_operations` で 1 つのコンテキスト上の演算回数に上限を
+設けられます。上限を超えた演算は失敗し、islpy では `isl.Error` として現れます。
+ここでは上限の設定と復元、および上限超過の判定をまとめます。
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+import islpy as isl
+
+from .contexts import resolve_context
+
+_R = TypeVar("_R")
+
+_QUOTA_MESSAGE = "maximal number of operations exceeded"
+
+
+def is_budget_exceeded(error: BaseException) -> bool:
+    """`error` が演算回数上限の超過によるものかを判定します。"""
+    return isinstance(error, isl.Error) and _QUOTA_MESSAGE in str(error)
+
+
+@contextmanager
+def operation_budget(
+    max_operations: int | None,
+    ctx: isl.Context | None = None,
+) -> Iterator[None]:
+    """
+    ブロック内の isl 演算回数を `max_operations` に制限します。
+
+    None を渡した場合は何もしません。`ctx` を省略すると現在のコンテキスト
+    （`contexts.current_context()`）を対象にします。ブロックを抜けると元の上限に戻し、
+    演算カウンタをリセットします。
+    """
+    if max_operations is None:
+        yield
+        return
+
+    ctx = resolve_context(ctx)
+    previous = ctx.get_max_operations()
+    ctx.set_max_operations(max_operations)
+    ctx.reset_operations()
+    try:
+        yield
+    finally:
+        ctx.set_max_operations(previous)
+        ctx.reset_operations()
+
+
+def run_with_budget(
+    func: Callable[[], _R],
+    max_operations: int | None,
+    ctx: isl.Context | None = None,
+) -> tuple[bool, _R | None]:
+    """
+    `func()` を上限付きで実行し、`(完了したか, 結果)` を返します。
+
+    上限を超えた場合は `(False, None)` を返し、それ以外の例外はそのまま送出します。
+    """
+    try:
+        with operation_budget(max_operations, ctx):
+            return True, func()
+    except isl.Error as error:
+        if not is_budget_exceeded(error):
+            raise
+        return False, None
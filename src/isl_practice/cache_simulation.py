@@ -0,0 +1,373 @@
+"""
+スケジュールが定めるメモリアクセス順を再生する、トレース駆動のキャッシュシミュレータです。
+
+コード生成やコンパイルの前に、タイル化や fusion の候補をキャッシュミス数で比べる
+ために使います。スケジュールと各アクセス（アクセス写像の基本写像 1 つ）を
+アフィン式の区分に分解し、各ステートメントの反復を
+`enumeration.enumerate_points` で NumPy 配列として列挙してから、時刻ベクトルと
+配列添字をまとめて評価します。時刻の最外次元をブロックに分けて順に処理するため、
+トレース全体をメモリに載せることはありません。
+
+アドレスは配列ごとのバウンディングボックスを行優先で線形化して求め、
+各配列の先頭はキャッシュラインに揃えます。キャッシュは書き込みも読み出しと同様に
+扱う（write-allocate）セットアソシアティブ LRU です。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterator, Mapping, Sequence
+
+import islpy as isl
+import numpy as np
+
+from .enumeration import contains_points, enumerate_points, evaluate_multi_aff
+from .parse_cache import parse_union_map
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """シミュレートするキャッシュの構成です。"""
+
+    size_bytes: int = 32 * 1024
+    line_bytes: int = 64
+    associativity: int = 8
+
+    def __post_init__(self) -> None:
+        if self.size_bytes <= 0 or self.line_bytes <= 0 or self.associativity <= 0:
+            raise ValueError("キャッシュの各パラメータは正の値で指定してください")
+        if self.size_bytes % (self.line_bytes * self.associativity):
+            raise ValueError("size_bytes は line_bytes * associativity の倍数で指定してください")
+
+    @property
+    def n_sets(self) -> int:
+        return self.size_bytes // (self.line_bytes * self.associativity)
+
+
+@dataclass(frozen=True)
+class ArrayLayout:
+    """線形アドレス空間上の配列の配置です。"""
+
+    name: str
+    lower: tuple[int, ...]
+    shape: tuple[int, ...]
+    base: int
+
+    @property
+    def strides(self) -> tuple[int, ...]:
+        """行優先の各次元のストライド（要素数）です。"""
+        strides = []
+        step = 1
+        for extent in reversed(self.shape):
+            strides.append(step)
+            step *= extent
+        return tuple(reversed(strides))
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+
+@dataclass
+class SimulationResult:
+    """配列ごとのアクセス数とミス数です。"""
+
+    accesses: dict[str, int] = field(default_factory=dict)
+    misses: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_accesses(self) -> int:
+        return sum(self.accesses.values())
+
+    @property
+    def total_misses(self) -> int:
+        return sum(self.misses.values())
+
+    @property
+    def miss_rate(self) -> float:
+        total = self.total_accesses
+        return self.total_misses / total if total else 0.0
+
+
+class SetAssociativeLRU:
+    """
+    セットアソシアティブ LRU キャッシュのモデルです。
+
+    `access` はキャッシュライン番号の列を順に処理し、各アクセスがミスしたかを返します。
+    同じセットで直前と同じラインへのアクセスは必ずヒットし LRU 順も変えないため、
+    NumPy で先に取り除き、残りだけを Python のループで処理します。
+    """
+
+    def __init__(self, config: CacheConfig):
+        self.config = config
+        self.reset()
+
+    def reset(self) -> None:
+        self._ways: list[list[int]] = [[] for _ in range(self.config.n_sets)]
+        self._mru = np.full(self.config.n_sets, -1, dtype=np.int64)
+
+    def access(self, lines: np.ndarray) -> np.ndarray:
+        n_sets = self.config.n_sets
+        sets = lines % n_sets
+
+        order = np.argsort(sets, kind="stable")
+        sorted_sets = sets[order]
+        sorted_lines = lines[order]
+        previous = np.empty_like(sorted_lines)
+        previous[1:] = sorted_lines[:-1]
+        first_in_set = np.ones(len(order), dtype=bool)
+        first_in_set[1:] = sorted_sets[1:] != sorted_sets[:-1]
+        previous[first_in_set] = self._mru[sorted_sets[first_in_set]]
+        repeat = np.empty(len(order), dtype=bool)
+        repeat[order] = sorted_lines == previous
+
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = sorted_sets[1:] != sorted_sets[:-1]
+        self._mru[sorted_sets[last]] = sorted_lines[last]
+
+        misses = np.zeros(len(lines), dtype=bool)
+        candidates = np.flatnonzero(~repeat)
+        ways = self._ways
+        associativity = self.config.associativity
+        for idx, line, set_idx in zip(
+            candidates.tolist(), lines[candidates].tolist(), sets[candidates].tolist()
+        ):
+            resident = ways[set_idx]
+            if line in resident:
+                resident.remove(line)
+            else:
+                misses[idx] = True
+                if len(resident) == associativity:
+                    del resident[0]
+            resident.append(line)
+        return misses
+
+
+def _basic_maps(relation: isl.UnionMap) -> list[isl.BasicMap]:
+    maps: list[isl.Map] = []
+    relation.foreach_map(maps.append)
+    return [basic for m in maps for basic in m.get_basic_maps()]
+
+
+def array_layouts(
+    domain: isl.UnionSet,
+    accesses: isl.UnionMap,
+    element_bytes: int = 4,
+    line_bytes: int = 64,
+) -> dict[str, ArrayLayout]:
+    """
+    反復領域で実際に触れる範囲のバウンディングボックスから配列の配置を決めます。
+
+    配置はスケジュールに依存しないため、同じ領域の候補どうしでは同じアドレスになります。
+    """
+    arrays: list[isl.Set] = []
+    accesses.intersect_domain(domain).range().foreach_set(arrays.append)
+    layouts = {}
+    base = 0
+    for array in sorted(arrays, key=lambda a: a.get_tuple_name()):
+        if array.is_empty():
+            continue
+        n_dims = array.dim(isl.dim_type.set)
+        lower = tuple(array.dim_min_val(k).to_python() for k in range(n_dims))
+        upper = tuple(array.dim_max_val(k).to_python() for k in range(n_dims))
+        layout = ArrayLayout(
+            name=array.get_tuple_name(),
+            lower=lower,
+            shape=tuple(hi - lo + 1 for lo, hi in zip(lower, upper)),
+            base=base,
+        )
+        layouts[layout.name] = layout
+        nbytes = layout.size * element_bytes
+        base += -(-nbytes // line_bytes) * line_bytes
+    return layouts
+
+
+def _pieces(relation: isl.Map) -> tuple[tuple[isl.Set, isl.MultiAff], ...]:
+    """ヘルパー: 関数である写像を (定義域, アフィン式) の区分に分解します。"""
+    if not relation.is_single_valued():
+        raise ValueError(f"関数でない写像はトレースに変換できません: {relation}")
+    pieces: list[tuple[isl.Set, isl.MultiAff]] = []
+    isl.PwMultiAff.from_map(relation).foreach_piece(lambda dom, ma: pieces.append((dom, ma)))
+    return tuple(pieces)
+
+
+@dataclass(frozen=True)
+class _Access:
+    """1 つのアクセスと、同一反復内での順位です。"""
+
+    rank: int
+    pieces: tuple[tuple[isl.Set, isl.MultiAff], ...]
+    layout: ArrayLayout
+    array_id: int
+
+
+@dataclass(frozen=True)
+class _Statement:
+    """ステートメントのスケジュールと、その反復で行うアクセスです。"""
+
+    theta: isl.Map
+    pieces: tuple[tuple[isl.Set, isl.MultiAff], ...]
+    accesses: tuple[_Access, ...]
+
+
+def _statements(
+    schedule: isl.Schedule,
+    reads: isl.UnionMap,
+    writes: isl.UnionMap,
+    layouts: Mapping[str, ArrayLayout],
+) -> list[_Statement]:
+    domain = schedule.get_domain()
+    schedule_maps: list[isl.Map] = []
+    schedule.get_map().intersect_domain(domain).foreach_map(schedule_maps.append)
+    array_ids = {name: idx for idx, name in enumerate(layouts)}
+
+    statements = []
+    for theta in schedule_maps:
+        stmt_domain = isl.UnionSet.from_set(theta.domain())
+        # 1 反復の中では読み出しをすべて終えてから書き込むものとします。
+        relations = _basic_maps(reads.intersect_domain(stmt_domain)) + _basic_maps(
+            writes.intersect_domain(stmt_domain)
+        )
+        accesses = []
+        for rank, access in enumerate(relations):
+            name = access.get_tuple_name(isl.dim_type.out)
+            if name not in layouts:
+                continue
+            accesses.append(
+                _Access(
+                    rank=rank,
+                    pieces=_pieces(isl.Map.from_basic_map(access)),
+                    layout=layouts[name],
+                    array_id=array_ids[name],
+                )
+            )
+        if accesses:
+            statements.append(_Statement(theta, _pieces(theta), tuple(accesses)))
+    return statements
+
+
+def _time_blocks(
+    statements: Sequence[_Statement], chunk_size: int
+) -> list[tuple[int, int] | None]:
+    """ヘルパー: 1 ブロックのアクセス数がおおよそ `chunk_size` 以下になる最外時刻の区間です。"""
+    if any(stmt.theta.dim(isl.dim_type.out) == 0 for stmt in statements):
+        return [None]
+    times = [stmt.theta.range() for stmt in statements]
+    t_lo = min(t.dim_min_val(0).to_python() for t in times)
+    t_hi = max(t.dim_max_val(0).to_python() for t in times)
+    total = sum(
+        stmt.theta.domain().count_val().to_python() * len(stmt.accesses) for stmt in statements
+    )
+    width = max(1, (chunk_size * (t_hi - t_lo + 1)) // max(total, 1))
+    return [(lo, min(lo + width, t_hi + 1)) for lo in range(t_lo, t_hi + 1, width)]
+
+
+def iter_address_trace(
+    schedule: isl.Schedule,
+    read_accesses: str | isl.UnionMap,
+    write_accesses: str | isl.UnionMap,
+    layouts: Mapping[str, ArrayLayout] | None = None,
+    element_bytes: int = 4,
+    line_bytes: int = 64,
+    chunk_size: int = 1 << 18,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    スケジュール順のアドレストレースを `(addresses, array_ids)` のチャンクとして返します。
+
+    `array_ids` は `layouts` の並び順での配列の添字です。時刻の最外次元を、1 ブロックの
+    アクセス数がおおよそ `chunk_size` 以下になる幅で区切り、ブロックごとに各ステートメントの
+    反復を列挙してスケジュール式とアクセス式をベクトル化して評価します。
+    アクセス写像は関数（1 反復で 1 要素）である必要があり、そうでなければ `ValueError` です。
+    """
+    reads = parse_union_map(read_accesses) if isinstance(read_accesses, str) else read_accesses
+    writes = parse_union_map(write_accesses) if isinstance(write_accesses, str) else write_accesses
+    if layouts is None:
+        layouts = array_layouts(schedule.get_domain(), reads.union(writes), element_bytes, line_bytes)
+    statements = _statements(schedule, reads, writes, layouts)
+    if not statements:
+        return
+    n_time = max(stmt.theta.dim(isl.dim_type.out) for stmt in statements)
+
+    for block in _time_blocks(statements, chunk_size):
+        keys: list[np.ndarray] = []
+        addresses: list[np.ndarray] = []
+        ids: list[np.ndarray] = []
+        for stmt in statements:
+            theta = stmt.theta
+            if block is not None:
+                ctx = theta.get_ctx()
+                theta = theta.lower_bound_val(
+                    isl.dim_type.out, 0, isl.Val.int_from_si(ctx, block[0])
+                ).upper_bound_val(isl.dim_type.out, 0, isl.Val.int_from_si(ctx, block[1] - 1))
+            block_domain = theta.domain()
+            for piece_domain, multi_aff in stmt.pieces:
+                points = enumerate_points(piece_domain.intersect(block_domain))
+                if not len(points):
+                    continue
+                time = evaluate_multi_aff(multi_aff, points)
+                for access in stmt.accesses:
+                    elements = np.zeros((len(points), len(access.layout.shape)), dtype=np.int64)
+                    valid = np.zeros(len(points), dtype=bool)
+                    for access_domain, access_aff in access.pieces:
+                        mask = contains_points(access_domain, points) & ~valid
+                        elements[mask] = evaluate_multi_aff(access_aff, points[mask])
+                        valid |= mask
+                    key = np.zeros((int(valid.sum()), n_time + 1), dtype=np.int64)
+                    key[:, : time.shape[1]] = time[valid]
+                    key[:, n_time] = access.rank
+                    offsets = (elements[valid] - np.array(access.layout.lower, dtype=np.int64)) @ (
+                        np.array(access.layout.strides, dtype=np.int64)
+                    )
+                    keys.append(key)
+                    addresses.append(access.layout.base + offsets * element_bytes)
+                    ids.append(np.full(len(key), access.array_id, dtype=np.int64))
+        if not keys:
+            continue
+        key = np.concatenate(keys)
+        order = np.lexsort(key.T[::-1])
+        yield np.concatenate(addresses)[order], np.concatenate(ids)[order]
+
+
+def simulate_schedule(
+    schedule: isl.Schedule,
+    read_accesses: str | isl.UnionMap,
+    write_accesses: str | isl.UnionMap,
+    cache: CacheConfig = CacheConfig(),
+    element_bytes: int = 4,
+    chunk_size: int = 1 << 18,
+) -> SimulationResult:
+    """スケジュール順のアクセスをキャッシュモデルに流し、配列ごとのミス数を返します。"""
+    reads = parse_union_map(read_accesses) if isinstance(read_accesses, str) else read_accesses
+    writes = parse_union_map(write_accesses) if isinstance(write_accesses, str) else write_accesses
+    layouts = array_layouts(schedule.get_domain(), reads.union(writes), element_bytes, cache.line_bytes)
+    names = list(layouts)
+    accesses = np.zeros(len(names), dtype=np.int64)
+    misses = np.zeros(len(names), dtype=np.int64)
+
+    model = SetAssociativeLRU(cache)
+    for addresses, ids in iter_address_trace(
+        schedule, reads, writes, layouts, element_bytes, cache.line_bytes, chunk_size
+    ):
+        missed = model.access(addresses // cache.line_bytes)
+        accesses += np.bincount(ids, minlength=len(names))
+        misses += np.bincount(ids[missed], minlength=len(names))
+
+    return SimulationResult(
+        accesses={name: int(count) for name, count in zip(names, accesses)},
+        misses={name: int(count) for name, count in zip(names, misses)},
+    )
+
+
+def rank_schedules(
+    variants: Mapping[str, isl.Schedule],
+    read_accesses: str | isl.UnionMap,
+    write_accesses: str | isl.UnionMap,
+    cache: CacheConfig = CacheConfig(),
+    element_bytes: int = 4,
+) -> list[tuple[str, SimulationResult]]:
+    """名前付きのスケジュール群をシミュレートし、総ミス数の少ない順に並べて返します。"""
+    results = [
+        (name, simulate_schedule(schedule, read_accesses, write_accesses, cache, element_bytes))
+        for name, schedule in variants.items()
+    ]
+    return sorted(results, key=lambda item: item[1].total_misses)
@@ -0,0 +1,218 @@
+"""
+JSONL のジョブを読み、解析結果を JSONL で書き出すバッチ用のコマンドラインツールです。
+
+1 行に 1 つのジョブを書きます。`op` には `operations.REGISTRY` の名前
+（例: `"level01.canonical_intersection"`）か、下の短い別名を指定します。
+
+    {"id": "k0", "op": "intersection", "args": ["{ [i] : i >= 0 }", "{ [i] : i < 8 }"]}
+    {"id": "k1", "op": "flow_dependences", "args": ["{ S[i] : 0 <= i < 8 }", "...", "..."]}
+
+各ジョブの結果は `{"id": ..., "ok": true, "result": ...}`、失敗時は
+`{"id": ..., "ok": false, "error": {"type": ..., "message": ...}}` として 1 行ずつ
+書き出します。`id` を省略した場合は入力の行番号（1 始まり）を使います。
+
+入力は 1 行ずつ読み、処理中のジョブ数を `--max-in-flight` 以下に保つため、
+入力が大きくてもメモリ使用量は一定です。islpy と各レベルのモジュールはジョブを
+実行する時点で初めて import するため、`--help` や引数の検査はすぐに終わります。
+
+    python -m src.isl_practice.cli jobs.jsonl --workers 8 -o results.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from typing import IO, Any, Iterable, Iterator
+
+ALIASES: dict[str, str] = {
+    "intersection": "level01.canonical_intersection",
+    "eliminate": "level01.eliminate_dim",
+    "lexmin": "level01.find_lexmin_point",
+    "flow_dependences": "level02.construct_flow_dependences",
+    "dataflow": "level02.compute_dataflow_dependences",
+    "simplify": "level02.simplify_dependence_domain",
+    "distance": "level02.compute_min_distance_vector",
+    "legality": "level02.validate_schedule_legality",
+    "multiband": "level03.build_multiband_schedule",
+    "tiling": "level03.apply_band_tiling",
+    "filters": "level03.arrange_filters_with_strategy",
+    "vectorization": "level03.collect_vectorization_candidates",
+}
+
+_LEVEL_PREFIXES = ("level01.", "level02.", "level03.")
+
+
+class InvalidJob(ValueError):
+    """ジョブの形式が正しくない場合の例外です。`job_id` は結果レコードに載せる ID です。"""
+
+    def __init__(self, message: str, job_id: object):
+        super().__init__(message)
+        self.job_id = job_id
+
+
+def _error(job_id: object, error_type: str, message: str) -> dict[str, Any]:
+    return {"id": job_id, "ok": False, "error": {"type": error_type, "message": message}}
+
+
+def parse_job(line: str, line_number: int) -> dict[str, Any]:
+    """
+    1 行の JSON をジョブに変換します。isl を import せずに形式だけを検査します。
+
+    `op` は別名を解決した正式名に置き換えます。形式が正しくなければ `InvalidJob` です。
+    """
+    try:
+        job = json.loads(line)
+    except json.JSONDecodeError as error:
+        raise InvalidJob(f"{line_number} 行目が JSON ではありません: {error}", line_number) from None
+    if not isinstance(job, dict):
+        raise InvalidJob(f"{line_number} 行目はオブジェクトで指定してください", line_number)
+    job_id = job.get("id", line_number)
+    op = job.get("op")
+    if not isinstance(op, str):
+        raise InvalidJob(f"{line_number} 行目に op がありません", job_id)
+    op = ALIASES.get(op, op)
+    if not op.startswith(_LEVEL_PREFIXES):
+        raise InvalidJob(f"{line_number} 行目の op が不明です: {job['op']}", job_id)
+    args = job.get("args", [])
+    kwargs = job.get("kwargs", {})
+    if not isinstance(args, list) or not isinstance(kwargs, dict):
+        raise InvalidJob(
+            f"{line_number} 行目の args はリスト、kwargs はオブジェクトで指定してください", job_id
+        )
+    return {"id": job_id, "op": op, "args": args, "kwargs": kwargs}
+
+
+def run_job(job: dict[str, Any]) -> dict[str, Any]:
+    """ワーカー: ジョブを実行して結果レコードを返します。ここで初めて isl を import します。"""
+    from . import operations
+
+    try:
+        result = operations.execute(job["op"], job["args"], job["kwargs"])
+    except Exception as error:  # noqa: BLE001 - 失敗はレコードとして返す
+        return _error(job["id"], type(error).__name__, str(error))
+    return {"id": job["id"], "ok": True, "result": result}
+
+
+def _jobs(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """入力行をジョブ、または検査に失敗したことを表す結果レコードに変換します。"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_job(line, line_number)
+        except InvalidJob as error:
+            yield _error(error.job_id, "InvalidJob", str(error))
+
+
+def iter_results(
+    lines: Iterable[str],
+    workers: int | None = None,
+    max_in_flight: int | None = None,
+    ordered: bool = True,
+) -> Iterator[dict[str, Any]]:
+    """
+    ジョブを順に実行し、結果レコードを生成します。
+
+    `workers` を指定するとプロセスプールで実行し、処理中のジョブを
+    `max_in_flight`（既定は `4 * workers`）件までに制限します。`ordered` が True の
+    ときは、検査に失敗した行の結果レコードも含めて、先頭のジョブの完了を待っている
+    未出力のレコードを `max_in_flight` 件までに制限します。`ordered` が False なら
+    完了した順に結果を返します。
+    """
+    if workers is None:
+        for job in _jobs(lines):
+            yield job if "ok" in job else run_job(job)
+        return
+
+    limit = max_in_flight or 4 * workers
+    # ordered のときは入力順のキュー、そうでなければ未回収の Future の集合で管理します。
+    # キューには実行中の Future だけでなく検査エラーのレコードも並ぶため、上限は
+    # キューの長さで判定します。
+    queue: collections.deque[Future[dict[str, Any]] | dict[str, Any]] = collections.deque()
+    pending: set[Future[dict[str, Any]]] = set()
+
+    def take(item: Future[dict[str, Any]] | dict[str, Any]) -> dict[str, Any]:
+        if isinstance(item, Future):
+            pending.discard(item)
+            return item.result()
+        return item
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for job in _jobs(lines):
+            item = job if "ok" in job else executor.submit(run_job, job)
+            if isinstance(item, Future):
+                pending.add(item)
+            if ordered:
+                queue.append(item)
+                while queue and (
+                    not isinstance(queue[0], Future) or queue[0].done() or len(queue) >= limit
+                ):
+                    yield take(queue.popleft())
+                continue
+            if not isinstance(item, Future):
+                yield item
+            if len(pending) >= limit:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+            else:
+                done = {future for future in pending if future.done()}
+            for future in done:
+                yield take(future)
+
+        while queue:
+            yield take(queue.popleft())
+        for future in as_completed(list(pending)):
+            yield take(future)
+
+
+def _open_input(path: str) -> IO[str]:
+    return sys.stdin if path == "-" else open(path, encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="isl-practice",
+        description="JSONL のジョブを読み、Level 01–03 の解析結果を JSONL で書き出します。",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="ジョブの JSONL（既定: 標準入力）")
+    parser.add_argument("-o", "--output", default="-", help="結果の出力先（既定: 標準出力）")
+    parser.add_argument("--workers", type=int, default=None, help="プロセスプールのワーカー数")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="同時に処理するジョブ数の上限")
+    parser.add_argument("--unordered", action="store_true", help="完了した順に結果を書き出す")
+    parser.add_argument("--list-operations", action="store_true", help="使える操作名を表示して終了")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers は 1 以上で指定してください")
+    if args.max_in_flight is not None and args.max_in_flight < 1:
+        parser.error("--max-in-flight は 1 以上で指定してください")
+
+    if args.list_operations:
+        from . import operations
+
+        for alias, name in ALIASES.items():
+            print(f"{alias:<20} {name}")
+        for name in operations.list_operations():
+            print(name)
+        return 0
+
+    failures = 0
+    source = _open_input(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for record in iter_results(source, args.workers, args.max_in_flight, not args.unordered):
+            failures += not record["ok"]
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
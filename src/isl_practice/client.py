@@ -0,0 +1,123 @@
+"""
+常駐解析サーバー（`server.py`）の同期クライアントです。
+
+フロントエンドから使いやすいよう、asyncio を使わずにソケットまたはパイプへ
+1 行 1 JSON のリクエストを書き、対応するレスポンスを読みます。このモジュールは
+islpy を import しないため、クライアント側のプロセスは isl の起動コストを払いません。
+
+    with AnalysisClient.connect("/tmp/isl.sock") as client:
+        client.call("level01.canonical_intersection", "{ [i] : i >= 0 }", "{ [i] : i < 4 }")
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+from typing import IO, Any, Callable
+
+
+class RemoteError(RuntimeError):
+    """サーバー側で発生した例外です。`error_type` は元の例外クラス名です。"""
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+        self.message = message
+
+
+def _package_root() -> str:
+    """ヘルパー: このパッケージを `python -m` で起動できる sys.path のディレクトリです。"""
+    depth = len(__package__.split("."))
+    return str(pathlib.Path(__file__).resolve().parents[depth])
+
+
+class AnalysisClient:
+    """1 本の接続上でリクエストを順に送るクライアントです。"""
+
+    def __init__(
+        self,
+        reader: IO[bytes],
+        writer: IO[bytes],
+        closer: Callable[[], None] | None = None,
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._closer = closer
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def connect(cls, path: str, timeout: float | None = None) -> AnalysisClient:
+        """Unix ソケット `path` で待ち受けているサーバーに接続します。"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(path)
+        stream = sock.makefile("rwb")
+
+        def close() -> None:
+            stream.close()
+            sock.close()
+
+        return cls(stream, stream, close)
+
+    @classmethod
+    def spawn(
+        cls,
+        backend: str = "process",
+        max_workers: int | None = None,
+        python: str = sys.executable,
+    ) -> AnalysisClient:
+        """サーバーを `--stdio` の子プロセスとして起動し、そのパイプで接続します。"""
+        command = [python, "-m", f"{__package__}.server", "--stdio", "--backend", backend]
+        if max_workers is not None:
+            command += ["--workers", str(max_workers)]
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [_package_root(), env.get("PYTHONPATH")])
+        )
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env
+        )
+
+        def close() -> None:
+            process.stdin.close()
+            process.wait()
+            process.stdout.close()
+
+        return cls(process.stdout, process.stdin, close)
+
+    def call(self, op: str, *args: Any, **kwargs: Any) -> Any:
+        """操作 `op` を呼び出して結果を返します。サーバー側の例外は `RemoteError` です。"""
+        request_id = next(self._ids)
+        request = {"id": request_id, "op": op, "args": list(args), "kwargs": kwargs}
+        self._writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._writer.flush()
+
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("サーバーとの接続が切れました")
+        response = json.loads(line)
+        if response.get("id") != request_id:
+            raise ConnectionError(f"予期しないレスポンスです: {response!r}")
+        if not response["ok"]:
+            error = response["error"]
+            raise RemoteError(error["type"], error["message"])
+        return response["result"]
+
+    def ping(self) -> bool:
+        return self.call("ping") == "pong"
+
+    def close(self) -> None:
+        if self._closer is not None:
+            self._closer()
+            self._closer = None
+
+    def __enter__(self) -> AnalysisClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
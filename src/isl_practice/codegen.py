@@ -0,0 +1,243 @@
+"""
+スケジュール木から C のループネストを生成し、ネイティブに実行時間を測る仕組みです。
+
+`isl.AstBuild.node_from_schedule` で得た AST を C 文字列に変換し、isl が
+`S(c0 + c3, c1 + c4, c2)` のように出力するステートメント呼び出しを、テンプレート
+から生成した `static inline` 関数に結び付けます。生成したプログラムはローカルの
+C コンパイラでビルドし、複数回の計測の中央値とチェックサムを報告します。
+タイル化の有無や fusion/fission などのスケジュール違いを同じ条件で比較できます。
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+import islpy as isl
+
+_ISL_MACROS = """\
+#define floord(n, d) (((n) < 0) ? -((-(n) + (d) - 1) / (d)) : (n) / (d))
+#define ceild(n, d) (((n) < 0) ? -((-(n)) / (d)) : ((n) + (d) - 1) / (d))
+#define min(x, y) ((x) < (y) ? (x) : (y))
+#define max(x, y) ((x) > (y) ? (x) : (y))
+"""
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    """生成コードで静的に確保する配列の宣言です。"""
+
+    name: str
+    shape: tuple[int, ...]
+    ctype: str = "float"
+
+    @property
+    def size(self) -> int:
+        size = 1
+        for extent in self.shape:
+            size *= extent
+        return size
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """1 つのスケジュールをネイティブ実行した計測結果です。"""
+
+    name: str
+    times_s: tuple[float, ...]
+    checksum: float
+
+    @property
+    def median_s(self) -> float:
+        return statistics.median(self.times_s)
+
+
+def generate_loop_nest(schedule: isl.Schedule, context: str = "{ : }") -> str:
+    """スケジュール木から isl の AST を生成し、C のループネスト文字列を返します。"""
+    build = isl.AstBuild.from_context(isl.Set(context, context=schedule.get_ctx()))
+    return build.node_from_schedule(schedule).to_C_str()
+
+
+def _statement_iterators(schedule: isl.Schedule) -> dict[str, list[str]]:
+    """ヘルパー: ステートメント名 → 反復変数名（無名なら `i0, i1, ...`）の対応を返します。"""
+    sets: list[isl.Set] = []
+    schedule.get_domain().foreach_set(sets.append)
+    iterators = {}
+    for stmt in sets:
+        names = []
+        for k in range(stmt.dim(isl.dim_type.set)):
+            names.append(stmt.get_dim_name(isl.dim_type.set, k) or f"i{k}")
+        iterators[stmt.get_tuple_name()] = names
+    return iterators
+
+
+def build_program(
+    schedule: isl.Schedule,
+    statements: Mapping[str, str],
+    arrays: Sequence[ArraySpec],
+) -> str:
+    """
+    計測用の C プログラム全体を生成します。
+
+    `statements` はステートメント名から C の本体への対応で、本体の中では反復領域の
+    次元名（例: `"C[i][j] += A[i][k] * B[k][j];"`）をそのまま使えます。プログラムは
+    コマンドライン引数で与えた回数だけ「初期化 → カーネル実行」を繰り返し、各回の
+    実行時間と最後の配列内容のチェックサムを標準出力に書きます。
+    """
+    iterators = _statement_iterators(schedule)
+    missing = iterators.keys() - statements.keys()
+    if missing:
+        raise ValueError(f"本体テンプレートの無いステートメントがあります: {sorted(missing)}")
+
+    lines = [
+        "#include <stdio.h>",
+        "#include <stdlib.h>",
+        "#include <time.h>",
+        "",
+        _ISL_MACROS,
+    ]
+    for array in arrays:
+        dims = "".join(f"[{extent}]" for extent in array.shape)
+        lines.append(f"static {array.ctype} {array.name}{dims};")
+    lines.append("")
+    for name, names in iterators.items():
+        params = ", ".join(f"int {it}" for it in names)
+        lines.append(f"static inline void {name}({params}) {{ {statements[name]} }}")
+
+    lines += ["", "static void init_arrays(void) {"]
+    for seed, array in enumerate(arrays):
+        lines.append(
+            f"  for (long x = 0; x < {array.size}L; ++x) "
+            f"(({array.ctype} *){array.name})[x] = ({array.ctype})((x * 7 + {seed}) % 13) / 13;"
+        )
+    lines += ["}", "", "static void kernel(void) {"]
+    lines += ["  " + line for line in generate_loop_nest(schedule).splitlines()]
+    lines += [
+        "}",
+        "",
+        "int main(int argc, char **argv) {",
+        "  int runs = argc > 1 ? atoi(argv[1]) : 1;",
+        "  for (int r = 0; r < runs; ++r) {",
+        "    struct timespec t0, t1;",
+        "    init_arrays();",
+        "    clock_gettime(CLOCK_MONOTONIC, &t0);",
+        "    kernel();",
+        "    clock_gettime(CLOCK_MONOTONIC, &t1);",
+        '    printf("time %.9f\\n", (double)(t1.tv_sec - t0.tv_sec)'
+        " + 1e-9 * (double)(t1.tv_nsec - t0.tv_nsec));",
+        "  }",
+        "  double checksum = 0.0;",
+    ]
+    for array in arrays:
+        lines.append(
+            f"  for (long x = 0; x < {array.size}L; ++x) "
+            f"checksum += (double)(({array.ctype} *){array.name})[x];"
+        )
+    lines += ['  printf("checksum %.17g\\n", checksum);', "  return 0;", "}", ""]
+    return "\n".join(lines)
+
+
+def find_c_compiler() -> str | None:
+    """環境変数 `CC`、`cc`、`gcc`、`clang` の順に C コンパイラを探します。"""
+    for candidate in (os.environ.get("CC"), "cc", "gcc", "clang"):
+        if candidate and shutil.which(candidate):
+            return candidate
+    return None
+
+
+def compile_and_run(
+    source: str,
+    name: str = "kernel",
+    runs: int = 5,
+    warmup: int = 1,
+    cc: str | None = None,
+    flags: Sequence[str] = ("-O2",),
+) -> BenchmarkResult:
+    """
+    C ソースをビルドして `warmup + runs` 回実行し、計測結果を返します。
+
+    最初の `warmup` 回の計測値は捨てます。コンパイラが見つからない場合は
+    `RuntimeError` を送出し、ビルドや実行の失敗は `subprocess.CalledProcessError`
+    としてそのまま送出します。
+    """
+    cc = cc or find_c_compiler()
+    if cc is None:
+        raise RuntimeError("C コンパイラが見つかりません")
+
+    with tempfile.TemporaryDirectory(prefix="isl_codegen_") as tmp:
+        src_path = os.path.join(tmp, f"{name}.c")
+        exe_path = os.path.join(tmp, name)
+        with open(src_path, "w", encoding="utf-8") as fp:
+            fp.write(source)
+        subprocess.run(
+            [cc, *flags, "-o", exe_path, src_path],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        completed = subprocess.run(
+            [exe_path, str(warmup + runs)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+    times: list[float] = []
+    checksum = float("nan")
+    for line in completed.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "time":
+            times.append(float(value))
+        elif key == "checksum":
+            checksum = float(value)
+    return BenchmarkResult(name=name, times_s=tuple(times[warmup:]), checksum=checksum)
+
+
+def benchmark_schedules(
+    variants: Mapping[str, isl.Schedule],
+    statements: Mapping[str, str],
+    arrays: Sequence[ArraySpec],
+    runs: int = 5,
+    warmup: int = 1,
+    cc: str | None = None,
+    flags: Sequence[str] = ("-O2",),
+) -> dict[str, BenchmarkResult]:
+    """名前付きのスケジュール群をそれぞれビルド・計測し、名前 → 結果の辞書を返します。"""
+    return {
+        name: compile_and_run(
+            build_program(schedule, statements, arrays),
+            name=name,
+            runs=runs,
+            warmup=warmup,
+            cc=cc,
+            flags=flags,
+        )
+        for name, schedule in variants.items()
+    }
+
+
+def compare_results(
+    results: Mapping[str, BenchmarkResult],
+    baseline: str,
+    rel_tol: float = 1e-4,
+) -> dict[str, dict[str, float | bool]]:
+    """
+    各結果の `baseline` に対する速度向上率と、チェックサムの一致を返します。
+
+    浮動小数点の加算順序が変わり得るため、チェックサムは相対誤差 `rel_tol` で比較します。
+    """
+    base = results[baseline]
+    report: dict[str, dict[str, float | bool]] = {}
+    for name, result in results.items():
+        scale = max(abs(base.checksum), 1.0)
+        report[name] = {
+            "median_s": result.median_s,
+            "speedup": base.median_s / result.median_s if result.median_s else float("inf"),
+            "checksum_matches": abs(result.checksum - base.checksum) <= rel_tol * scale,
+        }
+    return report
@@ -0,0 +1,93 @@
+"""
+スレッドごとの isl コンテキストを扱うヘルパーです。
+
+isl のコンテキスト（`isl.Context`）はスレッド安全ではありませんが、別々の
+コンテキストに属するオブジェクトは別のスレッドから同時に操作できます。ここでは
+
+- スレッドに束縛された「現在のコンテキスト」（既定は `isl.DEFAULT_CONTEXT`）、
+- 各ワーカースレッドに専用のコンテキストを割り当てるスレッドプール、
+- 文字列表現を経由したコンテキスト間のオブジェクトの移し替え
+
+を提供します。各レベルの関数は `ctx` 引数を省略すると現在のコンテキストで
+文字列をパースするため、`ContextThreadPool` 上で呼び出せばそのまま安全に
+並列実行できます。異なるコンテキストのオブジェクトを混ぜて演算することは
+できないため、スレッド間では文字列（または `transfer` で移したオブジェクト）を
+受け渡してください。
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, TypeVar
+
+import islpy as isl
+
+_T = TypeVar("_T", isl.Set, isl.Map, isl.UnionSet, isl.UnionMap, isl.Schedule)
+
+_LOCAL = threading.local()
+
+
+def current_context() -> isl.Context:
+    """このスレッドに束縛されたコンテキストを返します。無ければ `isl.DEFAULT_CONTEXT` です。"""
+    return getattr(_LOCAL, "ctx", None) or isl.DEFAULT_CONTEXT
+
+
+def resolve_context(ctx: isl.Context | None) -> isl.Context:
+    """`ctx` が None なら現在のコンテキストを返します。"""
+    return ctx if ctx is not None else current_context()
+
+
+@contextmanager
+def use_context(ctx: isl.Context | None) -> Iterator[isl.Context]:
+    """
+    ブロック内でこのスレッドの現在のコンテキストを `ctx` に切り替えます。
+
+    None を渡した場合は何も切り替えず、現在のコンテキストをそのまま渡します。
+    """
+    if ctx is None:
+        yield current_context()
+        return
+    previous = getattr(_LOCAL, "ctx", None)
+    _LOCAL.ctx = ctx
+    try:
+        yield ctx
+    finally:
+        _LOCAL.ctx = previous
+
+
+def bind_thread_context() -> isl.Context:
+    """このスレッド専用の新しいコンテキストを作って束縛します（プールの初期化用）。"""
+    _LOCAL.ctx = isl.Context()
+    return _LOCAL.ctx
+
+
+def transfer(obj: _T, ctx: isl.Context | None = None) -> _T:
+    """
+    isl オブジェクトを文字列表現経由で `ctx`（省略時は現在のコンテキスト）へ移します。
+
+    すでに `ctx` に属している場合はそのまま返します。
+    """
+    ctx = resolve_context(ctx)
+    if obj.get_ctx() == ctx:
+        return obj
+    return type(obj)(str(obj), context=ctx)
+
+
+class ContextThreadPool(ThreadPoolExecutor):
+    """
+    各ワーカースレッドに専用の `isl.Context` を束縛するスレッドプールです。
+
+    投入した関数の中では `current_context()` がそのスレッドのコンテキストを返すため、
+    文字列を受け取って文字列（や pickle 可能な値）を返す関数はそのまま並列に
+    実行できます。isl オブジェクトを返す関数の結果は、使う側のスレッドで
+    `transfer` してから演算してください。
+    """
+
+    def __init__(self, max_workers: int | None = None, thread_name_prefix: str = "isl"):
+        super().__init__(
+            max_workers=max_workers,
+            thread_name_prefix=thread_name_prefix,
+            initializer=bind_thread_context,
+        )
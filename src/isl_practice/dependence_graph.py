@@ -0,0 +1,223 @@
+"""
+ステートメント単位で増減できる、メモリベースのフロー依存グラフです。
+
+フロントエンドが SCoP を 1 ステートメントずつ組み立て、そのたびに
+`construct_flow_dependences` をアクセス関係全体に対して呼ぶと、長いカーネルでは
+ステートメント数の 2 乗の計算になります。`IncrementalDependenceGraph` は
+読み書きアクセスを配列とステートメント名で索引付けし、依存を
+`(配列, 書き込み側, 読み出し側)` の組ごとの写像として保持します。ステートメントを
+追加・削除したときは、そのステートメントが触れる配列の組だけを計算し直します。
+配列は `construct_flow_dependences_sharded` と同じく (名前, 次元数) で区別するため、
+同じ名前を異なる次元数でアクセスしても互いに依存は生じません。依存全体の和は
+追加のたびに差分で広げ、削除したときだけ作り直します。
+
+依存の意味は `schedule` を渡さない `construct_flow_dependences` と同じで、
+同じ配列要素を書く反復から読む反復への写像です（書き込み側は反復領域に制限します）。
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+import islpy as isl
+
+# (配列名, 次元数)
+ArrayKey = tuple[str, int]
+
+from .contexts import resolve_context
+from .instrumentation import track
+from .parse_cache import parse_union_map, parse_union_set
+
+
+def _split_by_array(accesses: isl.UnionMap) -> dict[str, dict[ArrayKey, isl.Map]]:
+    """ヘルパー: アクセス写像を `{ステートメント: {(配列名, 次元数): 写像}}` に分けます。"""
+    maps: list[isl.Map] = []
+    accesses.foreach_map(maps.append)
+    split: dict[str, dict[ArrayKey, isl.Map]] = defaultdict(dict)
+    for access in maps:
+        statement = access.get_tuple_name(isl.dim_type.in_)
+        array = (access.get_tuple_name(isl.dim_type.out) or "", access.dim(isl.dim_type.out))
+        previous = split[statement].get(array)
+        split[statement][array] = access if previous is None else previous.union(access)
+    return split
+
+
+class IncrementalDependenceGraph:
+    """
+    ステートメントの追加・削除に合わせてフロー依存を差分更新するグラフです。
+
+    `iteration_domain` / `read_accesses` / `write_accesses` を渡すと、その内容で
+    初期化します。各ステートメントの反復領域はちょうど 1 つの集合で与えてください。
+    """
+
+    def __init__(
+        self,
+        iteration_domain: str = "{ }",
+        read_accesses: str = "{ }",
+        write_accesses: str = "{ }",
+        ctx: isl.Context | None = None,
+    ):
+        self._ctx = resolve_context(ctx)
+        self._domains: dict[str, isl.Set] = {}
+        self._reads: dict[str, dict[ArrayKey, isl.Map]] = {}
+        self._writes: dict[str, dict[ArrayKey, isl.Map]] = {}
+        # 配列 → その配列を読む／書くステートメントの集合
+        self._readers: dict[ArrayKey, set[str]] = defaultdict(set)
+        self._writers: dict[ArrayKey, set[str]] = defaultdict(set)
+        # (配列, 書き込み側, 読み出し側) → 依存写像（空の組は保持しません）
+        self._pairs: dict[tuple[ArrayKey, str, str], isl.Map] = {}
+        # 依存全体の和。None なら次の `dependences()` で作り直します。
+        self._union: isl.UnionMap | None = None
+
+        domains: list[isl.Set] = []
+        parse_union_set(iteration_domain, self._ctx).foreach_set(domains.append)
+        reads = _split_by_array(parse_union_map(read_accesses, self._ctx))
+        writes = _split_by_array(parse_union_map(write_accesses, self._ctx))
+        for domain in domains:
+            name = domain.get_tuple_name()
+            self._add(name, domain, reads.get(name, {}), writes.get(name, {}))
+
+    @property
+    def statements(self) -> tuple[str, ...]:
+        """登録済みのステートメント名を追加順に返します。"""
+        return tuple(self._domains)
+
+    @property
+    def arrays(self) -> tuple[str, ...]:
+        """いずれかのステートメントがアクセスする配列名をソートして返します。"""
+        return tuple(sorted({array for array, _ in (*self._readers, *self._writers)}))
+
+    def __contains__(self, statement: object) -> bool:
+        return statement in self._domains
+
+    def __len__(self) -> int:
+        """空でない依存写像（配列・書き込み側・読み出し側の組）の数です。"""
+        return len(self._pairs)
+
+    def add_statement(
+        self,
+        domain: str,
+        read_accesses: str = "{ }",
+        write_accesses: str = "{ }",
+    ) -> None:
+        """
+        反復領域 `domain`（ステートメント 1 つ分）とそのアクセスを追加します。
+
+        すでに登録済みのステートメントや、他のステートメントのアクセスが
+        含まれている場合は `ValueError` を送出します。
+        """
+        sets: list[isl.Set] = []
+        parse_union_set(domain, self._ctx).foreach_set(sets.append)
+        if len(sets) != 1:
+            raise ValueError("domain にはステートメントを 1 つだけ指定してください")
+        name = sets[0].get_tuple_name()
+        if name in self._domains:
+            raise ValueError(f"ステートメント {name} はすでに登録されています")
+        reads = _split_by_array(parse_union_map(read_accesses, self._ctx))
+        writes = _split_by_array(parse_union_map(write_accesses, self._ctx))
+        if set(reads) - {name} or set(writes) - {name}:
+            raise ValueError(f"アクセスには {name} 以外のステートメントを含めないでください")
+        self._add(name, sets[0], reads.get(name, {}), writes.get(name, {}))
+
+    def remove_statement(self, statement: str) -> bool:
+        """ステートメントとそれに関わる依存を取り除きます。登録されていなければ False です。"""
+        if statement not in self._domains:
+            return False
+        for array in self._reads.pop(statement):
+            self._readers[array].discard(statement)
+            if not self._readers[array]:
+                del self._readers[array]
+        for array in self._writes.pop(statement):
+            self._writers[array].discard(statement)
+            if not self._writers[array]:
+                del self._writers[array]
+        del self._domains[statement]
+        self._pairs = {
+            key: dep for key, dep in self._pairs.items() if statement not in (key[1], key[2])
+        }
+        self._union = None
+        return True
+
+    def replace_statement(
+        self,
+        domain: str,
+        read_accesses: str = "{ }",
+        write_accesses: str = "{ }",
+    ) -> None:
+        """同名のステートメントがあれば取り除いてから、新しい内容で追加します。"""
+        sets: list[isl.Set] = []
+        parse_union_set(domain, self._ctx).foreach_set(sets.append)
+        if len(sets) == 1:
+            self.remove_statement(sets[0].get_tuple_name())
+        self.add_statement(domain, read_accesses, write_accesses)
+
+    def _add(
+        self,
+        name: str,
+        domain: isl.Set,
+        reads: dict[ArrayKey, isl.Map],
+        writes: dict[ArrayKey, isl.Map],
+    ) -> None:
+        self._domains[name] = domain
+        self._reads[name] = reads
+        self._writes[name] = writes
+        for array in reads:
+            self._readers[array].add(name)
+        for array in writes:
+            self._writers[array].add(name)
+
+        for array in reads:
+            for writer in self._writers.get(array, ()):
+                self._update_pair(array, writer, name)
+        for array in writes:
+            for reader in self._readers.get(array, ()):
+                if reader != name or array not in reads:
+                    self._update_pair(array, name, reader)
+
+    def _update_pair(self, array: ArrayKey, writer: str, reader: str) -> None:
+        """
+        ヘルパー: 1 つの組の依存写像を計算し、空でなければ保持します。
+
+        新しい組なら依存全体の和に差分で加え、既存の組を置き換えた場合は和を破棄します。
+        """
+        write = self._writes[writer][array]
+        read = self._reads[reader][array]
+        dep = (
+            track("apply_range", read.apply_range, write.reverse())
+            .reverse()
+            .intersect_domain(self._domains[writer])
+        )
+        key = (array, writer, reader)
+        previous = self._pairs.pop(key, None)
+        if previous is not None:
+            self._union = None
+        if dep.is_empty():
+            return
+        self._pairs[key] = dep
+        if self._union is not None:
+            self._union = track("union", self._union.union, isl.UnionMap.from_map(dep))
+
+    def dependences(self) -> isl.UnionMap:
+        """現在のフロー依存全体を返します（依存が無ければ空の `UnionMap`）。"""
+        if self._union is None:
+            union = isl.UnionMap.empty(isl.Space.params_alloc(self._ctx, 0))
+            for dep in self._pairs.values():
+                union = track("union", union.union, isl.UnionMap.from_map(dep))
+            self._union = union
+        return self._union
+
+    def by_array(self) -> dict[str, isl.UnionMap]:
+        """配列名 → その配列を介したフロー依存の辞書です。依存の無い配列は含みません。"""
+        breakdown: dict[str, isl.UnionMap] = {}
+        for ((array, _), _, _), dep in self._pairs.items():
+            piece = isl.UnionMap.from_map(dep)
+            breakdown[array] = breakdown[array].union(piece) if array in breakdown else piece
+        return dict(sorted(breakdown.items()))
+
+    def between(self, writer: str, reader: str) -> isl.UnionMap:
+        """`writer` から `reader` へのフロー依存（全配列分）を返します。"""
+        union = isl.UnionMap.empty(isl.Space.params_alloc(self._ctx, 0))
+        for (_, source, sink), dep in self._pairs.items():
+            if source == writer and sink == reader:
+                union = union.union(isl.UnionMap.from_map(dep))
+        return union
@@ -0,0 +1,466 @@
+"""
+解析結果を永続化する、内容アドレス方式のディスクキャッシュです。
+
+CI や本番のコンパイルでは、同じ依存解析やスケジュール構築が毎回繰り返されます。
+ここでは入力を正規化したテキストと islpy のバージョンからハッシュキーを作り、
+結果の文字列表現を SQLite に保存します。2 回目以降は isl を呼ばずにテキストから
+復元するだけで済みます。
+
+データベースは WAL モードで開き、書き込みの競合は `busy_timeout` で待つため、
+複数プロセスから同じディレクトリを共有できます。接続はプロセス・スレッドごとに
+作ります。保存量が `max_bytes` を超えると、最後に参照された時刻が古いものから
+追い出します。ヒット数などの統計もデータベースに保存し、全プロセス分を集計します。
+ヒット時の参照時刻と統計の更新はプロセス内に溜めておき、`flush_every` 件ごと、
+または次の書き込み・`stats`・`flush`・`close` のときにまとめて書き込むため、
+読み出しだけのときに WAL の書き込みロックを取り合うことはありません。
+
+ヒットしたときもミスしたときも、結果は同じコンテキストに載ります。文字列を受け取る
+関数は `ctx`（省略時は `contexts.current_context()`）に、isl のオブジェクトを受け取る
+関数はその引数のコンテキストに復元します。
+
+既定では無効で、`set_disk_cache` を呼ぶか環境変数 `ISL_PRACTICE_CACHE_DIR` に
+ディレクトリを指定すると有効になります。
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import islpy as isl
+from islpy.version import VERSION_TEXT as ISLPY_VERSION
+
+from . import level02_dependence_analysis as lvl02
+from . import level03_scheduling as lvl03
+from .contexts import resolve_context
+from .parse_cache import normalize_text
+
+ENV_CACHE_DIR = "ISL_PRACTICE_CACHE_DIR"
+DB_FILENAME = "analysis_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class DiskCacheStats:
+    """ディスクキャッシュの利用状況のスナップショットです（全プロセスの累計）。"""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    total_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def _canonical(value: object) -> object:
+    """ヘルパー: キー計算用に引数を JSON で表せる正規形へ変換します。"""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, range)):
+        return [_canonical(v) for v in value]
+    # isl のオブジェクトは parse_cache と同じく文字列表現で区別します。キーを作るたびに
+    # isl の簡約を走らせるとキャッシュの意味が薄れるため、正規化はテキストだけで行います。
+    return normalize_text(str(value))
+
+
+def _detached(value: object) -> object:
+    """ヘルパー: isl のオブジェクトなら、同じコンテキストでテキストから作り直します。"""
+    if isinstance(value, (isl.Set, isl.Map, isl.UnionSet, isl.UnionMap, isl.Schedule)):
+        return type(value)(str(value), context=value.get_ctx())
+    return value
+
+
+def _decoder(kind: type, ctx: isl.Context) -> Callable[[str], object]:
+    """ヘルパー: 保存したテキストを `ctx` 上の `kind` として復元する関数を返します。"""
+    return lambda text: kind(text, context=ctx)
+
+
+class DiskCache:
+    """
+    SQLite を使ったキー → 文字列のキャッシュです。
+
+    `max_bytes` は保存する値の合計サイズ（バイト）の上限、`timeout_s` は他プロセスの
+    書き込みを待つ最大秒数です。値には None も保存でき、「結果が None だった」ことを
+    キャッシュできます。`flush_every` はヒット・ミスの記録を溜めておく最大件数で、
+    1 にすると毎回すぐに書き込みます。
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        max_bytes: int = 256 * 1024 * 1024,
+        timeout_s: float = 30.0,
+        flush_every: int = 64,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes は正の値で指定してください")
+        if flush_every < 1:
+            raise ValueError("flush_every は 1 以上で指定してください")
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        self.timeout_s = timeout_s
+        self.flush_every = flush_every
+        self.version = ISLPY_VERSION
+        os.makedirs(self.directory, exist_ok=True)
+        self._local = threading.local()
+        # まだ書き込んでいない参照時刻（キー → 時刻）とヒット・ミス数です。
+        self._lock = threading.Lock()
+        self._pending_pid = os.getpid()
+        self._pending_accessed: dict[str, float] = {}
+        self._pending_hits = 0
+        self._pending_misses = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, DB_FILENAME)
+
+    def _connect(self) -> sqlite3.Connection:
+        """ヘルパー: このプロセス・スレッド用の接続を返します（fork 後は作り直します）。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout_s)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout_s * 1000)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def make_key(self, kind: str, *args: object, **kwargs: object) -> str:
+        """処理の種類と正規化した引数、islpy のバージョンから SHA-256 のキーを作ります。"""
+        payload = json.dumps(
+            [kind, self.version, _canonical(args), _canonical(kwargs)],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _take_pending(self) -> tuple[dict[str, float], int, int]:
+        """ヘルパー: 溜まっている記録を取り出して空にします（fork 前の記録は捨てます）。"""
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                pending: tuple[dict[str, float], int, int] = ({}, 0, 0)
+            else:
+                pending = (self._pending_accessed, self._pending_hits, self._pending_misses)
+            self._pending_pid = os.getpid()
+            self._pending_accessed, self._pending_hits, self._pending_misses = {}, 0, 0
+        return pending
+
+    def _write_pending(self, conn: sqlite3.Connection) -> None:
+        accessed, hits, misses = self._take_pending()
+        if accessed:
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(when, key) for key, when in accessed.items()],
+            )
+        if hits:
+            self._bump(conn, "hits", hits)
+        if misses:
+            self._bump(conn, "misses", misses)
+
+    def flush(self) -> None:
+        """溜まっている参照時刻とヒット・ミス数をデータベースに書き込みます。"""
+        with self._connect() as conn:
+            self._write_pending(conn)
+
+    def get(self, key: str) -> tuple[bool, str | None]:
+        """
+        `(見つかったか, 値)` を返します。
+
+        読み出しだけを行い、参照時刻と統計の更新は溜めておいて後でまとめて書き込みます。
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                self._pending_pid = os.getpid()
+                self._pending_accessed, self._pending_hits, self._pending_misses = {}, 0, 0
+            if row is None:
+                self._pending_misses += 1
+            else:
+                self._pending_accessed[key] = time.time()
+                self._pending_hits += 1
+            full = self._pending_hits + self._pending_misses >= self.flush_every
+        if full:
+            self.flush()
+        return (False, None) if row is None else (True, row[0])
+
+    def put(self, key: str, kind: str, value: str | None) -> None:
+        """値を保存し、上限を超えた分を追い出します。"""
+        size = len(value.encode("utf-8")) if value is not None else 0
+        if size > self.max_bytes:
+            return
+        with self._connect() as conn:
+            self._write_pending(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, kind, value, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, kind, value, size, time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bump(conn, "evictions", evicted)
+
+    def memoize(
+        self,
+        kind: str,
+        func: Callable[..., object],
+        decode: Callable[[str], object],
+        *args: object,
+        **kwargs: object,
+    ) -> object:
+        """
+        キャッシュにあれば `decode` で復元して返し、無ければ `func` を呼んで保存します。
+
+        結果は `str()` で文字列化して保存します。`func` が送出した例外は保存しません。
+        isl は `coalesce` などで引数の内部表現をその場で書き換え、文字列表現（つまり
+        キー）も変わることがあるため、`func` にはテキストから作り直した別のオブジェクトを
+        渡し、呼び出し元のオブジェクトには触れません。
+        """
+        key = self.make_key(kind, *args, **kwargs)
+        found, text = self.get(key)
+        if found:
+            return None if text is None else decode(text)
+        result = func(*map(_detached, args), **{name: _detached(v) for name, v in kwargs.items()})
+        self.put(key, kind, None if result is None else str(result))
+        return result
+
+    def resize(self, max_bytes: int) -> None:
+        """上限を変更し、超過分を直ちに追い出します。"""
+        self.max_bytes = max_bytes
+        with self._connect() as conn:
+            self._write_pending(conn)
+            self._evict(conn)
+
+    def clear(self) -> None:
+        """全エントリと統計情報を破棄します。"""
+        self._take_pending()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+
+    def stats(self) -> DiskCacheStats:
+        """統計を返します。このインスタンスで溜まっている記録は先に書き込みます。"""
+        self.flush()
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return DiskCacheStats(
+            hits=counters.get("hits", 0),
+            misses=counters.get("misses", 0),
+            evictions=counters.get("evictions", 0),
+            entries=entries,
+            total_bytes=total,
+        )
+
+    def close(self) -> None:
+        """溜まっている記録を書き込み、このスレッドの接続を閉じます。"""
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_DEFAULT_CACHE: DiskCache | None = None
+_DEFAULT_LOADED = False
+
+
+def get_disk_cache() -> DiskCache | None:
+    """
+    共有のディスクキャッシュを返します。
+
+    `set_disk_cache` で設定されていなければ、初回呼び出し時に環境変数
+    `ISL_PRACTICE_CACHE_DIR` を見て作成します。どちらも無ければ None です。
+    """
+    global _DEFAULT_CACHE, _DEFAULT_LOADED
+    if not _DEFAULT_LOADED:
+        directory = os.environ.get(ENV_CACHE_DIR)
+        if directory and _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = DiskCache(directory)
+        _DEFAULT_LOADED = True
+    return _DEFAULT_CACHE
+
+
+def set_disk_cache(cache: DiskCache | None) -> None:
+    """共有のディスクキャッシュを設定します。None で無効化します。"""
+    global _DEFAULT_CACHE, _DEFAULT_LOADED
+    _DEFAULT_CACHE = cache
+    _DEFAULT_LOADED = True
+
+
+def _memoize(
+    cache: DiskCache | None,
+    kind: str,
+    func: Callable[..., object],
+    decode: Callable[[str], object],
+    *args: object,
+    **kwargs: object,
+) -> object:
+    cache = cache if cache is not None else get_disk_cache()
+    if cache is None:
+        return func(*args, **kwargs)
+    return cache.memoize(kind, func, decode, *args, **kwargs)
+
+
+def construct_flow_dependences(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    schedule: isl.Schedule | str | None = None,
+    *,
+    cache: DiskCache | None = None,
+    ctx: isl.Context | None = None,
+) -> isl.UnionMap | None:
+    """`level02.construct_flow_dependences` の結果をディスクキャッシュ経由で返します。"""
+    ctx = resolve_context(ctx)
+    return _memoize(
+        cache,
+        "construct_flow_dependences",
+        functools.partial(lvl02.construct_flow_dependences, ctx=ctx),
+        _decoder(isl.UnionMap, ctx),
+        iteration_domain,
+        read_accesses,
+        write_accesses,
+        schedule=schedule,
+    )
+
+
+def simplify_dependence_domain(
+    dependences: isl.UnionMap,
+    *,
+    cache: DiskCache | None = None,
+) -> isl.UnionMap | None:
+    """`level02.simplify_dependence_domain` の結果をディスクキャッシュ経由で返します。"""
+    return _memoize(
+        cache,
+        "simplify_dependence_domain",
+        lvl02.simplify_dependence_domain,
+        _decoder(isl.UnionMap, dependences.get_ctx()),
+        dependences,
+    )
+
+
+def build_multiband_schedule(
+    iteration_domain: str,
+    schedule_map: str,
+    split_at: int,
+    outer_coincident: Iterable[int] = (),
+    inner_coincident: Iterable[int] = (),
+    *,
+    cache: DiskCache | None = None,
+    ctx: isl.Context | None = None,
+) -> isl.Schedule | None:
+    """`level03.build_multiband_schedule` の結果をディスクキャッシュ経由で返します。"""
+    ctx = resolve_context(ctx)
+    return _memoize(
+        cache,
+        "build_multiband_schedule",
+        functools.partial(lvl03.build_multiband_schedule, ctx=ctx),
+        _decoder(isl.Schedule, ctx),
+        iteration_domain,
+        schedule_map,
+        split_at,
+        tuple(outer_coincident),
+        tuple(inner_coincident),
+    )
+
+
+def apply_band_tiling(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    tile_sizes: Iterable[int],
+    *,
+    cache: DiskCache | None = None,
+) -> isl.Schedule | None:
+    """`level03.apply_band_tiling` の結果をディスクキャッシュ経由で返します。"""
+    return _memoize(
+        cache,
+        "apply_band_tiling",
+        lvl03.apply_band_tiling,
+        _decoder(isl.Schedule, schedule.get_ctx()),
+        schedule,
+        tuple(band_path),
+        tuple(tile_sizes),
+    )
+
+
+def arrange_filters_with_strategy(
+    iteration_domain: str,
+    schedule_map: str,
+    filters: Iterable[str],
+    mode: str,
+    read_accesses: str | None = None,
+    write_accesses: str | None = None,
+    *,
+    cache: DiskCache | None = None,
+    ctx: isl.Context | None = None,
+) -> isl.Schedule | None:
+    """`level03.arrange_filters_with_strategy` の結果をディスクキャッシュ経由で返します。"""
+    ctx = resolve_context(ctx)
+    return _memoize(
+        cache,
+        "arrange_filters_with_strategy",
+        functools.partial(lvl03.arrange_filters_with_strategy, ctx=ctx),
+        _decoder(isl.Schedule, ctx),
+        iteration_domain,
+        schedule_map,
+        tuple(filters),
+        mode,
+        read_accesses,
+        write_accesses,
+    )
@@ -0,0 +1,213 @@
+"""
+公開関数と内部の isl 演算のコストを記録するオプトインの計測層です。
+
+`recording()` のブロック内でだけ記録が有効になり、それ以外では各フックは
+ほぼ素通りします。記録対象は次の 2 種類です。
+
+- `@instrumented` を付けた公開関数の呼び出し（入出力の複雑さを含む）
+- `track("coalesce", deps.coalesce)` のように包んだ isl 演算ごとの実行時間
+
+複雑さは基本集合（基本写像）の数・制約数・存在量化変数（div）の数で表し、
+結果は JSON または Chrome trace 形式（`chrome://tracing` / Perfetto）で書き出せます。
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator, TypeVar
+
+import islpy as isl
+
+_F = TypeVar("_F", bound=Callable[..., object])
+_R = TypeVar("_R")
+
+_ISL_RELATIONS = (isl.BasicSet, isl.BasicMap, isl.Set, isl.Map, isl.UnionSet, isl.UnionMap)
+
+
+def relation_complexity(obj: object) -> dict[str, int] | None:
+    """
+    集合・写像の複雑さ（`basic_sets` / `constraints` / `divs`）を返します。
+
+    集合・写像以外（`isl.Point` や文字列など）には None を返します。
+    """
+    if not isinstance(obj, _ISL_RELATIONS):
+        return None
+
+    if isinstance(obj, isl.UnionSet):
+        parts: list[isl.Set | isl.Map] = []
+        obj.foreach_set(parts.append)
+    elif isinstance(obj, isl.UnionMap):
+        parts = []
+        obj.foreach_map(parts.append)
+    else:
+        parts = [obj]
+
+    basics: list[isl.BasicSet | isl.BasicMap] = []
+    for part in parts:
+        if isinstance(part, (isl.BasicSet, isl.BasicMap)):
+            basics.append(part)
+        elif isinstance(part, isl.Set):
+            basics.extend(part.get_basic_sets())
+        else:
+            basics.extend(part.get_basic_maps())
+
+    return {
+        "basic_sets": len(basics),
+        "constraints": sum(b.n_constraint() for b in basics),
+        "divs": sum(b.dim(isl.dim_type.div) for b in basics),
+    }
+
+
+def _describe(obj: object) -> dict[str, object] | None:
+    complexity = relation_complexity(obj)
+    if complexity is not None:
+        return {"type": type(obj).__name__, **complexity}
+    if isinstance(obj, str):
+        return {"type": "str", "chars": len(obj)}
+    return None
+
+
+@dataclass
+class Event:
+    """記録された 1 件の呼び出しまたは isl 演算です。"""
+
+    kind: str
+    name: str
+    start_s: float
+    duration_s: float
+    thread: int
+    inputs: list[dict[str, object]] = field(default_factory=list)
+    output: dict[str, object] | None = None
+
+
+class Recorder:
+    """記録したイベントを保持し、集計・書き出しを行います。"""
+
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _add(self, event: Event) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """演算・関数名ごとの呼び出し回数と合計時間を返します。"""
+        table: dict[str, dict[str, float]] = {}
+        for event in self.events:
+            entry = table.setdefault(
+                f"{event.kind}:{event.name}", {"count": 0, "total_s": 0.0}
+            )
+            entry["count"] += 1
+            entry["total_s"] += event.duration_s
+        return table
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"events": [asdict(e) for e in self.events], "summary": self.summary()},
+            indent=2,
+        )
+
+    def to_chrome_trace(self) -> str:
+        """Chrome trace event 形式（完了イベント `"ph": "X"`）の JSON を返します。"""
+        pid = os.getpid()
+        trace = [
+            {
+                "name": event.name,
+                "cat": event.kind,
+                "ph": "X",
+                "ts": (event.start_s - self._origin) * 1e6,
+                "dur": event.duration_s * 1e6,
+                "pid": pid,
+                "tid": event.thread,
+                "args": {"inputs": event.inputs, "output": event.output},
+            }
+            for event in self.events
+        ]
+        return json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"})
+
+    def write_json(self, path: str | os.PathLike[str]) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(self.to_json())
+
+    def write_chrome_trace(self, path: str | os.PathLike[str]) -> None:
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(self.to_chrome_trace())
+
+
+_ACTIVE: Recorder | None = None
+
+
+@contextmanager
+def recording() -> Iterator[Recorder]:
+    """ブロック内の呼び出しを記録する `Recorder` を有効化します。"""
+    global _ACTIVE
+    previous = _ACTIVE
+    recorder = Recorder()
+    _ACTIVE = recorder
+    try:
+        yield recorder
+    finally:
+        _ACTIVE = previous
+
+
+def _record(
+    recorder: Recorder,
+    kind: str,
+    name: str,
+    func: Callable[..., _R],
+    args: tuple[object, ...],
+    kwargs: dict[str, object],
+) -> _R:
+    inputs = [d for d in map(_describe, (*args, *kwargs.values())) if d is not None]
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    duration = time.perf_counter() - start
+    recorder._add(
+        Event(
+            kind=kind,
+            name=name,
+            start_s=start,
+            duration_s=duration,
+            thread=threading.get_ident(),
+            inputs=inputs,
+            output=_describe(result),
+        )
+    )
+    return result
+
+
+def track(name: str, method: Callable[..., _R], *args: object) -> _R:
+    """
+    isl 演算 `method(*args)` を実行し、記録中なら所要時間と入出力の複雑さを残します。
+
+    束縛メソッドを渡した場合は、レシーバも入力として記録します。
+    """
+    recorder = _ACTIVE
+    if recorder is None:
+        return method(*args)
+    receiver = getattr(method, "__self__", None)
+    if receiver is not None:
+        return _record(recorder, "isl", name, lambda *a: method(*a[1:]), (receiver, *args), {})
+    return _record(recorder, "isl", name, method, args, {})
+
+
+def instrumented(func: _F) -> _F:
+    """公開関数の呼び出しを `"call"` イベントとして記録するデコレータです。"""
+    name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args: object, **kwargs: object) -> object:
+        recorder = _ACTIVE
+        if recorder is None:
+            return func(*args, **kwargs)
+        return _record(recorder, "call", name, func, args, kwargs)
+
+    return wrapper  # type: ignore[return-value]
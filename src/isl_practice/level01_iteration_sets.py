@@ -4,52 +4,155 @@
 ここでは関数本体をあえて未実装（`return None`）にしてあります。テストが要求する
 振る舞いを満たすように、`isl.Set` や `isl.BasicSet` などの API を使って実装を
 書き換えてください。
+
+各関数の `ctx` には文字列をパースする isl コンテキストを渡せます。省略した場合は
+`contexts.current_context()`（通常は `isl.DEFAULT_CONTEXT`）を使います。
 """
 
 from __future__ import annotations
+
+from typing import Sequence
+
 import islpy as isl
 
+from .instrumentation import instrumented, track
+from .parallel import Backend, run_batch
+from .parse_cache import parse_set
 
-def canonical_intersection(domain_a: str, domain_b: str) -> str | None:
+
+@instrumented
+def canonical_intersection(
+    domain_a: str,
+    domain_b: str,
+    ctx: isl.Context | None = None,
+) -> str | None:
     """
     2 つの反復領域の交差を正規化した文字列で返します。
 
     テストは、この関数が `isl.Set.read_from_str` で再読込できる文字列表現を返し、
     かつ与えられた領域の厳密な共通部分を表していることを期待します。
     """
-    domain_a_set = isl.Set(domain_a)
-    domain_b_set = isl.Set(domain_b)
+    domain_a_set = parse_set(domain_a, ctx)
+    domain_b_set = parse_set(domain_b, ctx)
 
-    out_domain = domain_a_set.intersect(domain_b_set)
+    out_domain = track("intersect", domain_a_set.intersect, domain_b_set)
     if out_domain.is_empty():
         return None
     return str(out_domain)
 
 
-def eliminate_dim(domain: str, dimension: str) -> str | None:
+@instrumented
+def eliminate_dim(
+    domain: str,
+    dimension: str,
+    ctx: isl.Context | None = None,
+) -> str | None:
     """
     指定した次元をドメインから射影除去します。
 
     `dimension` には除去したい軸名（例: `"j"`）が渡されます。結果の集合を文字列で
     返し、空集合になる場合は None を返してください。
     """
-    domain_set = isl.Set(domain)
+    domain_set = parse_set(domain, ctx)
     idx = domain_set.get_space().find_dim_by_name(isl.dim_type.set, dimension)
     if idx < 0:
         return None
-    projected = domain_set.project_out(isl.dim_type.set, idx, 1)
+    projected = track("project_out", domain_set.project_out, isl.dim_type.set, idx, 1)
     if projected.is_empty():
         return None
     return str(projected)
 
 
-def find_lexmin_point(domain: str) -> isl.Point | None:
+@instrumented
+def find_lexmin_point(domain: str, ctx: isl.Context | None = None) -> isl.Point | None:
     """
     与えられた領域に存在する辞書式最小の整数点を `isl.Point` として返します。
 
     isl のデフォルト順序での lexmin を想定しており、領域が空なら None を返します。
     """
-    domain_set = isl.Set(domain).lexmin()
+    domain_set = track("lexmin", parse_set(domain, ctx).lexmin)
     if domain_set.is_empty():
         return None
     return domain_set.sample_point()
+
+
+def _lexmin_point_str(domain: str) -> str | None:
+    """ヘルパー: lexmin 点を `isl.Set` として再読込できる文字列で返します。"""
+    point = find_lexmin_point(domain)
+    if point is None:
+        return None
+    return str(isl.Set.from_point(point))
+
+
+def batch_canonical_intersection(
+    domains_a: Sequence[str],
+    domains_b: Sequence[str],
+    *,
+    backend: Backend = "serial",
+    max_workers: int | None = None,
+    chunksize: int = 1,
+) -> list[str | None]:
+    """
+    `canonical_intersection` を領域の組ごとに適用し、入力順の結果リストを返します。
+
+    `backend` には `"serial"` / `"thread"` / `"process"` を指定します。
+    """
+    if len(domains_a) != len(domains_b):
+        raise ValueError("domains_a と domains_b の長さが一致していません")
+    return run_batch(
+        canonical_intersection,
+        domains_a,
+        domains_b,
+        backend=backend,
+        max_workers=max_workers,
+        chunksize=chunksize,
+    )
+
+
+def batch_eliminate_dim(
+    domains: Sequence[str],
+    dimensions: Sequence[str] | str,
+    *,
+    backend: Backend = "serial",
+    max_workers: int | None = None,
+    chunksize: int = 1,
+) -> list[str | None]:
+    """
+    `eliminate_dim` を各領域に適用します。
+
+    `dimensions` に文字列を 1 つだけ渡した場合は、全領域で同じ軸を除去します。
+    """
+    if isinstance(dimensions, str):
+        dimensions = [dimensions] * len(domains)
+    if len(domains) != len(dimensions):
+        raise ValueError("domains と dimensions の長さが一致していません")
+    return run_batch(
+        eliminate_dim,
+        domains,
+        dimensions,
+        backend=backend,
+        max_workers=max_workers,
+        chunksize=chunksize,
+    )
+
+
+def batch_find_lexmin_point(
+    domains: Sequence[str],
+    *,
+    backend: Backend = "serial",
+    max_workers: int | None = None,
+    chunksize: int = 1,
+) -> list[str | None]:
+    """
+    各領域の辞書式最小点を文字列（例: `"{ [i = 0, j = 2] }"`）で返します。
+
+    `isl.Point` は pickle できないため、`isl.Set(s).sample_point()` で復元できる
+    単一点集合の文字列表現を返します。空の領域には None を返します。
+    """
+    return run_batch(
+        _lexmin_point_str,
+        domains,
+        backend=backend,
+        max_workers=max_workers,
+        chunksize=chunksize,
+    )
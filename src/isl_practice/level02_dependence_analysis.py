@@ -5,31 +5,273 @@ Level 02 では、依存解析の基礎操作を isl で体験するための問
 依存は「書いた反復 → 読む反復」を意味するので、`construct_flow_dependences` では
 `write_accesses` を反転してから `read_accesses` に合成し、Write→Read の向きを
 必ず守ってください。空集合を得た場合は None を返します。
+
+文字列を受け取る関数の `ctx` には、パースに使う isl コンテキストを渡せます（省略時は
+`contexts.current_context()`）。isl オブジェクトを受け取る関数は、その引数が属する
+コンテキストで演算し、演算回数の上限もそのコンテキストに設定します。
 """
 
 from __future__ import annotations
 
+import itertools
+from dataclasses import dataclass
+from typing import Iterable
+
 import islpy as isl
 
+from .budget import run_with_budget
+from .contexts import current_context, resolve_context
+from .instrumentation import instrumented, track
+from .parallel import Backend, run_batch
+from .parse_cache import parse_union_map, parse_union_set
+
+
+@dataclass(frozen=True)
+class DataflowDependences:
+    """
+    値ベース（last-writer）の依存をまとめたものです。
+
+    いずれの写像も「先に実行される反復 → 後に実行される反復」の向きを持ちます。
+    """
+
+    raw: isl.UnionMap
+    war: isl.UnionMap
+    waw: isl.UnionMap
+
+    def union(self) -> isl.UnionMap:
+        """RAW/WAR/WAW をすべて合わせた依存を返します。"""
+        return self.raw.union(self.war).union(self.waw)
+
+
+def _with_schedule(
+    access: isl.UnionAccessInfo,
+    schedule: isl.Schedule | str,
+) -> isl.UnionAccessInfo:
+    """ヘルパー: アクセス情報にスケジュール木または写像を設定します。"""
+    if isinstance(schedule, isl.Schedule):
+        return access.set_schedule(schedule)
+    return access.set_schedule_map(parse_union_map(schedule, access.get_ctx()))
+
+
+@instrumented
+def compute_dataflow_dependences(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    schedule: isl.Schedule | str,
+    ctx: isl.Context | None = None,
+) -> DataflowDependences | None:
+    """
+    `isl.UnionAccessInfo.compute_flow` で値ベースの RAW/WAR/WAW 依存を求めます。
+
+    メモリベースの依存と異なり、RAW は各読み出しに対して直前に書いた反復だけを、
+    WAR は各書き込みに対して直前の書き込み以降に読んだ反復だけを、WAW は直前の
+    書き込みだけを結びます。`schedule` は実行順序を表すスケジュール木、または
+    `"{ S[i] -> [i] }"` 形式のスケジュール写像です。依存が 1 つも無ければ None を返します。
+    """
+    domain = parse_union_set(iteration_domain, ctx)
+    read = parse_union_map(read_accesses, ctx).intersect_domain(domain)
+    write = parse_union_map(write_accesses, ctx).intersect_domain(domain)
+
+    raw = track(
+        "compute_flow",
+        _with_schedule(
+            isl.UnionAccessInfo.from_sink(read).set_must_source(write),
+            schedule,
+        ).compute_flow,
+    ).get_must_dependence()
+    war = track(
+        "compute_flow",
+        _with_schedule(
+            isl.UnionAccessInfo.from_sink(write).set_may_source(read).set_kill(write),
+            schedule,
+        ).compute_flow,
+    ).get_may_dependence()
+    waw = track(
+        "compute_flow",
+        _with_schedule(
+            isl.UnionAccessInfo.from_sink(write).set_must_source(write),
+            schedule,
+        ).compute_flow,
+    ).get_must_dependence()
+
+    if raw.is_empty() and war.is_empty() and waw.is_empty():
+        return None
+    return DataflowDependences(raw=raw, war=war, waw=waw)
+
 
+@instrumented
 def construct_flow_dependences(
     iteration_domain: str,
     read_accesses: str,
     write_accesses: str,
+    schedule: isl.Schedule | str | None = None,
+    ctx: isl.Context | None = None,
 ) -> isl.UnionMap | None:
     """
     読み／書きアクセス情報からフロー依存を `isl.UnionMap` として構築します。
 
+    `schedule` を渡した場合は `compute_dataflow_dependences` による値ベースの
+    RAW 依存（各読み出しの直前の書き込みのみ）を返します。
     依存が存在しない場合は None を返してください。
     """
-    read = isl.UnionMap(read_accesses)
-    write = isl.UnionMap(write_accesses)
-    deps = read.apply_range(write.reverse()).reverse()
+    if schedule is not None:
+        dataflow = compute_dataflow_dependences(
+            iteration_domain,
+            read_accesses,
+            write_accesses,
+            schedule,
+            ctx,
+        )
+        if dataflow is None or dataflow.raw.is_empty():
+            return None
+        return dataflow.raw
+
+    read = parse_union_map(read_accesses, ctx)
+    write = parse_union_map(write_accesses, ctx)
+    deps = track("apply_range", read.apply_range, write.reverse()).reverse()
     if deps.is_empty():
         return None
-    return deps.intersect_domain(isl.UnionSet(iteration_domain))
+    return track(
+        "intersect_domain", deps.intersect_domain, parse_union_set(iteration_domain, ctx)
+    )
+
 
+@dataclass(frozen=True)
+class AccessShard:
+    """
+    1 つの配列空間に対する読み書きアクセスです（プロセス間で渡せるよう文字列で保持します）。
+
+    `cost` はこのシャードの依存計算の重さの目安で、読み出し片数と書き込み片数の和に
+    書き込み片数と次元数を掛けたものです。
+    """
+
+    array: str
+    reads: str
+    writes: str
+    cost: int
+
+
+def _pieces_by_array(accesses: isl.UnionMap) -> dict[tuple[str, int], list[isl.Map]]:
+    """
+    ヘルパー: アクセス写像を配列（像のタプル名と次元数）ごとに分けます。
+
+    空間の文字列はパラメータの並びを含むため、パラメータを持つ側と持たない側で
+    同じ配列が別の鍵にならないよう、タプル名と次元数だけで区別します。
+    """
+    maps: list[isl.Map] = []
+    accesses.foreach_map(maps.append)
+    split: dict[tuple[str, int], list[isl.Map]] = {}
+    for access in maps:
+        key = (access.get_tuple_name(isl.dim_type.out) or "", access.dim(isl.dim_type.out))
+        split.setdefault(key, []).append(access)
+    return split
 
+
+def _union_of(maps: list[isl.Map]) -> isl.UnionMap:
+    """ヘルパー: 同じ配列への写像を 1 つの `UnionMap` にまとめます。"""
+    union = isl.UnionMap.from_map(maps[0])
+    for access in maps[1:]:
+        union = union.union(isl.UnionMap.from_map(access))
+    return union
+
+
+def _shard_cost(reads: list[isl.Map], writes: list[isl.Map]) -> int:
+    """ヘルパー: シャードの計算量を基本写像の数と次元数から見積もります。"""
+    n_reads = sum(access.n_basic_map() for access in reads)
+    n_writes = sum(access.n_basic_map() for access in writes)
+    dims = max(
+        access.dim(isl.dim_type.in_) + access.dim(isl.dim_type.out) for access in reads + writes
+    )
+    return (n_reads + n_writes) * n_writes * dims
+
+
+def shard_accesses_by_array(
+    read_accesses: str,
+    write_accesses: str,
+    ctx: isl.Context | None = None,
+) -> list[AccessShard]:
+    """
+    読み書きアクセスを配列空間ごとのシャードに分け、見積もりの重い順に返します。
+
+    読まれるだけ、または書かれるだけの配列はフロー依存を生まないため含めません。
+    """
+    reads = _pieces_by_array(parse_union_map(read_accesses, ctx))
+    writes = _pieces_by_array(parse_union_map(write_accesses, ctx))
+    shards = []
+    for key in reads.keys() & writes.keys():
+        shards.append(
+            AccessShard(
+                array=key[0],
+                reads=str(_union_of(reads[key])),
+                writes=str(_union_of(writes[key])),
+                cost=_shard_cost(reads[key], writes[key]),
+            )
+        )
+    shards.sort(key=lambda shard: (-shard.cost, shard.array))
+    return shards
+
+
+def _flow_shard(
+    iteration_domain: str,
+    reads: str,
+    writes: str,
+    schedule: str | None,
+    schedule_is_tree: bool,
+) -> str | None:
+    """ワーカー: 1 シャード分のフロー依存を文字列で返します。依存が無ければ None です。"""
+    if schedule is not None and schedule_is_tree:
+        schedule = isl.Schedule(schedule, context=current_context())
+    deps = construct_flow_dependences(iteration_domain, reads, writes, schedule)
+    return None if deps is None else str(deps)
+
+
+def construct_flow_dependences_sharded(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    schedule: isl.Schedule | str | None = None,
+    *,
+    backend: Backend = "process",
+    max_workers: int | None = None,
+    ctx: isl.Context | None = None,
+) -> isl.UnionMap | None:
+    """
+    `construct_flow_dependences` を配列ごとのシャードに分けて並列に計算します。
+
+    異なる配列を介した依存は互いに独立なので、アクセスを配列空間ごとに分け、各シャードの
+    依存をワーカーで求めてから `ctx` 上で合併します。シャードは見積もりの重い順に
+    投入するため、巨大な配列が 1 つあってもそれが最後に残って全体を待たせることは
+    ありません。結果は `construct_flow_dependences` と同じで、依存が無ければ None です。
+    """
+    ctx = resolve_context(ctx)
+    shards = shard_accesses_by_array(read_accesses, write_accesses, ctx)
+    if not shards:
+        return None
+    schedule_is_tree = isinstance(schedule, isl.Schedule)
+    schedule_text = None if schedule is None else str(schedule)
+
+    results = run_batch(
+        _flow_shard,
+        itertools.repeat(iteration_domain, len(shards)),
+        [shard.reads for shard in shards],
+        [shard.writes for shard in shards],
+        itertools.repeat(schedule_text, len(shards)),
+        itertools.repeat(schedule_is_tree, len(shards)),
+        backend=backend,
+        max_workers=max_workers,
+    )
+
+    merged: isl.UnionMap | None = None
+    for text in results:
+        if text is None:
+            continue
+        deps = isl.UnionMap(text, context=ctx)
+        merged = deps if merged is None else merged.union(deps)
+    return merged
+
+
+@instrumented
 def simplify_dependence_domain(dependences: isl.UnionMap) -> isl.UnionMap | None:
     """
     依存多面体を簡約（`coalesce` や `detect_equalities`）し、正規化します。
@@ -39,23 +281,241 @@ def simplify_dependence_domain(dependences: isl.UnionMap) -> isl.UnionMap | None
     if dependences.is_empty():
         return None
 
-    return dependences.coalesce().detect_equalities()
+    coalesced = track("coalesce", dependences.coalesce)
+    return track("detect_equalities", coalesced.detect_equalities)
+
 
+@dataclass(frozen=True)
+class BudgetedSimplification:
+    """
+    `simplify_dependence_domain_budgeted` の結果です。
 
-def compute_min_distance_vector(dependence: isl.Map) -> tuple[int, ...] | None:
+    `truncated` には演算回数上限で打ち切られたステップ名を、`fallbacks` には
+    代わりに適用できた安価な簡約のステップ名を実行順に格納します。
+    """
+
+    result: isl.UnionMap | None
+    truncated: tuple[str, ...] = ()
+    fallbacks: tuple[str, ...] = ()
+
+
+@instrumented
+def simplify_dependence_domain_budgeted(
+    dependences: isl.UnionMap,
+    max_operations: int,
+) -> BudgetedSimplification:
+    """
+    各簡約ステップを isl の演算回数上限 `max_operations` 付きで実行します。
+
+    `coalesce` が上限を超えた場合は安価な `remove_redundancies` を試し、それも
+    超えた場合は入力をそのまま次のステップへ渡します。`detect_equalities` が
+    上限を超えた場合はその直前の結果を返します。空集合の場合の結果は None です。
+    """
+    if dependences.is_empty():
+        return BudgetedSimplification(result=None)
+
+    truncated: list[str] = []
+    fallbacks: list[str] = []
+    current = dependences
+    ctx = dependences.get_ctx()
+
+    done, coalesced = run_with_budget(
+        lambda: track("coalesce", current.coalesce), max_operations, ctx
+    )
+    if done:
+        current = coalesced
+    else:
+        truncated.append("coalesce")
+        done, reduced = run_with_budget(
+            lambda: track("remove_redundancies", current.remove_redundancies),
+            max_operations,
+            ctx,
+        )
+        if done:
+            current = reduced
+            fallbacks.append("remove_redundancies")
+        else:
+            truncated.append("remove_redundancies")
+
+    done, detected = run_with_budget(
+        lambda: track("detect_equalities", current.detect_equalities), max_operations, ctx
+    )
+    if done:
+        current = detected
+    else:
+        truncated.append("detect_equalities")
+
+    return BudgetedSimplification(
+        result=current,
+        truncated=tuple(truncated),
+        fallbacks=tuple(fallbacks),
+    )
+
+
+@dataclass(frozen=True, order=True)
+class RelationSize:
+    """集合・写像の表現の大きさ（基本集合の数と制約の総数）です。比較は基本集合の数が優先です。"""
+
+    basic_sets: int
+    constraints: int
+
+
+@dataclass(frozen=True)
+class CompactionReport:
+    """
+    `compact_relation` の結果です。
+
+    `steps` は採用した表現を得るために適用した操作名を実行順に並べたもので、
+    入力がすでに最小だった場合は空です。
+    """
+
+    result: isl.UnionMap | isl.UnionSet
+    before: RelationSize
+    after: RelationSize
+    steps: tuple[str, ...]
+
+    @property
+    def removed_basic_sets(self) -> int:
+        return self.before.basic_sets - self.after.basic_sets
+
+    @property
+    def removed_constraints(self) -> int:
+        return self.before.constraints - self.after.constraints
+
+
+def _pieces(relation: isl.UnionMap | isl.UnionSet) -> list[isl.Map] | list[isl.Set]:
+    """ヘルパー: `UnionMap` / `UnionSet` を空間ごとの写像・集合のリストにします。"""
+    pieces: list = []
+    if isinstance(relation, isl.UnionMap):
+        relation.foreach_map(pieces.append)
+    else:
+        relation.foreach_set(pieces.append)
+    return pieces
+
+
+def relation_size(relation: isl.UnionMap | isl.UnionSet) -> RelationSize:
+    """`relation` を構成する基本集合（基本写像）の数と、それらの制約の総数を返します。"""
+    basic_sets = 0
+    constraints = 0
+    for piece in _pieces(relation):
+        parts = piece.get_basic_maps() if isinstance(piece, isl.Map) else piece.get_basic_sets()
+        basic_sets += len(parts)
+        constraints += sum(part.n_constraint() for part in parts)
+    return RelationSize(basic_sets, constraints)
+
+
+def _gist(
+    relation: isl.UnionMap | isl.UnionSet,
+    context: isl.UnionSet,
+) -> isl.UnionMap | isl.UnionSet:
+    """
+    ヘルパー: 各写像の定義域・値域（集合ならその集合）を、同じ空間の `context` に対して gist します。
+
+    `isl.UnionMap.gist_range` などは対応する空間が `context` に無い写像を落としてしまうため、
+    写像ごとに対応する部分を取り出して gist し、無ければそのまま残します。
+    """
+
+    def gist_set(piece: isl.Set, space: isl.Space) -> isl.Set:
+        known = context.extract_set(space)
+        return piece if known.is_empty() else piece.gist(known)
+
+    def gist_map(piece: isl.Map) -> isl.Map:
+        space = piece.get_space()
+        known = context.extract_set(space.domain())
+        if not known.is_empty():
+            piece = piece.gist_domain(known)
+        known = context.extract_set(space.range())
+        if not known.is_empty():
+            piece = piece.gist_range(known)
+        return piece
+
+    if isinstance(relation, isl.UnionMap):
+        result = isl.UnionMap.empty(relation.get_space())
+        for piece in _pieces(relation):
+            result = result.union(isl.UnionMap.from_map(gist_map(piece)))
+        return result
+    result = isl.UnionSet.empty(relation.get_space())
+    for piece in _pieces(relation):
+        result = result.union(isl.UnionSet.from_set(gist_set(piece, piece.get_space())))
+    return result
+
+
+_COMPACTION_PIPELINES: tuple[tuple[str, ...], ...] = (
+    ("coalesce",),
+    ("remove_redundancies",),
+    ("coalesce", "remove_redundancies"),
+    ("gist",),
+    ("gist", "coalesce"),
+    ("gist", "remove_redundancies"),
+    ("coalesce", "gist", "coalesce"),
+)
+
+
+@instrumented
+def compact_relation(
+    relation: isl.UnionMap | isl.UnionSet,
+    context: isl.UnionSet | str | None = None,
+) -> CompactionReport:
+    """
+    依存やスケジュールの表現を、基本集合の数、次に制約の数が最小になるものに置き換えます。
+
+    `coalesce` / `remove_redundancies` と、`context`（通常は反復領域）に対する gist を
+    組み合わせた候補を作り、最も小さいものを選びます。gist を使った結果は `context` の
+    内側でのみ入力と一致し、外側では制約が緩みます。写像の定義域と値域のうち
+    `context` に同じ空間の集合がある側が gist の対象です。そのため gist した依存と
+    スケジュールを `validate_schedule_legality` に渡すときは、同じ `context` を指定してください。
+    """
+    ctx = relation.get_ctx()
+    if isinstance(context, str):
+        context = parse_union_set(context, ctx)
+    steps_of = {
+        "coalesce": lambda rel: track("coalesce", rel.coalesce),
+        "remove_redundancies": lambda rel: track("remove_redundancies", rel.remove_redundancies),
+        "gist": lambda rel: track("gist", _gist, rel, context),
+    }
+
+    before = relation_size(relation)
+    best, best_size, best_steps = relation, before, ()
+    for pipeline in _COMPACTION_PIPELINES:
+        if context is None and "gist" in pipeline:
+            continue
+        # isl は coalesce などで入力の内部表現を書き換えることがあるため、コピーに適用します。
+        candidate = relation.copy()
+        for step in pipeline:
+            candidate = steps_of[step](candidate)
+        size = relation_size(candidate)
+        if (size, len(pipeline)) < (best_size, len(best_steps)):
+            best, best_size, best_steps = candidate, size, pipeline
+    return CompactionReport(result=best, before=before, after=best_size, steps=best_steps)
+
+
+@instrumented
+def compute_min_distance_vector(
+    dependence: isl.Map,
+    max_operations: int | None = None,
+) -> tuple[int, ...] | None:
     """
     単一依存写像から辞書式最小の距離ベクトル（整数タプル）を抽出します。
 
-    有効な点が存在しない場合は None を返してください。
+    有効な点が存在しない場合は None を返してください。`max_operations` を
+    指定した場合、isl の演算回数がそれを超えたときも None を返します。
     """
+    if max_operations is not None:
+        _, result = run_with_budget(
+            lambda: compute_min_distance_vector(dependence),
+            max_operations,
+            dependence.get_ctx(),
+        )
+        return result
+
     if dependence.is_empty():
         return None
 
-    deltas = dependence.deltas()
+    deltas = track("deltas", dependence.deltas)
     if deltas.is_empty():
         return None
 
-    point = deltas.lexmin().sample_point()
+    point = track("lexmin", deltas.lexmin).sample_point()
     space = point.get_space()
     dims = space.dim(isl.dim_type.set)
     return tuple(
@@ -64,25 +524,39 @@ def compute_min_distance_vector(dependence: isl.Map) -> tuple[int, ...] | None:
     )
 
 
+@instrumented
 def validate_schedule_legality(
     dependences: isl.UnionMap,
-    schedule: isl.Schedule | str,
+    schedule: isl.Schedule | isl.UnionMap | str,
+    max_operations: int | None = None,
+    context: isl.UnionSet | str | None = None,
 ) -> bool | None:
     """
     依存写像と候補スケジュールを照合し、合法性を真偽値で返します。
 
-    判定不能な場合は None を返してください。
+    判定不能な場合は None を返してください。`max_operations` を指定した場合、
+    isl の演算回数がそれを超えたときも判定不能として None を返します。
+    `context`（反復領域）を指定すると、スケジュールをその内側に制限してから
+    判定します。`compact_relation` で gist した依存・スケジュールを渡す場合に使います。
     """
-    theta = None
-    if isinstance(schedule, isl.Schedule):
-        theta = schedule.get_map()
-    elif isinstance(schedule, str):
-        theta = isl.UnionMap(schedule)
+    if max_operations is not None:
+        _, result = run_with_budget(
+            lambda: validate_schedule_legality(dependences, schedule, context=context),
+            max_operations,
+            dependences.get_ctx(),
+        )
+        return result
+
+    theta = _schedule_union_map(schedule, dependences.get_ctx())
+    if context is not None:
+        if isinstance(context, str):
+            context = parse_union_set(context, dependences.get_ctx())
+        theta = track("intersect_domain", theta.intersect_domain, context)
 
     # src -> time
-    theta_src = theta.intersect_domain(dependences.domain())
+    theta_src = track("intersect_domain", theta.intersect_domain, dependences.domain())
     # dst -> time
-    theta_dst = theta.intersect_domain(dependences.range())
+    theta_dst = track("intersect_domain", theta.intersect_domain, dependences.range())
 
     # dependences :: src -> dst
     # ほしいのは、src_time -> dst_time
@@ -92,23 +566,121 @@ def validate_schedule_legality(
     # src_time -> dstに dst -> dst_timeを合成すれば
     # src_time -> dst_timeになる。
     # apply_rangeは写像の合成と考えていい。
-    deps = theta_src.reverse().apply_range(dependences).apply_range(theta_dst)
+    deps = track("apply_range", theta_src.reverse().apply_range, dependences)
+    deps = track("apply_range", deps.apply_range, theta_dst)
+
+    verdict = _lexmin_delta_verdict(track("deltas", deps.deltas))
+    if verdict is None:
+        return None
+    return verdict[0]
+
+
+def _schedule_union_map(
+    schedule: isl.Schedule | isl.UnionMap | str,
+    ctx: isl.Context | None = None,
+) -> isl.UnionMap:
+    """ヘルパー: スケジュール木または文字列をスケジュール写像に変換します。"""
+    if isinstance(schedule, isl.Schedule):
+        return schedule.get_map()
+    if isinstance(schedule, isl.UnionMap):
+        return schedule
+    return parse_union_map(schedule, ctx)
 
-    deltas = deps.deltas()
 
+def _lexmin_delta_verdict(deltas: isl.UnionSet) -> tuple[bool, int | None] | None:
+    """
+    ヘルパー: 時刻差分の辞書式最小点から合法性と判定に使った次元を返します。
+
+    最初の非零座標が正なら合法、負なら違法です。全座標が 0 の場合はどの次元でも
+    依存が運ばれないため違法とし、次元は None とします。差分が空なら None を返します。
+    """
     if deltas.is_empty():
         return None
 
-    min_vec = deltas.lexmin()
-    point = min_vec.sample_point()
-    space = point.get_space()
-    dims = space.dim(isl.dim_type.set)
+    point = track("lexmin", deltas.lexmin).sample_point()
+    dims = point.get_space().dim(isl.dim_type.set)
 
     for i in range(dims):
         val = point.get_coordinate_val(isl.dim_type.set, i).to_python()
         if val < 0:
-            return False
+            return False, i
         if val > 0:
-            return True
+            return True, i
+
+    return False, None
+
+
+@dataclass(frozen=True)
+class LegalityReport:
+    """
+    `LegalityChecker.check` の結果です。
+
+    `legal` は `validate_schedule_legality` と同じく True/False/None を取ります。
+    違法な場合、`violated` に最初に違反した依存写像を、`dimension` に負の
+    （または全次元 0 の場合は None の）時刻差分が現れたスケジュール次元を格納します。
+    """
+
+    legal: bool | None
+    violated: isl.Map | None = None
+    dimension: int | None = None
+
 
-    return False
+class LegalityChecker:
+    """
+    固定された依存集合に対して多数の候補スケジュールの合法性を判定します。
+
+    依存を写像ごとに分解し、各写像の `domain()` / `range()` を構築時に一度だけ
+    計算しておきます。候補ごとの判定では写像を順に調べ、最初に違反した依存で
+    打ち切ります。
+    """
+
+    def __init__(self, dependences: isl.UnionMap):
+        self._ctx = dependences.get_ctx()
+        maps: list[isl.Map] = []
+        dependences.foreach_map(maps.append)
+        self._entries = [
+            (
+                dep,
+                isl.UnionMap.from_map(dep),
+                isl.UnionSet.from_set(dep.domain()),
+                isl.UnionSet.from_set(dep.range()),
+            )
+            for dep in maps
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check(self, schedule: isl.Schedule | str) -> LegalityReport:
+        """単一の候補スケジュールを判定します。"""
+        theta = _schedule_union_map(schedule, self._ctx)
+        decided = False
+        for dep, dep_union, src, dst in self._entries:
+            deps = (
+                theta.intersect_domain(src)
+                .reverse()
+                .apply_range(dep_union)
+                .apply_range(theta.intersect_domain(dst))
+            )
+            verdict = _lexmin_delta_verdict(deps.deltas())
+            if verdict is None:
+                continue
+            legal, dimension = verdict
+            if not legal:
+                return LegalityReport(legal=False, violated=dep, dimension=dimension)
+            decided = True
+        return LegalityReport(legal=True if decided else None)
+
+    def check_many(
+        self,
+        schedules: Iterable[isl.Schedule | str],
+    ) -> list[LegalityReport]:
+        """候補スケジュールを順に判定し、入力順の結果リストを返します。"""
+        return [self.check(schedule) for schedule in schedules]
+
+    def first_legal(self, schedules: Iterable[isl.Schedule | str]) -> int | None:
+        """最初に合法と判定された候補の添字を返します。見つからなければ None です。"""
+        for idx, schedule in enumerate(schedules):
+            if self.check(schedule).legal:
+                return idx
+        return None
@@ -4,27 +4,38 @@ Level 03 では、スケジュール木を直接操作するための問題群
 Level 01/02 と同様に、仕様はユニットテストで定義されています。ここでは
 問題の意図を明確化するため、関数本体をあえて未実装ではなく骨組みから書いて
 ありますが、必要に応じて isl の API を調べつつ読み進めてください。
+
+文字列を受け取る関数の `ctx` には、パースに使う isl コンテキストを渡せます（省略時は
+`contexts.current_context()`）。
 """
 
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Iterable
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Sequence
 
 import islpy as isl
 
+from .instrumentation import instrumented, track
+from .level02_dependence_analysis import LegalityChecker, compute_dataflow_dependences
+from .parse_cache import parse_union_map, parse_union_set
+from .schedule_tree import bands_by_statement, fused_sequence, tile_band
+
 
 def _all_indices_valid(indices: Iterable[int], size: int) -> bool:
     """ヘルパー: 指定された添字がバンドの次元範囲内かを検証します。"""
     raise NotImplementedError
 
 
+@instrumented
 def build_multiband_schedule(
     iteration_domain: str,
     schedule_map: str,
     split_at: int,
     outer_coincident: Iterable[int] = (),
     inner_coincident: Iterable[int] = (),
+    ctx: isl.Context | None = None,
 ) -> isl.Schedule | None:
     """
     与えられたスケジュール写像を multi-band 構成に変換し、coincident 指示子を設定します。
@@ -36,6 +47,7 @@ def build_multiband_schedule(
     raise NotImplementedError
 
 
+@instrumented
 def apply_band_tiling(
     schedule: isl.Schedule,
     band_path: Iterable[int],
@@ -47,14 +59,152 @@ def apply_band_tiling(
     `band_path` はルートから子ノードへ辿るインデックス列であり、対象ノードが
     バンドでない場合や、`tile_sizes` の長さがバンド次元と一致しない場合は None を返します。
     """
-    raise NotImplementedError
+    return tile_band(schedule, band_path, tuple(tile_sizes))
+
+
+@dataclass(frozen=True)
+class FusionPlan:
+    """
+    `plan_filter_fusion` が選んだフィルタのグループ分けです。
+
+    `groups` はフィルタの添字をグループごとにまとめたタプルで、元の順序を保ちます。
+    `score` は融合によって同じループに入った共有要素数の合計で、`group_scores` は
+    その内訳です（グループ 1 つにつき 1 要素）。
+    """
+
+    schedule: isl.Schedule
+    groups: tuple[tuple[int, ...], ...]
+    score: int
+    group_scores: tuple[int, ...]
+
+
+def _shift_time(schedule: isl.UnionMap, prefix: Sequence[int], suffix: Sequence[int]) -> isl.UnionMap:
+    """ヘルパー: スケジュール写像の時刻の前後に定数の次元を加えます。"""
+    maps: list[isl.Map] = []
+    schedule.foreach_map(maps.append)
+    if not maps:
+        return schedule
+    times = ", ".join(f"t{k}" for k in range(maps[0].dim(isl.dim_type.out)))
+    head = "".join(f"{value}, " for value in prefix)
+    tail = "".join(f", {value}" for value in suffix)
+    shift = isl.UnionMap(f"{{ [{times}] -> [{head}{times}{tail}] }}", context=schedule.get_ctx())
+    return schedule.apply_range(shift)
+
+
+def _footprint(accesses: isl.UnionMap, filter_: isl.UnionSet) -> isl.UnionSet:
+    """ヘルパー: フィルタ内のステートメントが触れる配列要素の集合です。"""
+    return accesses.intersect_domain(filter_).range()
+
+
+def _shared_elements(left: isl.UnionSet, right: isl.UnionSet) -> int:
+    """
+    ヘルパー: 2 つのフットプリントに共通する配列要素数を数えます。
+
+    パラメータを含むなど要素数が整数で求まらない配列は、共有があれば 1 と数えます。
+    """
+    sets: list[isl.Set] = []
+    left.intersect(right).foreach_set(sets.append)
+    shared = 0
+    for elements in sets:
+        if elements.is_empty():
+            continue
+        count = 0
+        if elements.dim(isl.dim_type.param) == 0:
+            value = track("count_val", elements.count_val)
+            if value.is_int():
+                count = value.to_python()
+        shared += max(count, 1)
+    return shared
+
+
+@instrumented
+def plan_filter_fusion(
+    iteration_domain: str,
+    schedule_map: str,
+    filters: Iterable[str],
+    read_accesses: str,
+    write_accesses: str,
+    min_reuse: int = 1,
+    ctx: isl.Context | None = None,
+) -> FusionPlan | None:
+    """
+    依存の合法性と配列の再利用量から、どのフィルタを同じループに融合するかを決めます。
+
+    `filters` の順序を元の実行順とみなし、先頭から貪欲にグループを伸ばします。次の
+    フィルタは、グループとの共有要素数が `min_reuse` 以上で、かつグループ内を融合しても
+    依存（RAW/WAR/WAW）に違反しない場合に限ってグループへ加え、そうでなければ新しい
+    グループを始めます。グループ間は元の順序のまま sequence で分割されるため、
+    グループをまたぐ依存は常に守られます。フィルタが 1 つも無い場合は None を返します。
+    """
+    filter_texts = list(filters)
+    if not filter_texts:
+        return None
+
+    domain = parse_union_set(iteration_domain, ctx)
+    theta = parse_union_map(schedule_map, ctx).intersect_domain(domain)
+    accesses = parse_union_map(read_accesses, ctx).union(parse_union_map(write_accesses, ctx))
+    filter_sets = [parse_union_set(text, ctx).intersect(domain) for text in filter_texts]
+
+    original = isl.UnionMap.empty(theta.get_space())
+    for idx, filter_ in enumerate(filter_sets):
+        original = original.union(_shift_time(theta.intersect_domain(filter_), (idx,), ()))
+    dataflow = compute_dataflow_dependences(
+        iteration_domain, read_accesses, write_accesses, str(original), ctx
+    )
+    dependences = dataflow.union() if dataflow is not None else None
+
+    def fusable(members: list[int]) -> bool:
+        if dependences is None:
+            return True
+        group = filter_sets[members[0]]
+        for idx in members[1:]:
+            group = group.union(filter_sets[idx])
+        local = dependences.intersect_domain(group).intersect_range(group)
+        if local.is_empty():
+            return True
+        fused = isl.UnionMap.empty(theta.get_space())
+        for position, idx in enumerate(members):
+            fused = fused.union(_shift_time(theta.intersect_domain(filter_sets[idx]), (), (position,)))
+        return LegalityChecker(local).check(str(fused)).legal is not False
+
+    groups: list[list[int]] = [[0]]
+    group_scores = [0]
+    footprint = _footprint(accesses, filter_sets[0])
+    for idx in range(1, len(filter_sets)):
+        candidate = _footprint(accesses, filter_sets[idx])
+        reuse = _shared_elements(footprint, candidate)
+        if reuse >= min_reuse and fusable(groups[-1] + [idx]):
+            groups[-1].append(idx)
+            group_scores[-1] += reuse
+            footprint = footprint.union(candidate)
+        else:
+            groups.append([idx])
+            group_scores.append(0)
+            footprint = candidate
+
+    schedule = fused_sequence(
+        iteration_domain,
+        schedule_map,
+        [[filter_texts[idx] for idx in group] for group in groups],
+        ctx,
+    )
+    return FusionPlan(
+        schedule=schedule,
+        groups=tuple(tuple(group) for group in groups),
+        score=sum(group_scores),
+        group_scores=tuple(group_scores),
+    )
 
 
+@instrumented
 def arrange_filters_with_strategy(
     iteration_domain: str,
     schedule_map: str,
     filters: Iterable[str],
     mode: str,
+    read_accesses: str | None = None,
+    write_accesses: str | None = None,
+    ctx: isl.Context | None = None,
 ) -> isl.Schedule | None:
     """
     ループの fusion/fission を制御するため、フィルタ列を与えてスケジュール木を構築します。
@@ -62,11 +212,21 @@ def arrange_filters_with_strategy(
     - mode が `"fusion"` の場合: フィルタを挟まず、単一のバンドにすべてのステートメントを配置します。
     - mode が `"fission"` の場合: `filters` で与えた順序に従って `insert_sequence` で分割し、
       それぞれに部分スケジュールを挿入します。
+    - mode が `"auto"` の場合: `read_accesses` / `write_accesses` を使って
+      `plan_filter_fusion` でグループを決め、そのスケジュールを返します。
     条件を満たせない場合は None を返します。
     """
+    if mode == "auto":
+        if read_accesses is None or write_accesses is None:
+            return None
+        plan = plan_filter_fusion(
+            iteration_domain, schedule_map, filters, read_accesses, write_accesses, ctx=ctx
+        )
+        return plan.schedule if plan is not None else None
     raise NotImplementedError
 
 
+@instrumented
 def collect_vectorization_candidates(
     schedule: isl.Schedule,
 ) -> dict[str, list[tuple[int, int]]]:
@@ -77,3 +237,176 @@ def collect_vectorization_candidates(
     同じ候補は重複しないよう正規化され、深さ順にソートされます。
     """
     raise NotImplementedError
+
+
+VECTOR_ACCESS_COSTS: dict[str, float] = {
+    "unit": 1.0,
+    "broadcast": 1.0,
+    "gather": 4.0,
+    "scatter": 8.0,
+    "reduction": 8.0,
+}
+"""SIMD 化したときの参照 1 つあたりの相対コストです（連続アクセスを 1 とします）。"""
+
+
+@dataclass(frozen=True)
+class AccessStride:
+    """
+    1 つの配列参照の、ベクトル化する次元に沿ったアクセスパターンです。
+
+    `kind` は `"unit"`（最内次元の連続アクセス）、`"broadcast"`（同じ要素の読み出し）、
+    `"reduction"`（同じ要素への書き込み。全レーンが 1 要素に集まるため、部分和と
+    最後の水平加算が必要です）、読み出しの `"gather"`、書き込みの `"scatter"` の
+    いずれかです。`delta` は
+    時刻を 1 進めたときの添字の差分で、一定でない場合は None です。
+    """
+
+    array: str
+    is_write: bool
+    kind: str
+    delta: tuple[int, ...] | None
+
+
+@dataclass(frozen=True)
+class VectorizationCandidate:
+    """`rank_vectorization_candidates` が評価した候補 1 つ分の結果です。"""
+
+    statement: str
+    depth: int
+    member: int
+    efficiency: float
+    accesses: tuple[AccessStride, ...]
+
+
+def _classify_delta(deltas: isl.Set, is_write: bool) -> tuple[str, tuple[int, ...] | None]:
+    """ヘルパー: 添字の差分集合から参照の種類と一定の差分ベクトルを求めます。"""
+    if deltas.is_empty():
+        return "broadcast", None
+    if not deltas.is_singleton():
+        return ("scatter" if is_write else "gather"), None
+    point = deltas.sample_point()
+    delta = tuple(
+        point.get_coordinate_val(isl.dim_type.set, i).to_python()
+        for i in range(deltas.dim(isl.dim_type.set))
+    )
+    if not any(delta):
+        return ("reduction" if is_write else "broadcast"), delta
+    if delta and abs(delta[-1]) == 1 and not any(delta[:-1]):
+        return "unit", delta
+    return ("scatter" if is_write else "gather"), delta
+
+
+def _statement_references(accesses: isl.UnionMap, is_write: bool) -> dict[str, list[tuple[isl.Map, bool]]]:
+    """ヘルパー: アクセス写像をステートメントごとの参照（基本写像）に分けます。"""
+    maps: list[isl.Map] = []
+    accesses.foreach_map(maps.append)
+    references: dict[str, list[tuple[isl.Map, bool]]] = defaultdict(list)
+    for access in maps:
+        for piece in access.get_basic_maps():
+            references[access.get_tuple_name(isl.dim_type.in_)].append(
+                (isl.Map.from_basic_map(piece), is_write)
+            )
+    return references
+
+
+def _statement_map(schedule: isl.UnionMap, statement: str) -> isl.Map | None:
+    """ヘルパー: スケジュール写像からステートメント `statement` の写像を取り出します。"""
+    maps: list[isl.Map] = []
+    schedule.foreach_map(maps.append)
+    for schedule_map in maps:
+        if schedule_map.get_tuple_name(isl.dim_type.in_) == statement:
+            return schedule_map
+    return None
+
+
+def _step_relation(node: isl.ScheduleNode, statement: str, member: int) -> isl.UnionMap | None:
+    """
+    ヘルパー: バンドのメンバー `member` だけを 1 進め、他の時刻次元を固定した反復の対応です。
+
+    外側の時刻はバンドの接頭スケジュール、内側はバンド以下の部分木のスケジュールから
+    取ります。対象のステートメントがバンドに含まれなければ None を返します。
+    """
+    prefix = node.get_prefix_schedule_union_map()
+    timeline = _statement_map(
+        prefix.flat_range_product(node.get_subtree_schedule_union_map()), statement
+    )
+    outer = _statement_map(prefix, statement)
+    if timeline is None or outer is None:
+        return None
+
+    position = outer.dim(isl.dim_type.out) + member
+    names = [f"t{k}" for k in range(timeline.dim(isl.dim_type.out))]
+    shifted = [f"{name} + 1" if k == position else name for k, name in enumerate(names)]
+    step = isl.Map(f"{{ [{', '.join(names)}] -> [{', '.join(shifted)}] }}", context=timeline.get_ctx())
+    return isl.UnionMap.from_map(timeline.apply_range(step).apply_range(timeline.reverse()))
+
+
+@instrumented
+def rank_vectorization_candidates(
+    schedule: isl.Schedule,
+    candidates: Mapping[str, Iterable[tuple[int, int]]],
+    read_accesses: str,
+    write_accesses: str,
+) -> list[VectorizationCandidate]:
+    """
+    SIMD 化の候補を、配列参照のストライドから見積もった効率の高い順に並べます。
+
+    `candidates` は `collect_vectorization_candidates` と同じ
+    `{ ステートメント名: [(バンド深さ, メンバー添字), ...] }` の辞書です。各候補について、
+    その時刻次元だけを 1 進めたときの各参照の添字の差分を求め、連続・ブロードキャスト・
+    縮約・gather/scatter に分類します。効率は参照数を `VECTOR_ACCESS_COSTS` のコストの合計で
+    割った値（0 より大きく 1 以下）で、同じ効率なら深い（内側の）次元を優先します。
+    対応するバンドが見つからない候補は結果に含めません。アクセスの文字列は
+    `schedule` と同じコンテキストでパースします。
+    """
+    ctx = schedule.get_ctx()
+    references = _statement_references(parse_union_map(read_accesses, ctx), False)
+    for statement, refs in _statement_references(parse_union_map(write_accesses, ctx), True).items():
+        references[statement].extend(refs)
+    bands = bands_by_statement(schedule)
+
+    ranked: list[VectorizationCandidate] = []
+    for statement, members in candidates.items():
+        for depth, member in sorted({(depth, member) for depth, member in members}):
+            node = bands.get((statement, depth))
+            if node is None or not 0 <= member < node.band_n_member():
+                continue
+            step = _step_relation(node, statement, member)
+            if step is None:
+                continue
+            strides = []
+            for access, is_write in references.get(statement, []):
+                pairs = step.apply_domain(isl.UnionMap.from_map(access)).apply_range(
+                    isl.UnionMap.from_map(access)
+                )
+                deltas = track("deltas", pairs.deltas)
+                delta_sets: list[isl.Set] = []
+                deltas.foreach_set(delta_sets.append)
+                delta_set = (
+                    delta_sets[0]
+                    if delta_sets
+                    else isl.Set.empty(access.range().get_space())
+                )
+                kind, delta = _classify_delta(delta_set, is_write)
+                strides.append(
+                    AccessStride(
+                        array=access.get_tuple_name(isl.dim_type.out),
+                        is_write=is_write,
+                        kind=kind,
+                        delta=delta,
+                    )
+                )
+            cost = sum(VECTOR_ACCESS_COSTS[stride.kind] for stride in strides)
+            efficiency = len(strides) / cost if strides else 1.0
+            ranked.append(
+                VectorizationCandidate(
+                    statement=statement,
+                    depth=depth,
+                    member=member,
+                    efficiency=efficiency,
+                    accesses=tuple(strides),
+                )
+            )
+
+    ranked.sort(key=lambda c: (-c.efficiency, -c.depth, -c.member, c.statement))
+    return ranked
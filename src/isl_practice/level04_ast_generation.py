@@ -0,0 +1,859 @@
+"""
+Level 04 では、スケジュール木から生成した AST を SIMD 向けに整える問題群を扱います。
+
+`apply_band_tiling` でタイル化したスケジュールは、タイルサイズが反復数を
+割り切らないと、点ループの上限に `min(...)` が入り、unroll した本体には端数用の
+`if` が混ざります。ここでは次の 3 段階でそれを取り除きます。
+
+1. `separate_full_tiles`: 全点が領域に収まる「完全タイル」を isl の `isolate`
+   オプションで分離し、完全タイル側の点ループを定数上限にします（Problem 4-1）。
+2. `unroll_point_loop`: 最内の点ループを因子 `factor` で strip-mine し、内側を
+   unroll します（Problem 4-2）。
+3. `simplify_ast`: isl の AST を小さな中間表現（`For` / `If` / `Block` / `User`）に
+   変換し、外側のループ範囲から区間で判定できる冗長な `if`、決着のつく
+   `min` / `max`、実行されないループや分岐をボトムアップに取り除きます（Problem 4-4）。
+
+完全タイルから条件分岐が消えるのは 1. の `isolate` によるもので、3. は isl の出力に
+残った冗長な分岐（unroll した端数タイルで外側の `if` と重複する条件など）を落とします。
+`generate_tiled_ast` はこれらを順に適用し、最内ループに含まれる条件分岐の数を
+最内ループごとと合計の両方で、処理の前後について報告します。islpy の AST ノードは `if` や `for` を組み立て直す API を
+持たないため、後処理は中間表現の上で行い、`to_c` で C の文字列に戻します。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Mapping, Sequence, Union
+
+import islpy as isl
+
+from .instrumentation import instrumented, track
+from .schedule_tree import band_multi_val, node_at, tile_band
+
+# --- 中間表現 -----------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Int:
+    value: int
+
+
+@dataclass(frozen=True)
+class Var:
+    name: str
+
+
+@dataclass(frozen=True)
+class Op:
+    """
+    演算です。`kind` は isl の `ast_expr_op_type` の名前（末尾の `_` を除いたもの）で、
+    ステートメント呼び出しは `"call"`（先頭の引数が関数名の `Var`）になります。
+    """
+
+    kind: str
+    args: tuple[Expr, ...]
+
+
+Expr = Union[Int, Var, Op]
+
+
+@dataclass(frozen=True)
+class For:
+    """`for (iterator = init; cond; iterator += inc) body` です。"""
+
+    iterator: str
+    init: Expr
+    cond: Expr
+    inc: int
+    body: Node
+
+
+@dataclass(frozen=True)
+class If:
+    cond: Expr
+    then: Node
+    else_: Node | None = None
+
+
+@dataclass(frozen=True)
+class Block:
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class User:
+    """ステートメントの呼び出し（`S(c0, c1)` など）です。"""
+
+    expr: Expr
+
+
+Node = Union[For, If, Block, User]
+
+_OP_KINDS: dict[object, str] = {
+    getattr(isl.ast_expr_op_type, name): name.rstrip("_")
+    for name in dir(isl.ast_expr_op_type)
+    if not name.startswith("_") and name != "error"
+}
+
+_COMPARISONS = {"eq", "le", "lt", "ge", "gt"}
+_CONDITIONAL_OPS = {"min", "max", "select", "cond"}
+
+
+def expr_from_isl(expr: isl.AstExpr) -> Expr:
+    """isl の AST 式を中間表現に変換します。"""
+    kind = expr.get_type()
+    if kind == isl.ast_expr_type.int:
+        return Int(expr.get_val().to_python())
+    if kind == isl.ast_expr_type.id:
+        return Var(expr.get_id().get_name())
+    args = tuple(expr_from_isl(expr.get_op_arg(k)) for k in range(expr.get_op_n_arg()))
+    return Op(_OP_KINDS[expr.get_op_type()], args)
+
+
+def ast_from_isl(node: isl.AstNode) -> Node:
+    """isl の AST ノードを中間表現に変換します。マークノードは中身だけを残します。"""
+    kind = node.get_type()
+    if kind == isl.ast_node_type.for_:
+        return For(
+            iterator=node.for_get_iterator().get_id().get_name(),
+            init=expr_from_isl(node.for_get_init()),
+            cond=expr_from_isl(node.for_get_cond()),
+            inc=node.for_get_inc().get_val().to_python(),
+            body=ast_from_isl(node.for_get_body()),
+        )
+    if kind == isl.ast_node_type.if_:
+        else_node = ast_from_isl(node.if_get_else_node()) if node.if_has_else_node() else None
+        return If(expr_from_isl(node.if_get_cond()), ast_from_isl(node.if_get_then_node()), else_node)
+    if kind == isl.ast_node_type.block:
+        children = node.block_get_children()
+        return Block(tuple(ast_from_isl(children.get_at(k)) for k in range(children.n_ast_node())))
+    if kind == isl.ast_node_type.mark:
+        return ast_from_isl(node.mark_get_node())
+    return User(expr_from_isl(node.user_get_expr()))
+
+
+@instrumented
+def build_ast(schedule: isl.Schedule, context: str = "{ : }") -> Node:
+    """スケジュール木から isl で AST を生成し、中間表現で返します。"""
+    build = isl.AstBuild.from_context(isl.Set(context, context=schedule.get_ctx()))
+    return ast_from_isl(track("node_from_schedule", build.node_from_schedule, schedule))
+
+
+# --- C への出力 ---------------------------------------------------------------
+
+_INFIX: dict[str, tuple[str, int]] = {
+    "or": ("||", 1),
+    "or_else": ("||", 1),
+    "and": ("&&", 2),
+    "and_then": ("&&", 2),
+    "eq": ("==", 4),
+    "le": ("<=", 4),
+    "lt": ("<", 4),
+    "ge": (">=", 4),
+    "gt": (">", 4),
+    "add": ("+", 5),
+    "sub": ("-", 5),
+    "mul": ("*", 6),
+    "div": ("/", 6),
+    "pdiv_q": ("/", 6),
+    "pdiv_r": ("%", 6),
+    "zdiv_r": ("%", 6),
+}
+_FUNCTIONS = {"min": "min", "max": "max", "fdiv_q": "floord"}
+_ASSOCIATIVE = frozenset({"add", "mul", "and", "or"})
+
+
+def _precedence(expr: Expr) -> int:
+    if isinstance(expr, Op):
+        if expr.kind in _INFIX:
+            return _INFIX[expr.kind][1]
+        if expr.kind == "minus":
+            return 7
+        if expr.kind in ("select", "cond"):
+            return 0
+    if isinstance(expr, Int) and expr.value < 0:
+        return 7
+    return 9
+
+
+def expr_to_c(expr: Expr) -> str:
+    """式を C の式として出力します。"""
+    if isinstance(expr, Int):
+        return str(expr.value)
+    if isinstance(expr, Var):
+        return expr.name
+    args = expr.args
+    if expr.kind in _INFIX:
+        symbol, prec = _INFIX[expr.kind]
+        left, right = expr_to_c(args[0]), expr_to_c(args[1])
+        if _precedence(args[0]) < prec:
+            left = f"({left})"
+        # 右オペランドの括弧を省けるのは、同じ結合的な演算が続く場合だけです
+        # （C の整数演算では `a * (b / c)` と `a * b / c` は値が異なります）。
+        associative = (
+            isinstance(args[1], Op) and args[1].kind == expr.kind and expr.kind in _ASSOCIATIVE
+        )
+        if _precedence(args[1]) <= prec and not associative:
+            right = f"({right})"
+        return f"{left} {symbol} {right}"
+    if expr.kind == "minus":
+        inner = expr_to_c(args[0])
+        return f"-{inner}" if _precedence(args[0]) > 7 else f"-({inner})"
+    if expr.kind in ("select", "cond"):
+        return f"({expr_to_c(args[0])} ? {expr_to_c(args[1])} : {expr_to_c(args[2])})"
+    if expr.kind == "access":
+        return expr_to_c(args[0]) + "".join(f"[{expr_to_c(a)}]" for a in args[1:])
+    name = _FUNCTIONS.get(expr.kind)
+    if name is None:
+        name, args = expr_to_c(args[0]), args[1:]
+    return f"{name}({', '.join(expr_to_c(a) for a in args)})"
+
+
+def _lines(node: Node | None, indent: int) -> list[str]:
+    pad = "  " * indent
+    if node is None:
+        return [f"{pad};"]
+    if isinstance(node, User):
+        return [f"{pad}{expr_to_c(node.expr)};"]
+    if isinstance(node, Block):
+        return [f"{pad}{{", *(line for child in node.children for line in _lines(child, indent + 1)), f"{pad}}}"]
+    if isinstance(node, For):
+        header = (
+            f"{pad}for (int {node.iterator} = {expr_to_c(node.init)}; "
+            f"{expr_to_c(node.cond)}; {node.iterator} += {node.inc})"
+        )
+        return _attach(header, node.body, indent)
+    lines = _attach(f"{pad}if ({expr_to_c(node.cond)})", node.then, indent)
+    if node.else_ is not None:
+        if lines[-1].strip() == "}":
+            lines[-1] += " else"
+            lines[-1:] = _attach(lines[-1], node.else_, indent)
+        else:
+            lines += _attach(f"{pad}else", node.else_, indent)
+    return lines
+
+
+def _attach(header: str, body: Node, indent: int) -> list[str]:
+    """ヘルパー: `for` / `if` の見出しに本体を続けます。ブロックは同じ行で開きます。"""
+    if isinstance(body, Block):
+        inner = [line for child in body.children for line in _lines(child, indent + 1)]
+        return [f"{header} {{", *inner, f"{'  ' * indent}}}"]
+    return [header, *_lines(body, indent + 1)]
+
+
+def to_c(node: Node | None) -> str:
+    """中間表現を C のループネストとして出力します。"""
+    return "\n".join(_lines(node, 0)) + "\n"
+
+
+# --- 区間による評価 -----------------------------------------------------------
+
+Interval = tuple[Union[int, None], Union[int, None]]
+Env = Mapping[str, Interval]
+_UNKNOWN: Interval = (None, None)
+_TRUE: Interval = (1, 1)
+_FALSE: Interval = (0, 0)
+
+
+def _add(a: Interval, b: Interval) -> Interval:
+    lo = None if a[0] is None or b[0] is None else a[0] + b[0]
+    hi = None if a[1] is None or b[1] is None else a[1] + b[1]
+    return lo, hi
+
+
+def _neg(a: Interval) -> Interval:
+    return (None if a[1] is None else -a[1], None if a[0] is None else -a[0])
+
+
+def _scale(a: Interval, factor: int) -> Interval:
+    lo = None if a[0] is None else a[0] * factor
+    hi = None if a[1] is None else a[1] * factor
+    return (lo, hi) if factor >= 0 else (hi, lo)
+
+
+def _floor_div(a: Interval, divisor: int) -> Interval:
+    return (
+        None if a[0] is None else a[0] // divisor,
+        None if a[1] is None else a[1] // divisor,
+    )
+
+
+def _constant(a: Interval) -> int | None:
+    return a[0] if a[0] is not None and a[0] == a[1] else None
+
+
+def _le(a: Interval, b: Interval) -> Interval:
+    """`a <= b` の真偽の区間です。"""
+    if a[1] is not None and b[0] is not None and a[1] <= b[0]:
+        return _TRUE
+    if a[0] is not None and b[1] is not None and a[0] > b[1]:
+        return _FALSE
+    return (0, 1)
+
+
+def _join(a: Interval, b: Interval) -> Interval:
+    lo = None if a[0] is None or b[0] is None else min(a[0], b[0])
+    hi = None if a[1] is None or b[1] is None else max(a[1], b[1])
+    return lo, hi
+
+
+def interval(expr: Expr, env: Env) -> Interval:
+    """
+    式の値が取り得る区間を返します。不明な端は None です。
+
+    比較や論理演算は真を 1、偽を 0 とした区間になります。
+    """
+    if isinstance(expr, Int):
+        return expr.value, expr.value
+    if isinstance(expr, Var):
+        return env.get(expr.name, _UNKNOWN)
+
+    kind = expr.kind
+    args = [interval(arg, env) for arg in expr.args] if kind != "call" else []
+    if kind == "add":
+        return _add(args[0], args[1])
+    if kind == "sub":
+        return _add(args[0], _neg(args[1]))
+    if kind == "minus":
+        return _neg(args[0])
+    if kind == "mul":
+        for value, other in ((_constant(args[0]), args[1]), (_constant(args[1]), args[0])):
+            if value is not None:
+                return _scale(other, value)
+        return _UNKNOWN
+    if kind in ("div", "pdiv_q", "fdiv_q"):
+        divisor = _constant(args[1])
+        return _floor_div(args[0], divisor) if divisor and divisor > 0 else _UNKNOWN
+    if kind in ("pdiv_r", "zdiv_r"):
+        divisor = _constant(args[1])
+        if not divisor or divisor <= 0:
+            return _UNKNOWN
+        if args[0][0] is not None and args[0][1] is not None and 0 <= args[0][0] and args[0][1] < divisor:
+            return args[0]
+        return (0 if kind == "pdiv_r" else 1 - divisor, divisor - 1)
+    if kind in ("min", "max"):
+        los = [a[0] for a in args]
+        his = [a[1] for a in args]
+        if kind == "min":
+            known = [h for h in his if h is not None]
+            return (None if None in los else min(los)), (min(known) if known else None)
+        known = [lo for lo in los if lo is not None]
+        return (max(known) if known else None), (None if None in his else max(his))
+    if kind in ("select", "cond"):
+        if args[0] == _TRUE:
+            return args[1]
+        if args[0] == _FALSE:
+            return args[2]
+        return _join(args[1], args[2])
+    if kind == "le":
+        return _le(args[0], args[1])
+    if kind == "lt":
+        return _le(_add(args[0], (1, 1)), args[1])
+    if kind == "ge":
+        return _le(args[1], args[0])
+    if kind == "gt":
+        return _le(_add(args[1], (1, 1)), args[0])
+    if kind == "eq":
+        if _constant(args[0]) is not None and args[0] == args[1]:
+            return _TRUE
+        if _le(args[0], args[1]) == _TRUE and _le(args[1], args[0]) == _TRUE:
+            return _TRUE
+        if _le(_add(args[0], (1, 1)), args[1]) == _TRUE or _le(_add(args[1], (1, 1)), args[0]) == _TRUE:
+            return _FALSE
+        return (0, 1)
+    if kind in ("and", "and_then"):
+        if all(a == _TRUE for a in args):
+            return _TRUE
+        return _FALSE if _FALSE in args else (0, 1)
+    if kind in ("or", "or_else"):
+        if _TRUE in args:
+            return _TRUE
+        return _FALSE if all(a == _FALSE for a in args) else (0, 1)
+    return _UNKNOWN
+
+
+# --- 後処理 ------------------------------------------------------------------
+
+
+def simplify_expr(expr: Expr, env: Env) -> Expr:
+    """
+    区間で決着のつく部分式を畳み込みます。
+
+    値が 1 点に定まる式は定数に、他方の引数を常に下回る（上回る）`min` / `max` の
+    引数は取り除きます。論理積・論理和は真偽の決まった項を落とします。
+    """
+    if not isinstance(expr, Op) or expr.kind == "call":
+        if isinstance(expr, Op):
+            return Op(expr.kind, (expr.args[0], *(simplify_expr(a, env) for a in expr.args[1:])))
+        value = _constant(interval(expr, env))
+        return Int(value) if value is not None else expr
+
+    args = tuple(simplify_expr(arg, env) for arg in expr.args)
+    expr = Op(expr.kind, args)
+    value = _constant(interval(expr, env))
+    if value is not None:
+        return Int(value)
+
+    if expr.kind in ("min", "max"):
+        bounds = [interval(arg, env) for arg in args]
+        keep = []
+        for idx, arg in enumerate(args):
+            dominated = any(
+                other != idx
+                and (
+                    _le(bounds[other], bounds[idx]) == _TRUE
+                    if expr.kind == "min"
+                    else _le(bounds[idx], bounds[other]) == _TRUE
+                )
+                and (bounds[other] != bounds[idx] or other < idx)
+                for other in range(len(args))
+            )
+            if not dominated:
+                keep.append(arg)
+        return keep[0] if len(keep) == 1 else Op(expr.kind, tuple(keep))
+    if expr.kind in ("and", "and_then", "or", "or_else"):
+        neutral = _TRUE if expr.kind.startswith("and") else _FALSE
+        keep = [arg for arg in args if interval(arg, env) != neutral]
+        if not keep:
+            return Int(neutral[0])
+        return keep[0] if len(keep) == 1 else Op(expr.kind, tuple(keep))
+    return expr
+
+
+def _refine(env: Env, cond: Expr) -> dict[str, Interval]:
+    """ヘルパー: `cond` が真であることを使って変数の区間を狭めます。"""
+    refined = dict(env)
+    if not isinstance(cond, Op):
+        return refined
+    if cond.kind in ("and", "and_then"):
+        for arg in cond.args:
+            refined = _refine(refined, arg)
+        return refined
+    if cond.kind not in _COMPARISONS:
+        return refined
+
+    left, right = cond.args
+    kind = cond.kind
+    if not isinstance(left, Var) and isinstance(right, Var):
+        left, right = right, left
+        kind = {"le": "ge", "lt": "gt", "ge": "le", "gt": "lt", "eq": "eq"}[kind]
+    if not isinstance(left, Var):
+        return refined
+
+    lo, hi = refined.get(left.name, _UNKNOWN)
+    bound = interval(right, refined)
+    if kind in ("le", "lt", "eq") and bound[1] is not None:
+        limit = bound[1] - (1 if kind == "lt" else 0)
+        hi = limit if hi is None else min(hi, limit)
+    if kind in ("ge", "gt", "eq") and bound[0] is not None:
+        limit = bound[0] + (1 if kind == "gt" else 0)
+        lo = limit if lo is None else max(lo, limit)
+    refined[left.name] = (lo, hi)
+    return refined
+
+
+def _loop_range(node: For, env: Env) -> Interval:
+    """ヘルパー: ループ変数の取り得る区間です。"""
+    lo = interval(node.init, env)[0]
+    hi = None
+    cond = node.cond
+    if isinstance(cond, Op) and cond.kind in ("le", "lt") and cond.args[0] == Var(node.iterator):
+        bound = interval(cond.args[1], env)[1]
+        if bound is not None:
+            hi = bound - (1 if cond.kind == "lt" else 0)
+    return lo, hi
+
+
+def simplify_ast(node: Node | None, env: Env | None = None) -> Node | None:
+    """
+    中間表現の AST をボトムアップに簡約します。
+
+    - 外側のループ範囲と `if` の条件から区間を求め、常に真の `if` は本体に、常に偽の
+      `if` は `else` 側（無ければ削除）に置き換えます。
+    - ループ境界やステートメント引数の `min` / `max` を区間で決着させます。
+    - 1 回も実行されないループと、空になったブロックを取り除きます。
+
+    `env` にはパラメータなど既知の変数の区間を渡せます。すべて消えた場合は None です。
+    """
+    env = dict(env or {})
+    if node is None:
+        return None
+    if isinstance(node, User):
+        return User(simplify_expr(node.expr, env))
+    if isinstance(node, Block):
+        children: list[Node] = []
+        for child in node.children:
+            simplified = simplify_ast(child, env)
+            if isinstance(simplified, Block):
+                children.extend(simplified.children)
+            elif simplified is not None:
+                children.append(simplified)
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else Block(tuple(children))
+    if isinstance(node, If):
+        cond = simplify_expr(node.cond, env)
+        truth = interval(cond, env)
+        if truth == _TRUE:
+            return simplify_ast(node.then, env)
+        if truth == _FALSE:
+            return simplify_ast(node.else_, env)
+        then = simplify_ast(node.then, _refine(env, cond))
+        else_ = simplify_ast(node.else_, env)
+        if then is None and else_ is None:
+            return None
+        if then is None:
+            return If(_negate(cond), else_)
+        return If(cond, then, else_)
+
+    outer = {name: bounds for name, bounds in env.items() if name != node.iterator}
+    cond = node.cond
+    if isinstance(cond, Op) and cond.kind in ("le", "lt") and cond.args[0] == Var(node.iterator):
+        cond = Op(cond.kind, (cond.args[0], simplify_expr(cond.args[1], outer)))
+    loop = replace(node, init=simplify_expr(node.init, outer), cond=cond)
+    lo, hi = _loop_range(loop, outer)
+    if lo is not None and hi is not None and lo > hi:
+        return None
+    body = simplify_ast(node.body, {**outer, node.iterator: (lo, hi)})
+    if body is None:
+        return None
+    return replace(loop, body=body)
+
+
+def _negate(cond: Expr) -> Expr:
+    """ヘルパー: 比較式の否定です。比較以外は `== 0` で表します。"""
+    flipped = {"le": "gt", "lt": "ge", "ge": "lt", "gt": "le"}
+    if isinstance(cond, Op) and cond.kind in flipped:
+        return Op(flipped[cond.kind], cond.args)
+    return Op("eq", (cond, Int(0)))
+
+
+# --- 計数 --------------------------------------------------------------------
+
+
+def _count_expr(expr: Expr) -> int:
+    if not isinstance(expr, Op):
+        return 0
+    own = 1 if expr.kind in _CONDITIONAL_OPS else 0
+    return own + sum(_count_expr(arg) for arg in expr.args)
+
+
+def _count_conditionals(node: Node | None) -> int:
+    """ヘルパー: 部分木に含まれる `if` と `min` / `max` / 三項演算子の数です。"""
+    if node is None:
+        return 0
+    if isinstance(node, User):
+        return _count_expr(node.expr)
+    if isinstance(node, Block):
+        return sum(_count_conditionals(child) for child in node.children)
+    if isinstance(node, If):
+        return 1 + _count_expr(node.cond) + _count_conditionals(node.then) + _count_conditionals(node.else_)
+    return _count_expr(node.init) + _count_expr(node.cond) + _count_conditionals(node.body)
+
+
+def _contains_loop(node: Node | None) -> bool:
+    if node is None or isinstance(node, User):
+        return False
+    if isinstance(node, For):
+        return True
+    if isinstance(node, Block):
+        return any(_contains_loop(child) for child in node.children)
+    return _contains_loop(node.then) or _contains_loop(node.else_)
+
+
+def innermost_loops(node: Node | None) -> list[For]:
+    """内側にループを含まないループを出現順に返します。"""
+    if node is None or isinstance(node, User):
+        return []
+    if isinstance(node, For):
+        return innermost_loops(node.body) if _contains_loop(node.body) else [node]
+    if isinstance(node, Block):
+        return [loop for child in node.children for loop in innermost_loops(child)]
+    return innermost_loops(node.then) + innermost_loops(node.else_)
+
+
+def innermost_conditionals(node: Node | None) -> tuple[int, ...]:
+    """最内ループごとに、境界式を含めて現れる `if` と `min` / `max` / 三項演算子の数を返します。"""
+    return tuple(_count_conditionals(loop) for loop in innermost_loops(node))
+
+
+# --- 実行 --------------------------------------------------------------------
+
+
+def _c_div(a: int, b: int) -> int:
+    quotient = abs(a) // abs(b)
+    return quotient if (a >= 0) == (b > 0) else -quotient
+
+
+def evaluate(expr: Expr, env: Mapping[str, int]) -> int:
+    """変数の値 `env` のもとで式を C の意味で評価します。"""
+    if isinstance(expr, Int):
+        return expr.value
+    if isinstance(expr, Var):
+        return env[expr.name]
+    kind = expr.kind
+    if kind in ("and_then", "or_else"):
+        first = evaluate(expr.args[0], env)
+        if bool(first) == (kind == "or_else"):
+            return int(bool(first))
+        return int(bool(evaluate(expr.args[1], env)))
+    if kind in ("select", "cond"):
+        branch = 1 if evaluate(expr.args[0], env) else 2
+        return evaluate(expr.args[branch], env)
+    args = [evaluate(arg, env) for arg in expr.args]
+    if kind == "add":
+        return args[0] + args[1]
+    if kind == "sub":
+        return args[0] - args[1]
+    if kind == "mul":
+        return args[0] * args[1]
+    if kind == "minus":
+        return -args[0]
+    if kind == "fdiv_q":
+        return args[0] // args[1]
+    if kind in ("div", "pdiv_q"):
+        return _c_div(args[0], args[1])
+    if kind in ("pdiv_r", "zdiv_r"):
+        return args[0] - args[1] * _c_div(args[0], args[1])
+    if kind == "min":
+        return min(args)
+    if kind == "max":
+        return max(args)
+    comparisons = {
+        "eq": lambda a, b: a == b,
+        "le": lambda a, b: a <= b,
+        "lt": lambda a, b: a < b,
+        "ge": lambda a, b: a >= b,
+        "gt": lambda a, b: a > b,
+    }
+    if kind in comparisons:
+        return int(comparisons[kind](args[0], args[1]))
+    if kind == "and":
+        return int(all(args))
+    if kind == "or":
+        return int(any(args))
+    raise ValueError(f"評価できない演算です: {kind}")
+
+
+def execute(node: Node | None, params: Mapping[str, int] | None = None) -> Iterator[tuple[str, tuple[int, ...]]]:
+    """
+    AST を解釈し、実行されるステートメント呼び出しを `(名前, 引数)` として順に生成します。
+
+    後処理の前後でステートメントの実行列が変わらないことを確かめるためのものです。
+    """
+    env = dict(params or {})
+
+    def run(current: Node | None) -> Iterator[tuple[str, tuple[int, ...]]]:
+        if current is None:
+            return
+        if isinstance(current, User):
+            call = current.expr
+            assert isinstance(call, Op) and isinstance(call.args[0], Var)
+            yield call.args[0].name, tuple(evaluate(arg, env) for arg in call.args[1:])
+        elif isinstance(current, Block):
+            for child in current.children:
+                yield from run(child)
+        elif isinstance(current, If):
+            yield from run(current.then if evaluate(current.cond, env) else current.else_)
+        else:
+            env[current.iterator] = evaluate(current.init, env)
+            while evaluate(current.cond, env):
+                yield from run(current.body)
+                env[current.iterator] += current.inc
+            del env[current.iterator]
+
+    return run(node)
+
+
+# --- スケジュール側の変換 -------------------------------------------------------
+
+
+def _statement_maps(union: isl.UnionMap) -> list[isl.Map]:
+    maps: list[isl.Map] = []
+    union.foreach_map(maps.append)
+    return maps
+
+
+def full_tiles(schedule: isl.Schedule, band_path: Iterable[int], tile_sizes: Sequence[int]) -> isl.Set | None:
+    """
+    `band_path` のタイルバンドについて、全ステートメントで完全なタイルの集合を返します。
+
+    タイルバンドの直下に点バンドがあり、点ループの値が `[0, tile_sizes[k])` に
+    収まること（`tile_band` の既定の出力）を前提にします。完全タイルとは、この
+    範囲のすべての点が反復領域に含まれるタイルです。前提を満たさなければ None です。
+    """
+    tile = node_at(schedule, band_path)
+    if tile is None or tile.get_type() != isl.schedule_node_type.band or tile.n_children() != 1:
+        return None
+    point = tile.get_child(0)
+    n_tile = tile.band_n_member()
+    if point.get_type() != isl.schedule_node_type.band or point.band_n_member() != n_tile:
+        return None
+    if len(tile_sizes) != n_tile:
+        return None
+
+    combined = tile.band_get_partial_schedule_union_map().flat_range_product(
+        point.band_get_partial_schedule_union_map()
+    ).intersect_domain(tile.get_domain())
+
+    names = [f"t{k}" for k in range(n_tile)] + [f"p{k}" for k in range(n_tile)]
+    box_text = " and ".join(f"0 <= p{k} < {size}" for k, size in enumerate(tile_sizes))
+    box = isl.Set(f"{{ [{', '.join(names)}] : {box_text} }}", context=schedule.get_ctx())
+
+    complete: isl.Set | None = None
+    partial: isl.Set | None = None
+    for piece in _statement_maps(combined):
+        image = piece.range()
+        tiles = image.project_out(isl.dim_type.set, n_tile, n_tile)
+        lifted = tiles.insert_dims(isl.dim_type.set, n_tile, n_tile)
+        aligned = box.align_params(image.get_space())
+        incomplete = (
+            track("subtract", lifted.intersect(aligned).subtract, image.align_params(aligned.get_space()))
+            .project_out(isl.dim_type.set, n_tile, n_tile)
+        )
+        complete = tiles if complete is None else complete.union(tiles.align_params(complete.get_space()))
+        partial = incomplete if partial is None else partial.union(incomplete.align_params(partial.get_space()))
+    if complete is None or partial is None:
+        return None
+    return complete.subtract(partial.align_params(complete.get_space())).coalesce()
+
+
+@instrumented
+def separate_full_tiles(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    tile_sizes: Sequence[int],
+) -> isl.Schedule | None:
+    """
+    タイルバンドに isl の `isolate` オプションを設定し、完全タイルを分離して生成させます。
+
+    完全タイル側では点ループの上限が定数になり、端数タイルだけに `min` が残ります。
+    `full_tiles` が None を返す場合（前提を満たさない場合）は None を返します。
+    """
+    band_path = tuple(band_path)
+    full = full_tiles(schedule, band_path, tile_sizes)
+    if full is None:
+        return None
+    tile = node_at(schedule, band_path)
+    outer = isl.Set.universe(isl.Space.set_alloc(schedule.get_ctx(), 0, tile.get_schedule_depth()))
+    isolate = (
+        isl.Map.from_domain_and_range(outer.align_params(full.get_space()), full)
+        .wrap()
+        .set_tuple_name("isolate")
+    )
+    options = tile.band_get_ast_build_options().union(isl.UnionSet.from_set(isolate))
+    return tile.band_set_ast_build_options(options).get_schedule()
+
+
+@instrumented
+def unroll_point_loop(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    factor: int,
+) -> isl.Schedule | None:
+    """
+    `band_path` のバンドの最内メンバーを `factor` で strip-mine し、内側を unroll します。
+
+    バンドが複数メンバーを持つ場合は最内メンバーを別バンドに分割してから処理します。
+    `factor` が 1 なら何もせず、対象がバンドでない、または `factor` が 1 未満なら None です。
+    """
+    node = node_at(schedule, band_path)
+    if node is None or node.get_type() != isl.schedule_node_type.band or factor < 1:
+        return None
+    if factor == 1:
+        return schedule
+    n_member = node.band_n_member()
+    if n_member > 1:
+        node = node.band_split(n_member - 1).get_child(0)
+    strip = node.band_tile(band_multi_val(node, [factor]))
+    return strip.get_child(0).band_member_set_ast_loop_type(0, isl.ast_loop_type.unroll).get_schedule()
+
+
+def parameter_bounds(context: isl.Set) -> dict[str, Interval]:
+    """コンテキスト集合からパラメータごとの値の区間を求めます。"""
+    n_param = context.dim(isl.dim_type.param)
+    names = [context.get_dim_name(isl.dim_type.param, k) for k in range(n_param)]
+    values = context.move_dims(isl.dim_type.set, 0, isl.dim_type.param, 0, n_param)
+    bounds: dict[str, Interval] = {}
+    for k, name in enumerate(names):
+        lo, hi = values.dim_min_val(k), values.dim_max_val(k)
+        bounds[name] = (
+            lo.to_python() if lo.is_int() else None,
+            hi.to_python() if hi.is_int() else None,
+        )
+    return bounds
+
+
+@dataclass(frozen=True)
+class TiledAst:
+    """
+    `generate_tiled_ast` の結果です。
+
+    `conditionals_before` は単純にタイル化しただけの AST、`conditionals_generated` は
+    完全タイルの分離と unroll の後に isl が生成した AST、`conditionals_after` は
+    後処理後の AST について、最内ループごとの条件分岐の数（`innermost_conditionals`）です。
+    完全タイルの分離で最内ループの数自体が変わるため、比較には `total_*` の合計を使います。
+    """
+
+    schedule: isl.Schedule
+    ast: Node | None
+    code: str
+    full_tiles: isl.Set
+    conditionals_before: tuple[int, ...]
+    conditionals_generated: tuple[int, ...]
+    conditionals_after: tuple[int, ...]
+
+    @property
+    def total_before(self) -> int:
+        """`conditionals_before` の合計です。"""
+        return sum(self.conditionals_before)
+
+    @property
+    def total_generated(self) -> int:
+        """`conditionals_generated` の合計です。"""
+        return sum(self.conditionals_generated)
+
+    @property
+    def total_after(self) -> int:
+        """`conditionals_after` の合計です。"""
+        return sum(self.conditionals_after)
+
+
+@instrumented
+def generate_tiled_ast(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    tile_sizes: Sequence[int],
+    unroll_factor: int = 1,
+    context: str = "{ : }",
+) -> TiledAst | None:
+    """
+    タイル化・完全タイルの分離・点ループの unroll・AST の後処理をまとめて適用します。
+
+    `band_path` のバンドを `tile_sizes` でタイル化できない場合や、unroll 因子が
+    1 未満の場合は None を返します。`context` はパラメータの制約で、後処理の区間にも使います。
+    """
+    band_path = tuple(band_path)
+    tile_sizes = tuple(tile_sizes)
+    tiled = tile_band(schedule, band_path, tile_sizes)
+    if tiled is None:
+        return None
+    separated = separate_full_tiles(tiled, band_path, tile_sizes)
+    if separated is None:
+        return None
+    transformed = unroll_point_loop(separated, band_path + (0,), unroll_factor)
+    if transformed is None:
+        return None
+
+    generated = build_ast(transformed, context)
+    env = parameter_bounds(isl.Set(context, context=schedule.get_ctx()))
+    simplified = simplify_ast(generated, env)
+    return TiledAst(
+        schedule=transformed,
+        ast=simplified,
+        code=to_c(simplified),
+        full_tiles=full_tiles(tiled, band_path, tile_sizes),
+        conditionals_before=innermost_conditionals(build_ast(tiled, context)),
+        conditionals_generated=innermost_conditionals(generated),
+        conditionals_after=innermost_conditionals(simplified),
+    )
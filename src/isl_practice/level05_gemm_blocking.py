@@ -0,0 +1,341 @@
+"""
+Level 05 では、Level 02–04 の道具を組み合わせた応用問題を扱います。
+
+ここでは Problem 5-2（GEMM のタイル化とレジスタブロッキング）として、
+`C[i, j] += A[i, k] * B[k, j]` 形のループから BLIS 流のスケジュール木を生成します。
+
+    [j / nc, k / kc, i / mc]   キャッシュ階層のタイル（L3 / L1 / L2 に対応）
+      [j / NR, i / MR]         マイクロタイル
+        [k]                    縮約次元（マイクロカーネルの外側）
+          [i, j]               MR x NR のレジスタブロック（unroll）
+
+isl 自体はレジスタ数やキャッシュ容量を知らないため、ブロッキング係数は
+`MachineModel` を入力とする簡単な解析モデルで選びます。
+
+- MR / NR: NR はベクトル幅の倍数とし、累積用の MR * NR / W 本と B 用の NR / W 本、
+  A のブロードキャスト用の 1 本がベクトルレジスタに収まるものだけを候補にします。
+  k 方向 1 ステップのサイクル数は、FMA のスループット、FMA のレイテンシ
+  （各累積レジスタは 1 ステップに 1 回しか更新できない）、ロードのスループットの
+  最大値で見積もります。
+- kc: A と B のマイクロパネル（(MR + NR) * kc 要素）が L1 に収まる最大値です。
+- mc: A のブロック（mc * kc 要素）が L2 に収まる最大の MR の倍数です。
+- nc: B のパネル（kc * nc 要素）が L3 に収まる最大の NR の倍数です。L3 が無ければ N です。
+
+予測コストは、端数タイルの無駄を含めた演算サイクルと、主記憶との転送サイクルの
+大きい方（両者は重なるものとします）です。
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+import islpy as isl
+
+from .instrumentation import instrumented
+from .parse_cache import parse_union_map, parse_union_set
+from .tile_autotuning import CacheCapacity
+
+
+@dataclass(frozen=True)
+class MachineModel:
+    """
+    コストモデルが使うマシンの記述です。既定値は AVX2 / FMA の x86 コア（単精度）です。
+
+    `vector_width` はベクトルレジスタ 1 本の要素数、`memory_bytes_per_cycle` は
+    主記憶の帯域です。要素のバイト数には `l1.element_bytes` を使います。
+    """
+
+    vector_width: int = 8
+    vector_registers: int = 16
+    fma_latency: int = 4
+    fma_per_cycle: int = 2
+    loads_per_cycle: int = 2
+    l1: CacheCapacity = field(default_factory=lambda: CacheCapacity(32 * 1024))
+    l2: CacheCapacity = field(default_factory=lambda: CacheCapacity(256 * 1024))
+    l3: CacheCapacity | None = field(default_factory=lambda: CacheCapacity(8 * 1024 * 1024))
+    memory_bytes_per_cycle: float = 8.0
+
+    @property
+    def element_bytes(self) -> int:
+        return self.l1.element_bytes
+
+
+@dataclass(frozen=True)
+class GemmShape:
+    """
+    `analyze_gemm` が見つけた GEMM の構造です。
+
+    `row` / `col` / `reduction` はステートメントの次元番号で、`col` は C の最後の
+    添字（連続方向）に現れる次元です。`extents` は (M, N, K) の反復数です。
+    """
+
+    statement: str
+    row: int
+    col: int
+    reduction: int
+    extents: tuple[int, int, int]
+    a: str
+    b: str
+    c: str
+
+
+@dataclass(frozen=True)
+class GemmBlocking:
+    """ブロッキング係数です。`mr` x `nr` がレジスタブロック、残りがキャッシュのタイルです。"""
+
+    mr: int
+    nr: int
+    kc: int
+    mc: int
+    nc: int
+
+
+@dataclass(frozen=True)
+class BlockingCost:
+    """
+    `estimate_cost` の結果です。
+
+    `efficiency` はマイクロカーネルが FMA のピークに対して達成する割合、`registers` は
+    マイクロカーネルが使うベクトルレジスタの本数です。
+    """
+
+    compute_cycles: float
+    memory_cycles: float
+    efficiency: float
+    registers: int
+
+    @property
+    def total(self) -> float:
+        return max(self.compute_cycles, self.memory_cycles)
+
+
+@dataclass(frozen=True)
+class MicroKernelCandidate:
+    """`generate_gemm_schedules` が返す、予測コスト付きのスケジュール候補です。"""
+
+    blocking: GemmBlocking
+    cost: BlockingCost
+    schedule: isl.Schedule
+
+
+def _coefficients(access: isl.Map, n_dims: int) -> list[set[int]] | None:
+    """
+    ヘルパー: アクセスの各添字が依存するステートメント次元の集合を返します。
+
+    添字がアフィン式で表せない場合は None です。
+    """
+    if not access.is_single_valued():
+        return None
+    pma = isl.PwMultiAff.from_map(access)
+    result = []
+    for out in range(access.dim(isl.dim_type.out)):
+        used: set[int] = set()
+
+        def collect(_: isl.Set, aff: isl.Aff) -> None:
+            used.update(
+                d for d in range(n_dims) if not aff.get_coefficient_val(isl.dim_type.in_, d).is_zero()
+            )
+
+        pma.get_pw_aff(out).foreach_piece(collect)
+        result.append(used)
+    return result
+
+
+def _accesses_by_array(accesses: isl.UnionMap) -> dict[str, isl.Map]:
+    """ヘルパー: アクセス写像を配列名ごとに分けます。"""
+    maps: list[isl.Map] = []
+    accesses.foreach_map(maps.append)
+    return {access.get_tuple_name(isl.dim_type.out): access for access in maps}
+
+
+@instrumented
+def analyze_gemm(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    ctx: isl.Context | None = None,
+) -> GemmShape | None:
+    """
+    単一ステートメントの 3 重ループが GEMM の形をしていれば、その構造を返します。
+
+    書き込みが 2 次元の配列 C へ 1 つだけあり、縮約次元以外の 2 次元で添字付け
+    されていること、読み出しに (row, reduction) で添字付けされる A と
+    (reduction, col) で添字付けされる B があることを確認します。
+    各次元の反復数が定数でない場合や、形が合わない場合は None です。
+    """
+    domains: list[isl.Set] = []
+    parse_union_set(iteration_domain, ctx).foreach_set(domains.append)
+    if len(domains) != 1 or domains[0].dim(isl.dim_type.set) != 3:
+        return None
+    domain = domains[0]
+    statement = domain.get_tuple_name()
+
+    writes = _accesses_by_array(parse_union_map(write_accesses, ctx))
+    if len(writes) != 1:
+        return None
+    c, write = next(iter(writes.items()))
+    c_index = _coefficients(write, 3)
+    if c_index is None or len(c_index) != 2 or any(len(used) != 1 for used in c_index):
+        return None
+    (row,), (col,) = c_index
+    if row == col:
+        return None
+    (reduction,) = {0, 1, 2} - {row, col}
+
+    a = b = None
+    for array, read in _accesses_by_array(parse_union_map(read_accesses, ctx)).items():
+        if array == c:
+            continue
+        index = _coefficients(read, 3)
+        if index is None:
+            continue
+        used = set().union(*index)
+        if used == {row, reduction}:
+            a = array
+        elif used == {reduction, col}:
+            b = array
+    if a is None or b is None:
+        return None
+
+    extents = []
+    for dim in (row, col, reduction):
+        lo, hi = domain.dim_min_val(dim), domain.dim_max_val(dim)
+        if not (lo.is_int() and hi.is_int()):
+            return None
+        extents.append(hi.to_python() - lo.to_python() + 1)
+    return GemmShape(statement, row, col, reduction, tuple(extents), a, b, c)
+
+
+def register_blockings(machine: MachineModel) -> list[tuple[int, int]]:
+    """ベクトルレジスタに収まる (MR, NR) の組をすべて返します。NR はベクトル幅の倍数です。"""
+    blockings = []
+    for vectors in range(1, machine.vector_registers):
+        for mr in range(1, machine.vector_registers):
+            if mr * vectors + vectors + 1 <= machine.vector_registers:
+                blockings.append((mr, vectors * machine.vector_width))
+    return blockings
+
+
+def _fit(capacity: float, per_unit: int, multiple: int, extent: int) -> int:
+    """ヘルパー: 容量に収まる最大の `multiple` の倍数を、`extent` の切り上げを上限に返します。"""
+    fitted = int(capacity // per_unit) // multiple * multiple
+    return max(multiple, min(fitted, math.ceil(extent / multiple) * multiple))
+
+
+def choose_cache_blocking(shape: GemmShape, machine: MachineModel, mr: int, nr: int) -> GemmBlocking:
+    """レジスタブロック `mr` x `nr` に対して、キャッシュ容量から kc / mc / nc を決めます。"""
+    m, n, k = shape.extents
+    size = machine.element_bytes
+    kc = max(1, min(k, int(machine.l1.usable_bytes // ((mr + nr) * size))))
+    mc = _fit(machine.l2.usable_bytes, kc * size, mr, m)
+    if machine.l3 is None:
+        nc = math.ceil(n / nr) * nr
+    else:
+        nc = _fit(machine.l3.usable_bytes, kc * size, nr, n)
+    return GemmBlocking(mr=mr, nr=nr, kc=kc, mc=mc, nc=nc)
+
+
+def estimate_cost(shape: GemmShape, blocking: GemmBlocking, machine: MachineModel) -> BlockingCost:
+    """ブロッキングの予測サイクル数を見積もります（モジュールの説明を参照）。"""
+    m, n, k = shape.extents
+    vectors = blocking.nr // machine.vector_width
+    accumulators = blocking.mr * vectors
+    peak = accumulators / machine.fma_per_cycle
+    cycles_per_step = max(
+        peak,
+        machine.fma_latency,
+        (vectors + blocking.mr) / machine.loads_per_cycle,
+    )
+    tiles = math.ceil(m / blocking.mr) * math.ceil(n / blocking.nr)
+    compute = tiles * k * cycles_per_step
+
+    a_traffic = m * k * math.ceil(n / blocking.nc)
+    b_traffic = k * n * (1 if machine.l3 is not None else math.ceil(m / blocking.mc))
+    c_traffic = 2 * m * n * math.ceil(k / blocking.kc)
+    memory = (a_traffic + b_traffic + c_traffic) * machine.element_bytes / machine.memory_bytes_per_cycle
+
+    return BlockingCost(
+        compute_cycles=compute,
+        memory_cycles=memory,
+        efficiency=peak / cycles_per_step,
+        registers=accumulators + vectors + 1,
+    )
+
+
+def gemm_microkernel_schedule(
+    iteration_domain: str,
+    shape: GemmShape,
+    blocking: GemmBlocking,
+    ctx: isl.Context | None = None,
+) -> isl.Schedule:
+    """
+    モジュールの説明にある 4 段のバンドを持つスケジュール木を作ります。
+
+    最内の MR x NR バンドは両メンバーを unroll に設定します。k は各 (i, j) について
+    昇順のまま実行されるため、縮約の依存は保たれます。
+    """
+    domain = parse_union_set(iteration_domain, ctx)
+    names = [f"x{d}" for d in range(3)]
+    i, j, k = names[shape.row], names[shape.col], names[shape.reduction]
+    b = blocking
+
+    def band(exprs: list[str]) -> isl.MultiUnionPwAff:
+        text = f"{{ {shape.statement}[{', '.join(names)}] -> [{', '.join(exprs)}] }}"
+        return isl.MultiUnionPwAff.from_union_map(
+            isl.UnionMap(text, context=domain.get_ctx()).intersect_domain(domain)
+        )
+
+    schedule = isl.Schedule.from_domain(domain)
+    for exprs in (
+        [i, j],
+        [k],
+        [f"floor({j}/{b.nr})", f"floor({i}/{b.mr})"],
+        [f"floor({j}/{b.nc})", f"floor({k}/{b.kc})", f"floor({i}/{b.mc})"],
+    ):
+        schedule = schedule.insert_partial_schedule(band(exprs))
+
+    micro = schedule.get_root().get_child(0).get_child(0).get_child(0).get_child(0)
+    for member in range(2):
+        micro = micro.band_member_set_ast_loop_type(member, isl.ast_loop_type.unroll)
+    return micro.get_schedule()
+
+
+@instrumented
+def generate_gemm_schedules(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    machine: MachineModel | None = None,
+    limit: int | None = 5,
+    ctx: isl.Context | None = None,
+) -> tuple[MicroKernelCandidate, ...] | None:
+    """
+    GEMM の候補スケジュールを、予測コストの小さい順に最大 `limit` 個返します。
+
+    すべての (MR, NR) についてキャッシュのブロッキングを決めてコストを見積もり、
+    予測コスト、転送サイクル、使うレジスタの本数、MR、NR の順で並べます。`limit` が None なら全候補です。
+    GEMM の形をしていない場合は None です。
+    """
+    machine = machine or MachineModel()
+    shape = analyze_gemm(iteration_domain, read_accesses, write_accesses, ctx)
+    if shape is None:
+        return None
+
+    ranked = []
+    for mr, nr in register_blockings(machine):
+        blocking = choose_cache_blocking(shape, machine, mr, nr)
+        ranked.append((blocking, estimate_cost(shape, blocking, machine)))
+    ranked.sort(
+        key=lambda item: (item[1].total, item[1].memory_cycles, item[1].registers, item[0].mr, item[0].nr)
+    )
+    if limit is not None:
+        ranked = ranked[:limit]
+    return tuple(
+        MicroKernelCandidate(
+            blocking=blocking,
+            cost=cost,
+            schedule=gemm_microkernel_schedule(iteration_domain, shape, blocking, ctx),
+        )
+        for blocking, cost in ranked
+    )
@@ -0,0 +1,151 @@
+"""
+Level 01–03 の公開関数を名前で呼び出すためのレジストリです。
+
+解析サーバー（`server.py`）やコマンドラインツールは、JSON で受け取った引数で
+各レベルの関数を呼び、結果を JSON に戻す必要があります。ここでは
+
+- 各モジュールの公開関数を `"level01.canonical_intersection"` のような名前で登録し、
+- 型注釈が isl のオブジェクトだけを受け付ける引数には、文字列からパースした値を渡し、
+- 戻り値の isl オブジェクトを文字列に、dataclass を辞書に変換します。
+
+`execute` は文字列と JSON 値だけを受け渡すため、プロセスプールのワーカーから
+そのまま呼び出せます。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import inspect
+import types
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Sequence
+
+import islpy as isl
+
+from . import level01_iteration_sets as lvl01
+from . import level02_dependence_analysis as lvl02
+from . import level03_scheduling as lvl03
+from .contexts import current_context
+
+_MODULES: dict[str, types.ModuleType] = {
+    "level01": lvl01,
+    "level02": lvl02,
+    "level03": lvl03,
+}
+
+_ISL_TYPES: tuple[type, ...] = (
+    isl.Set,
+    isl.Map,
+    isl.UnionSet,
+    isl.UnionMap,
+    isl.Schedule,
+)
+
+
+@dataclass(frozen=True)
+class Operation:
+    """登録済みの関数と、引数ごとのパース先の isl 型です。"""
+
+    name: str
+    func: Callable[..., Any]
+    parsers: dict[str, type]
+
+    @property
+    def doc(self) -> str:
+        return inspect.getdoc(self.func) or ""
+
+
+def _isl_parser(hint: object) -> type | None:
+    """
+    ヘルパー: 型注釈が `str` を受け付けず isl 型を受け付ける場合、その isl 型を返します。
+
+    `isl.Schedule | str` のように文字列も受け付ける引数は、関数側でパースするため対象外です。
+    """
+    options = typing.get_args(hint) if typing.get_origin(hint) in (typing.Union, types.UnionType) else (hint,)
+    if str in options:
+        return None
+    for option in options:
+        if option in _ISL_TYPES:
+            return option
+    return None
+
+
+def _public_functions(module: types.ModuleType) -> list[tuple[str, Callable[..., Any]]]:
+    functions = []
+    for name, obj in vars(module).items():
+        if name.startswith("_") or not inspect.isfunction(obj):
+            continue
+        if inspect.unwrap(obj).__module__ != module.__name__:
+            continue
+        functions.append((name, obj))
+    return functions
+
+
+def _build_registry() -> dict[str, Operation]:
+    registry = {}
+    for prefix, module in _MODULES.items():
+        for name, func in _public_functions(module):
+            hints = typing.get_type_hints(func)
+            parsers = {
+                param: parser
+                for param, hint in hints.items()
+                if param != "return" and (parser := _isl_parser(hint)) is not None
+            }
+            registry[f"{prefix}.{name}"] = Operation(f"{prefix}.{name}", func, parsers)
+    return registry
+
+
+REGISTRY: dict[str, Operation] = _build_registry()
+
+
+def list_operations() -> list[str]:
+    """登録済みの操作名をソートして返します。"""
+    return sorted(REGISTRY)
+
+
+def encode_result(value: object) -> object:
+    """戻り値を JSON で表せる値に変換します。isl のオブジェクトは文字列になります。"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: encode_result(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, Mapping):
+        return {str(k): encode_result(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [encode_result(v) for v in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _bind(operation: Operation, args: Sequence[object], kwargs: Mapping[str, object]):
+    bound = inspect.signature(operation.func).bind(*args, **kwargs)
+    for param, parser in operation.parsers.items():
+        value = bound.arguments.get(param)
+        if isinstance(value, str):
+            bound.arguments[param] = parser(value, context=current_context())
+    return bound
+
+
+def execute(
+    name: str,
+    args: Sequence[object] = (),
+    kwargs: Mapping[str, object] | None = None,
+) -> object:
+    """
+    操作 `name` を JSON の引数で呼び出し、JSON で表せる結果を返します。
+
+    未知の操作には `KeyError`、引数が合わない場合は `TypeError` を送出します。
+    関数自身が送出した例外はそのまま伝播します。
+    """
+    operation = REGISTRY.get(name)
+    if operation is None:
+        raise KeyError(f"未知の操作です: {name}")
+    bound = _bind(operation, args, kwargs or {})
+    return encode_result(operation.func(*bound.args, **bound.kwargs))
+
+
+def warm_up() -> None:
+    """ワーカーの初期化用: 現在のコンテキストとパーサーを一度動かしておきます。"""
+    isl.UnionSet("{ S[i] : 0 <= i < 1 }", context=current_context()).coalesce()
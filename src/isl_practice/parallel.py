@@ -0,0 +1,54 @@
+"""
+バッチ API が共有する実行バックエンドです。
+
+isl のオブジェクトは pickle できないため、プロセス間では必ず文字列表現を
+受け渡します。ワーカー関数はプロセスプールから参照できるよう、各モジュールの
+トップレベルに定義してください。
+
+`"thread"` バックエンドは各ワーカースレッドに専用の isl コンテキストを割り当てる
+`ContextThreadPool` を使います。スレッド間でも isl オブジェクトではなく文字列を
+受け渡してください。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, Literal, TypeVar
+
+from .contexts import ContextThreadPool
+
+_R = TypeVar("_R")
+
+Backend = Literal["serial", "thread", "process"]
+BACKENDS: tuple[str, ...] = ("serial", "thread", "process")
+
+
+def create_executor(backend: Backend, max_workers: int | None = None) -> Executor:
+    """`"thread"` / `"process"` に対応するプールを生成します。"""
+    if backend == "thread":
+        return ContextThreadPool(max_workers=max_workers)
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"未知のバックエンドです: {backend!r}")
+
+
+def run_batch(
+    func: Callable[..., _R],
+    *iterables: Iterable[object],
+    backend: Backend = "serial",
+    max_workers: int | None = None,
+    chunksize: int = 1,
+) -> list[_R]:
+    """
+    `func` を引数列に対して適用し、入力と同じ順序で結果を返します。
+
+    `chunksize` はプロセスプールへ一度に送るジョブ数です。スレッドプールでは
+    `concurrent.futures` の仕様どおり無視されます。
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize は 1 以上で指定してください")
+    if backend == "serial":
+        return list(map(func, *iterables))
+
+    with create_executor(backend, max_workers) as executor:
+        return list(executor.map(func, *iterables, chunksize=chunksize))
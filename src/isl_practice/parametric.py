@@ -0,0 +1,148 @@
+"""
+パラメータ（記号的なサイズ）付きの解析と、具体値ごとの特殊化キャッシュです。
+
+Level 01/02 の関数は `0 <= i < 4` のような具体的な境界を前提にしていますが、
+`[N, M] -> { ... }` 形式の領域を渡せば isl はパラメータを含んだまま解析できます。
+ここでは記号的な解析を 1 度だけ行い、その結果（区分的な集合・写像・アフィン関数）
+に具体的なパラメータ値を代入するだけで各テンソル形状の結果を得られるようにします。
+
+文字列を受け取る関数の `ctx` には、パースに使う isl コンテキストを渡せます（省略時は
+`contexts.current_context()`）。特殊化は記号的な結果と同じコンテキストで行います。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Union
+
+import islpy as isl
+
+from .level02_dependence_analysis import construct_flow_dependences
+from .parse_cache import parse_set
+
+Symbolic = Union[isl.Set, isl.Map, isl.UnionSet, isl.UnionMap, isl.PwMultiAff]
+Specialized = Union[isl.Set, isl.Map, isl.UnionSet, isl.UnionMap, tuple[int, ...], None]
+
+
+class ParametricResult:
+    """
+    記号的な解析結果と、パラメータ値ごとの特殊化結果の LRU キャッシュです。
+
+    `specialize(N=128, M=64)` は、集合・写像ならパラメータを固定して射影除去した
+    isl オブジェクトを、`isl.PwMultiAff`（辞書式最小点など）なら整数タプルを返します。
+    その具体値で集合・写像が空になる場合や、該当する点が無い場合は、どちらも
+    `construct_flow_dependences` と同じく None です。
+    """
+
+    def __init__(self, symbolic: Symbolic, max_entries: int = 128):
+        if max_entries <= 0:
+            raise ValueError("max_entries は正の値で指定してください")
+        self.symbolic = symbolic
+        self.params: tuple[str, ...] = tuple(
+            symbolic.get_space().get_var_names(isl.dim_type.param)
+        )
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple[int, ...], Specialized] = OrderedDict()
+
+    def specialize(self, **values: int) -> Specialized:
+        """全パラメータに具体値を与えて結果を取り出します。結果が空なら None です。"""
+        missing = set(self.params) - values.keys()
+        unknown = values.keys() - set(self.params)
+        if missing or unknown:
+            raise ValueError(
+                f"パラメータ指定が一致しません（不足: {sorted(missing)}, 未知: {sorted(unknown)}）"
+            )
+
+        key = tuple(values[name] for name in self.params)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        result = self._instantiate(key)
+        self._cache[key] = result
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
+
+    def _instantiate(self, key: tuple[int, ...]) -> Specialized:
+        if not self.params:
+            fixed = self.symbolic
+        else:
+            constraints = " and ".join(
+                f"{name} = {value}" for name, value in zip(self.params, key)
+            )
+            context = parse_set(
+                f"[{', '.join(self.params)}] -> {{ : {constraints} }}", self.symbolic.get_ctx()
+            )
+            fixed = self.symbolic.intersect_params(context)
+
+        if isinstance(fixed, isl.PwMultiAff):
+            points = isl.Set.from_pw_multi_aff(fixed)
+            if self.params:
+                points = points.project_out_all_params()
+            if points.is_empty():
+                return None
+            point = points.sample_point()
+            return tuple(
+                point.get_coordinate_val(isl.dim_type.set, i).to_python()
+                for i in range(points.dim(isl.dim_type.set))
+            )
+
+        if self.params:
+            fixed = fixed.project_out_all_params()
+        return None if fixed.is_empty() else fixed
+
+
+def parametric_flow_dependences(
+    iteration_domain: str,
+    read_accesses: str,
+    write_accesses: str,
+    schedule: isl.Schedule | str | None = None,
+    ctx: isl.Context | None = None,
+) -> ParametricResult | None:
+    """
+    パラメータ付きの領域・アクセスからフロー依存を記号的に 1 度だけ求めます。
+
+    引数の意味は `construct_flow_dependences` と同じです。依存が無ければ None を返します。
+    """
+    deps = construct_flow_dependences(
+        iteration_domain,
+        read_accesses,
+        write_accesses,
+        schedule=schedule,
+        ctx=ctx,
+    )
+    if deps is None:
+        return None
+    return ParametricResult(deps)
+
+
+def parametric_lexmin(domain: str, ctx: isl.Context | None = None) -> ParametricResult | None:
+    """
+    パラメータ付き領域の辞書式最小点を区分的アフィン関数（`isl.PwMultiAff`）で求めます。
+
+    領域がどのパラメータ値でも空なら None を返します。
+    """
+    domain_set = parse_set(domain, ctx)
+    if domain_set.is_empty():
+        return None
+    return ParametricResult(domain_set.lexmin_pw_multi_aff())
+
+
+def parametric_min_distance_vector(dependence: isl.Map) -> ParametricResult | None:
+    """
+    `compute_min_distance_vector` のパラメータ対応版です。
+
+    辞書式最小の距離ベクトルを区分的アフィン関数として保持し、`specialize` で
+    整数タプルを取り出します。依存が空なら None を返します。
+    """
+    if dependence.is_empty():
+        return None
+    deltas = dependence.deltas()
+    if deltas.is_empty():
+        return None
+    return ParametricResult(deltas.lexmin_pw_multi_aff())
@@ -0,0 +1,195 @@
+"""
+文字列から構築した isl オブジェクトを共有するための LRU キャッシュです。
+
+各レベルの関数は `isl.Set` や `isl.UnionMap` をテキストから毎回パースしますが、
+コンパイラのパイプラインでは同じ反復領域やアクセス関係が何度も渡されます。
+ここでは空白を正規化したテキストをキーにパース結果を保持し、エントリ数と
+おおよその制約数の両方で上限を設けて LRU で追い出します。
+
+islpy のオブジェクトは各メソッドが新しいオブジェクトを返すため、キャッシュから
+取り出した同一インスタンスを複数の呼び出し元で共有しても安全です。isl の
+オブジェクトは作成したコンテキストに属するため、キーにはコンテキストも含めます。
+コンテキストを省略した場合は `contexts.current_context()` を使います。
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TypeVar
+
+import islpy as isl
+
+from .contexts import resolve_context
+
+_T = TypeVar("_T", isl.Set, isl.Map, isl.UnionSet, isl.UnionMap)
+
+_SPACE_AROUND_SYMBOL = re.compile(r"\s*([^\w\s])\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    キャッシュキー用に isl のテキスト表現を正規化します。
+
+    記号の前後の空白を取り除き、残った連続空白を 1 文字にまとめます。
+    `and` などのキーワード間の空白は意味を持つため残します。
+    """
+    text = _SPACE_AROUND_SYMBOL.sub(r"\1", text.strip())
+    return _WHITESPACE.sub(" ", text)
+
+
+def count_constraints(obj: isl.Set | isl.Map | isl.UnionSet | isl.UnionMap) -> int:
+    """ヘルパー: オブジェクトに含まれる基本集合／基本写像の制約数の合計を返します。"""
+    if isinstance(obj, isl.UnionSet):
+        sets: list[isl.Set] = []
+        obj.foreach_set(sets.append)
+        return sum(count_constraints(s) for s in sets)
+    if isinstance(obj, isl.UnionMap):
+        maps: list[isl.Map] = []
+        obj.foreach_map(maps.append)
+        return sum(count_constraints(m) for m in maps)
+    if isinstance(obj, isl.Set):
+        return sum(bs.n_constraint() for bs in obj.get_basic_sets())
+    return sum(bm.n_constraint() for bm in obj.get_basic_maps())
+
+
+@dataclass(frozen=True)
+class ParseCacheStats:
+    """キャッシュの利用状況のスナップショットです。"""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    constraints: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ParseCache:
+    """
+    正規化済みテキスト → パース済み isl オブジェクトの LRU キャッシュです。
+
+    `max_entries` はエントリ数の上限、`max_constraints` は保持中オブジェクトの
+    制約数合計の上限です。単体で `max_constraints` を超えるオブジェクトは
+    キャッシュせずにそのまま返します。
+    """
+
+    def __init__(self, max_entries: int = 1024, max_constraints: int = 100_000):
+        if max_entries <= 0 or max_constraints <= 0:
+            raise ValueError("キャッシュの上限は正の値で指定してください")
+        self.max_entries = max_entries
+        self.max_constraints = max_constraints
+        self.enabled = True
+        # 値にはコンテキストも保持し、エントリが残っている間に id が再利用されないようにします。
+        self._entries: OrderedDict[
+            tuple[type, int, str], tuple[object, int, isl.Context]
+        ] = OrderedDict()
+        self._constraints = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind: type[_T], text: str, ctx: isl.Context | None = None) -> _T:
+        """`kind` 型として `text` をコンテキスト `ctx` でパースし、キャッシュ済みならそれを返します。"""
+        ctx = resolve_context(ctx)
+        if not self.enabled:
+            return kind(text, context=ctx)
+
+        key = (kind, id(ctx), normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        obj = kind(text, context=ctx)
+        cost = count_constraints(obj)
+        if cost > self.max_constraints:
+            return obj
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (obj, cost, ctx)
+                self._constraints += cost
+                self._evict()
+        return obj
+
+    def _evict(self) -> None:
+        while (
+            len(self._entries) > self.max_entries
+            or self._constraints > self.max_constraints
+        ):
+            _, (_, cost, _) = self._entries.popitem(last=False)
+            self._constraints -= cost
+            self._evictions += 1
+
+    def resize(
+        self,
+        max_entries: int | None = None,
+        max_constraints: int | None = None,
+    ) -> None:
+        """上限を変更し、超過分を直ちに追い出します。"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_constraints is not None:
+                self.max_constraints = max_constraints
+            self._evict()
+
+    def clear(self) -> None:
+        """全エントリと統計情報を破棄します。"""
+        with self._lock:
+            self._entries.clear()
+            self._constraints = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> ParseCacheStats:
+        with self._lock:
+            return ParseCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                constraints=self._constraints,
+            )
+
+
+_DEFAULT_CACHE = ParseCache()
+
+
+def get_parse_cache() -> ParseCache:
+    """全レベルの関数が共有する既定のキャッシュを返します。"""
+    return _DEFAULT_CACHE
+
+
+def set_parse_cache_enabled(enabled: bool) -> None:
+    """共有キャッシュの有効／無効を切り替えます。無効化時は保持内容も破棄します。"""
+    _DEFAULT_CACHE.enabled = enabled
+    if not enabled:
+        _DEFAULT_CACHE.clear()
+
+
+def parse_set(text: str, ctx: isl.Context | None = None) -> isl.Set:
+    return _DEFAULT_CACHE.get(isl.Set, text, ctx)
+
+
+def parse_map(text: str, ctx: isl.Context | None = None) -> isl.Map:
+    return _DEFAULT_CACHE.get(isl.Map, text, ctx)
+
+
+def parse_union_set(text: str, ctx: isl.Context | None = None) -> isl.UnionSet:
+    return _DEFAULT_CACHE.get(isl.UnionSet, text, ctx)
+
+
+def parse_union_map(text: str, ctx: isl.Context | None = None) -> isl.UnionMap:
+    return _DEFAULT_CACHE.get(isl.UnionMap, text, ctx)
@@ -0,0 +1,141 @@
+"""
+スケジュール木を扱う横断的なヘルパーです。
+
+Level 03 の関数は演習として骨組みのまま残してあるため、オートチューナや
+コード生成など Level 03 の上に乗る機能は、ここにある最小限の操作だけを使って
+スケジュール木を組み立て・変形します。
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+import islpy as isl
+
+from .parse_cache import parse_union_map, parse_union_set
+
+
+def schedule_from_map(
+    iteration_domain: str,
+    schedule_map: str,
+    ctx: isl.Context | None = None,
+) -> isl.Schedule:
+    """
+    反復領域とスケジュール写像から、単一バンドを持つスケジュール木を作ります。
+
+    `schedule_map` の全ステートメントは同じ次元数の時刻空間へ写す必要があります。
+    """
+    domain = parse_union_set(iteration_domain, ctx)
+    theta = parse_union_map(schedule_map, ctx).intersect_domain(domain)
+    partial = isl.MultiUnionPwAff.from_union_map(theta)
+    return isl.Schedule.from_domain(domain).insert_partial_schedule(partial)
+
+
+def node_at(schedule: isl.Schedule, path: Iterable[int]) -> isl.ScheduleNode | None:
+    """ルートから子ノードの添字列 `path` を辿ったノードを返します。辿れなければ None です。"""
+    node = schedule.get_root()
+    for idx in path:
+        if idx < 0 or idx >= node.n_children():
+            return None
+        node = node.get_child(idx)
+    return node
+
+
+def band_multi_val(node: isl.ScheduleNode, values: Sequence[int]) -> isl.MultiVal:
+    """バンドの空間上に `values` を並べた `isl.MultiVal` を作ります。"""
+    mv = isl.MultiVal.zero(node.band_get_space())
+    ctx = node.get_ctx()
+    for idx, value in enumerate(values):
+        mv = mv.set_val(idx, isl.Val.int_from_si(ctx, value))
+    return mv
+
+
+def tile_band(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    tile_sizes: Sequence[int],
+) -> isl.Schedule | None:
+    """
+    `band_path` のバンドを `tile_sizes` でタイル化したスケジュールを返します。
+
+    対象がバンドでない、またはサイズの個数がバンド次元と一致しない場合は None です。
+    """
+    node = node_at(schedule, band_path)
+    if node is None or node.get_type() != isl.schedule_node_type.band:
+        return None
+    if len(tile_sizes) != node.band_n_member() or any(size <= 0 for size in tile_sizes):
+        return None
+    return node.band_tile(band_multi_val(node, tile_sizes)).get_schedule()
+
+
+def _insert_sequence(node: isl.ScheduleNode, filters: Sequence[isl.UnionSet]) -> isl.ScheduleNode:
+    """ヘルパー: `node` に `filters` の順の sequence を挿入し、sequence ノードを返します。"""
+    domain = node.get_domain()
+    children = isl.UnionSetList.alloc(node.get_ctx(), len(filters))
+    for filter_ in filters:
+        children = children.add(filter_.intersect(domain))
+    return node.insert_sequence(children)
+
+
+def fused_sequence(
+    iteration_domain: str,
+    schedule_map: str,
+    groups: Sequence[Sequence[str]],
+    ctx: isl.Context | None = None,
+) -> isl.Schedule:
+    """
+    フィルタのグループ列から、グループ間を分割しグループ内を融合したスケジュール木を作ります。
+
+    グループが複数なら外側に sequence を置き、各グループは `schedule_map` の単一バンドに
+    まとめます。グループ内に複数のフィルタがある場合は、バンドの下に sequence を置いて
+    同じ時刻の反復をフィルタの順に実行します。グループとフィルタが 1 つずつなら
+    `schedule_from_map` と同じ単一バンドの木になります。
+    """
+    domain = parse_union_set(iteration_domain, ctx)
+    theta = isl.MultiUnionPwAff.from_union_map(
+        parse_union_map(schedule_map, ctx).intersect_domain(domain)
+    )
+    members = [[parse_union_set(filter_, ctx) for filter_ in group] for group in groups]
+
+    def fuse(leaf: isl.ScheduleNode, filters: list[isl.UnionSet]) -> isl.ScheduleNode:
+        band = leaf.insert_partial_schedule(theta.intersect_domain(leaf.get_domain()))
+        if len(filters) > 1:
+            band = _insert_sequence(band.get_child(0), filters).parent()
+        return band
+
+    node = isl.Schedule.from_domain(domain).get_root().get_child(0)
+    if len(members) == 1:
+        return fuse(node, members[0]).get_schedule()
+
+    unions = []
+    for filters in members:
+        union = filters[0]
+        for filter_ in filters[1:]:
+            union = union.union(filter_)
+        unions.append(union)
+    node = _insert_sequence(node, unions)
+    for idx, filters in enumerate(members):
+        node = fuse(node.get_child(idx).get_child(0), filters).parent().parent()
+    return node.get_schedule()
+
+
+def bands_by_statement(schedule: isl.Schedule) -> dict[tuple[str, int], isl.ScheduleNode]:
+    """
+    各ステートメントについて、ルートから数えた深さごとのバンドノードを返します。
+
+    キーは `(ステートメント名, バンド深さ)` で、深さはそのステートメントの経路上に
+    あるバンドだけを数えます（sequence やフィルタは数えません）。
+    """
+    found: dict[tuple[str, int], isl.ScheduleNode] = {}
+    stack = [(schedule.get_root(), 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node.get_type() == isl.schedule_node_type.band:
+            names: list[str] = []
+            node.get_domain().foreach_set(lambda s: names.append(s.get_tuple_name()))
+            for name in names:
+                found[(name, depth)] = node
+            depth += 1
+        for idx in range(node.n_children()):
+            stack.append((node.get_child(idx), depth))
+    return found
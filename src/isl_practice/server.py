@@ -0,0 +1,191 @@
+"""
+Level 01–03 の関数を提供する、常駐型のローカル解析サーバーです。
+
+フロントエンドがカーネルごとに Python を起動すると、毎回 islpy の import と isl
+コンテキストの初期化に数百ミリ秒を払うことになります。このサーバーは asyncio で
+Unix ソケットまたは標準入出力を待ち受け、1 行 1 JSON のプロトコルで
+`operations.REGISTRY` の関数を呼び出します。
+
+    リクエスト: {"id": 1, "op": "level01.canonical_intersection", "args": [...], "kwargs": {...}}
+    レスポンス: {"id": 1, "ok": true, "result": ...}
+                {"id": 1, "ok": false, "error": {"type": "KeyError", "message": "..."}}
+
+組み込みの操作として `ping`、`operations`（操作名の一覧）、`stats` があります。
+1 つの接続で複数のリクエストを続けて送ることができ、レスポンスは完了順に返ります。
+
+既定では常駐するプロセスプールで関数を実行します。各ワーカーは isl の既定
+コンテキストとパースキャッシュを保持し続けるため、2 回目以降の呼び出しは温まった
+状態で処理されます。`"thread"` ではワーカースレッドごとに専用の isl コンテキストを
+持つ `ContextThreadPool` で実行し、`"serial"` ではイベントループ上で直接実行します。
+
+    python -m src.isl_practice.server --socket /tmp/isl.sock --workers 4
+    python -m src.isl_practice.server --stdio
+
+`main` は SIGINT と SIGTERM のどちらを受けても待ち受けを止め、プロセスプールを
+閉じてから終了します。ワーカーを残したまま親だけが終了することはありません。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+from concurrent.futures import Executor
+from typing import Any, Coroutine
+
+from . import operations
+from .parallel import Backend, create_executor
+
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class AnalysisServer:
+    """JSON リクエストを `operations.execute` に振り分けるサーバーです。"""
+
+    def __init__(self, backend: Backend = "process", max_workers: int | None = None):
+        self.backend = backend
+        self._executor: Executor | None = None
+        if backend != "serial":
+            self._executor = create_executor(backend, max_workers)
+            # ワーカーを先に起動しておき、最初のリクエストで起動コストを払わないようにします。
+            workers = max_workers or os.cpu_count() or 1
+            for future in [self._executor.submit(operations.warm_up) for _ in range(workers)]:
+                future.result()
+        self.requests = 0
+        self.errors = 0
+
+    async def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        """1 件のリクエストを処理し、レスポンスの辞書を返します。"""
+        request_id = request.get("id")
+        self.requests += 1
+        try:
+            result = await self._call(
+                request["op"], request.get("args", []), request.get("kwargs", {})
+            )
+        except Exception as error:  # noqa: BLE001 - 例外はクライアントへ返す
+            self.errors += 1
+            return {
+                "id": request_id,
+                "ok": False,
+                "error": {"type": type(error).__name__, "message": str(error)},
+            }
+        return {"id": request_id, "ok": True, "result": result}
+
+    async def _call(self, op: str, args: list[Any], kwargs: dict[str, Any]) -> object:
+        if op == "ping":
+            return "pong"
+        if op == "operations":
+            return operations.list_operations()
+        if op == "stats":
+            return {"requests": self.requests, "errors": self.errors, "backend": self.backend}
+        if self._executor is None:
+            return operations.execute(op, args, kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, operations.execute, op, args, kwargs)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """1 つの接続を処理します。各リクエストは並行に実行します。"""
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def respond(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("リクエストは JSON オブジェクトで送ってください")
+            except ValueError as error:
+                self.errors += 1
+                response = {
+                    "id": None,
+                    "ok": False,
+                    "error": {"type": "ProtocolError", "message": str(error)},
+                }
+            else:
+                response = await self.dispatch(request)
+            payload = json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+            async with lock:
+                writer.write(payload)
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def serve_unix(self, path: str) -> None:
+        """Unix ソケット `path` で待ち受けます（既存のソケットファイルは置き換えます）。"""
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self.handle, path=path, limit=STREAM_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self) -> None:
+        """標準入力からリクエストを読み、標準出力へレスポンスを書きます。"""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, sys.stdout
+        )
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.handle(reader, writer)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+async def _serve_until_terminated(serve: Coroutine[Any, Any, None]) -> None:
+    """ヘルパー: `serve` を実行し、SIGTERM を受けたら取り消して正常に戻ります。"""
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    serving = asyncio.ensure_future(serve)
+    loop.add_signal_handler(signal.SIGTERM, lambda: stop.done() or stop.set_result(None))
+    try:
+        await asyncio.wait({serving, stop}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        if not serving.done():
+            serving.cancel()
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+    if not serving.cancelled():
+        serving.result()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="isl_practice の常駐解析サーバー")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument("--socket", help="待ち受ける Unix ソケットのパス")
+    transport.add_argument("--stdio", action="store_true", help="標準入出力で通信する")
+    parser.add_argument("--backend", choices=("process", "thread", "serial"), default="process")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = AnalysisServer(backend=args.backend, max_workers=args.workers)
+    try:
+        serve = server.serve_stdio() if args.stdio else server.serve_unix(args.socket)
+        asyncio.run(_serve_until_terminated(serve))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+作業集合（working set）モデルに基づいてバンドのタイルサイズを選ぶオートチューナです。
+
+タイルサイズの候補を列挙し、各候補について「先頭タイル 1 個が触れる配列要素」を
+アクセス写像から求めます。配列ごとの触れる範囲は `dim_min_val` / `dim_max_val` で
+得たバウンディングボックスで近似し、キャッシュ容量に収まる候補のうち再利用率
+（反復数 / 要素数）が最も高いものを選びます。候補の評価は文字列だけを受け渡す
+ワーカー関数で行うため、`parallel.run_batch` の各バックエンドで並列化できます。
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import islpy as isl
+
+from .parallel import Backend, run_batch
+from .parse_cache import parse_union_map, parse_union_set
+from .schedule_tree import node_at, tile_band
+
+
+@dataclass(frozen=True)
+class CacheCapacity:
+    """
+    対象キャッシュの容量の記述です。
+
+    `utilization` は競合ミスを見込んで実際に使う容量の割合です。
+    """
+
+    capacity_bytes: int
+    element_bytes: int = 4
+    utilization: float = 0.75
+
+    @property
+    def usable_bytes(self) -> float:
+        return self.capacity_bytes * self.utilization
+
+
+@dataclass(frozen=True)
+class TileCandidate:
+    """1 つのタイルサイズ候補の評価結果です。"""
+
+    tile_sizes: tuple[int, ...]
+    iterations: int
+    footprint_elements: dict[str, int]
+    footprint_bytes: int
+    fits: bool
+
+    @property
+    def reuse(self) -> float:
+        """タイル内の反復数を触れる要素数で割った再利用率です。"""
+        elements = sum(self.footprint_elements.values())
+        return self.iterations / elements if elements else 0.0
+
+
+@dataclass(frozen=True)
+class TilingChoice:
+    """`autotune_band_tiling` の結果です。`table` は良い順に並んだ全候補です。"""
+
+    schedule: isl.Schedule
+    tile_sizes: tuple[int, ...]
+    table: tuple[TileCandidate, ...]
+
+
+def _bounding_box_size(points: isl.Set) -> int:
+    """ヘルパー: 集合のバウンディングボックスに含まれる整数点の数を返します。"""
+    size = 1
+    for dim in range(points.dim(isl.dim_type.set)):
+        lo = points.dim_min_val(dim).to_python()
+        hi = points.dim_max_val(dim).to_python()
+        size *= hi - lo + 1
+    return size
+
+
+def _evaluate_tile(
+    domain: str,
+    partial_schedule: str,
+    accesses: str,
+    lower: tuple[int, ...],
+    tile_sizes: tuple[int, ...],
+) -> tuple[int, dict[str, int]]:
+    """
+    ワーカー: 先頭タイルの反復数と配列ごとのフットプリント（要素数）を返します。
+
+    プロセスプールから呼ばれるため、引数と戻り値は文字列と整数だけにしています。
+    """
+    time_dims = [f"t{k}" for k in range(len(tile_sizes))]
+    box = " and ".join(
+        f"{lo} <= {t} < {lo + size}" for t, lo, size in zip(time_dims, lower, tile_sizes)
+    )
+    theta = parse_union_map(partial_schedule)
+    tile = (
+        theta.intersect_range(
+            isl.UnionSet(f"{{ [{', '.join(time_dims)}] : {box} }}", context=theta.get_ctx())
+        )
+        .domain()
+        .intersect(parse_union_set(domain))
+    )
+
+    statements: list[isl.Set] = []
+    tile.foreach_set(statements.append)
+    iterations = sum(s.count_val().to_python() for s in statements)
+
+    arrays: list[isl.Set] = []
+    parse_union_map(accesses).intersect_domain(tile).range().foreach_set(arrays.append)
+    footprint = {
+        array.get_tuple_name(): _bounding_box_size(array)
+        for array in arrays
+        if not array.is_empty()
+    }
+    return iterations, footprint
+
+
+def _default_sizes(extent: int, candidate_sizes: Sequence[int]) -> list[int]:
+    sizes = [size for size in candidate_sizes if size < extent]
+    return sizes + [extent]
+
+
+def _rank_key(candidate: TileCandidate) -> tuple[int, float, float]:
+    if candidate.fits:
+        return (0, -candidate.reuse, -candidate.footprint_bytes)
+    return (1, candidate.footprint_bytes, -candidate.reuse)
+
+
+def autotune_band_tiling(
+    schedule: isl.Schedule,
+    band_path: Iterable[int],
+    read_accesses: str,
+    write_accesses: str,
+    cache: CacheCapacity,
+    candidate_sizes: Sequence[int] = (4, 8, 16, 32, 64, 128),
+    *,
+    backend: Backend = "serial",
+    max_workers: int | None = None,
+    chunksize: int = 1,
+) -> TilingChoice | None:
+    """
+    バンドのタイルサイズ候補を評価し、最良の候補でタイル化したスケジュールを返します。
+
+    各メンバーについて `candidate_sizes` のうちループ長未満のものとループ長そのものを
+    候補にし、その直積を評価します。外側に別のスケジュール次元がある場合は、その
+    辞書式最小の 1 反復の中でタイルを評価します。対象がバンドでなければ None です。
+    """
+    band_path = tuple(band_path)
+    node = node_at(schedule, band_path)
+    if node is None or node.get_type() != isl.schedule_node_type.band:
+        return None
+
+    domain = node.get_domain()
+    prefix = node.get_prefix_schedule_union_map().intersect_domain(domain)
+    if not prefix.range().is_empty() and prefix.range().as_set().dim(isl.dim_type.set):
+        first = prefix.range().lexmin()
+        domain = prefix.intersect_range(first).domain()
+    partial = node.band_get_partial_schedule_union_map().intersect_domain(domain)
+    if partial.is_empty():
+        return None
+
+    band_range = partial.range().as_set()
+    n_members = node.band_n_member()
+    lower = tuple(band_range.dim_min_val(k).to_python() for k in range(n_members))
+    extents = [
+        band_range.dim_max_val(k).to_python() - lower[k] + 1 for k in range(n_members)
+    ]
+    candidates = list(
+        itertools.product(*(_default_sizes(extent, candidate_sizes) for extent in extents))
+    )
+
+    accesses = str(parse_union_map(read_accesses).union(parse_union_map(write_accesses)))
+    evaluated = run_batch(
+        _evaluate_tile,
+        itertools.repeat(str(domain), len(candidates)),
+        itertools.repeat(str(partial), len(candidates)),
+        itertools.repeat(accesses, len(candidates)),
+        itertools.repeat(lower, len(candidates)),
+        candidates,
+        backend=backend,
+        max_workers=max_workers,
+        chunksize=chunksize,
+    )
+
+    table = []
+    for sizes, (iterations, footprint) in zip(candidates, evaluated):
+        footprint_bytes = sum(footprint.values()) * cache.element_bytes
+        table.append(
+            TileCandidate(
+                tile_sizes=tuple(sizes),
+                iterations=iterations,
+                footprint_elements=footprint,
+                footprint_bytes=footprint_bytes,
+                fits=footprint_bytes <= cache.usable_bytes,
+            )
+        )
+    table.sort(key=_rank_key)
+
+    best = table[0]
+    tiled = tile_band(schedule, band_path, best.tile_sizes)
+    if tiled is None:
+        return None
+    return TilingChoice(schedule=tiled, tile_sizes=best.tile_sizes, table=tuple(table))
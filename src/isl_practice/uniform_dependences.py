@@ -0,0 +1,190 @@
+"""
+一様（距離が定数の）依存を NumPy の距離ベクトル行列として扱う高速経路です。
+
+`compute_min_distance_vector` は 1 つの `isl.Map` ごとに点を取り出しますが、
+実際のカーネルでは依存のほとんどが一様です。ここでは `isl.UnionMap` 全体から
+一様依存を検出して int64 の行列にまとめ、アフィンスケジュールの線形部分に対する
+合法性判定を 1 回の行列積で済ませます。一様でない依存だけを isl で判定します。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping
+
+import islpy as isl
+import numpy as np
+
+from .level02_dependence_analysis import LegalityChecker
+
+
+@dataclass(frozen=True)
+class UniformDependences:
+    """
+    `extract_uniform_dependences` の結果です。
+
+    `distances` は一様依存 1 つにつき 1 行の (n_uniform, n_dims) int64 行列で、
+    次元数が異なるステートメントが混在する場合は右側を 0 で埋めます。
+    `statements[k]` は k 行目の依存が属するステートメント名です。
+    `non_uniform` には距離が定数でない依存や、異なるステートメント間の依存を残します。
+    """
+
+    distances: np.ndarray
+    statements: tuple[str, ...]
+    uniform: tuple[isl.Map, ...]
+    non_uniform: tuple[isl.Map, ...]
+
+
+def _uniform_distance(dependence: isl.Map) -> tuple[int, ...] | None:
+    """ヘルパー: 依存が一様なら距離ベクトルを、そうでなければ None を返します。"""
+    space = dependence.get_space()
+    if not space.domain().is_equal(space.range()):
+        return None
+    if dependence.is_empty():
+        return None
+
+    deltas = dependence.deltas()
+    if not deltas.is_singleton():
+        return None
+    n_param = deltas.dim(isl.dim_type.param)
+    if n_param and deltas.involves_dims(isl.dim_type.param, 0, n_param):
+        return None
+
+    point = deltas.sample_point()
+    return tuple(
+        point.get_coordinate_val(isl.dim_type.set, i).to_python()
+        for i in range(deltas.dim(isl.dim_type.set))
+    )
+
+
+def extract_uniform_dependences(dependences: isl.UnionMap) -> UniformDependences:
+    """
+    依存集合を一様依存の距離行列と、それ以外の依存に振り分けます。
+
+    同じ空間の依存は `isl.UnionMap` 内で 1 つの写像にまとめられるため、
+    基本写像（選言の各項）ごとに一様性を判定します。
+    """
+    maps: list[isl.Map] = []
+    dependences.foreach_map(maps.append)
+    pieces = [
+        isl.Map.from_basic_map(piece) for dep in maps for piece in dep.get_basic_maps()
+    ]
+
+    rows: list[tuple[int, ...]] = []
+    statements: list[str] = []
+    uniform: list[isl.Map] = []
+    non_uniform: list[isl.Map] = []
+    for dep in pieces:
+        distance = _uniform_distance(dep)
+        if distance is None:
+            non_uniform.append(dep)
+            continue
+        rows.append(distance)
+        statements.append(dep.get_tuple_name(isl.dim_type.in_))
+        uniform.append(dep)
+
+    width = max((len(row) for row in rows), default=0)
+    distances = np.zeros((len(rows), width), dtype=np.int64)
+    for k, row in enumerate(rows):
+        distances[k, : len(row)] = row
+
+    return UniformDependences(
+        distances=distances,
+        statements=tuple(statements),
+        uniform=tuple(uniform),
+        non_uniform=tuple(non_uniform),
+    )
+
+
+def lex_positive_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    各行が辞書式に正（最初の非零要素が正）かどうかを真偽値配列で返します。
+
+    全要素が 0 の行は、依存がどの次元でも運ばれないため False とします。
+    """
+    nonzero = vectors != 0
+    first = nonzero.argmax(axis=1)
+    leading = vectors[np.arange(vectors.shape[0]), first]
+    return nonzero.any(axis=1) & (leading > 0)
+
+
+def _transform_for(
+    transforms: Mapping[str, np.ndarray] | np.ndarray,
+    statement: str,
+) -> np.ndarray:
+    if isinstance(transforms, np.ndarray):
+        return transforms
+    return np.asarray(transforms[statement], dtype=np.int64)
+
+
+def uniform_legality_mask(
+    analysis: UniformDependences,
+    transforms: Mapping[str, np.ndarray] | np.ndarray,
+) -> np.ndarray:
+    """
+    一様依存ごとに、線形スケジュール `t = T @ i` の下で合法かを返します。
+
+    `transforms` は全ステートメント共通の (n_time, n_dims) 行列か、ステートメント名
+    から行列への辞書です。ステートメントごとに `D_s @ T_s.T` を 1 回計算します。
+    """
+    legal = np.ones(len(analysis.statements), dtype=bool)
+    names = np.asarray(analysis.statements, dtype=object)
+    for statement in dict.fromkeys(analysis.statements):
+        rows = names == statement
+        transform = _transform_for(transforms, statement)
+        distances = analysis.distances[rows, : transform.shape[1]]
+        legal[rows] = lex_positive_rows(distances @ transform.T)
+    return legal
+
+
+def affine_schedule_map(transforms: Mapping[str, np.ndarray]) -> str:
+    """ステートメントごとの変換行列から `{ S[i0, i1] -> [t0, ...] }` 形式の写像を作ります。"""
+    pieces = []
+    for statement, transform in transforms.items():
+        transform = np.asarray(transform, dtype=np.int64)
+        iters = [f"i{k}" for k in range(transform.shape[1])]
+        times = [
+            " + ".join(
+                f"{coeff}*{it}" for coeff, it in zip(row, iters) if coeff
+            ).replace("+ -", "- ")
+            or "0"
+            for row in transform.tolist()
+        ]
+        pieces.append(f"{statement}[{', '.join(iters)}] -> [{', '.join(times)}]")
+    return "{ " + "; ".join(pieces) + " }"
+
+
+def validate_affine_schedule_legality(
+    analysis: UniformDependences,
+    transforms: Mapping[str, np.ndarray] | np.ndarray,
+) -> bool | None:
+    """
+    線形スケジュールの合法性を、一様依存は行列積で、残りは isl で判定します。
+
+    一様でない依存の判定には `LegalityChecker` を使うため、その依存に現れる
+    ステートメントについては `transforms` から isl のスケジュール写像を組み立てます。
+    判定対象の依存が 1 つも無い場合は None を返します。
+    """
+    if analysis.statements and not uniform_legality_mask(analysis, transforms).all():
+        return False
+    if not analysis.non_uniform:
+        return True if analysis.statements else None
+
+    statements: dict[str, int] = {}
+    for dep in analysis.non_uniform:
+        for kind in (isl.dim_type.in_, isl.dim_type.out):
+            statements[dep.get_tuple_name(kind)] = dep.dim(kind)
+    schedule = affine_schedule_map(
+        {
+            name: _transform_for(transforms, name)[:, :n_dims]
+            for name, n_dims in statements.items()
+        }
+    )
+
+    dependences = isl.UnionMap.from_map(analysis.non_uniform[0])
+    for dep in analysis.non_uniform[1:]:
+        dependences = dependences.union(isl.UnionMap.from_map(dep))
+    report = LegalityChecker(dependences).check(schedule)
+    if report.legal is None:
+        return True if analysis.statements else None
+    return report.legal
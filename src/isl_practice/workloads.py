@@ -0,0 +1,188 @@
+"""
+ベンチマークや回帰確認に使う SCoP ワークロードの生成器です。
+
+テストで使う 4x8 程度の小さな領域ではなく、問題サイズやステートメント数を
+変えた GEMM・2D 畳み込み（NCHW）・Jacobi ステンシル・多段パイプラインを
+isl のテキスト表現として生成します。各ワークロードは Level 01–03 の関数に
+そのまま渡せる文字列だけを持ちます。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+
+@dataclass(frozen=True)
+class Workload:
+    """
+    1 つの SCoP を表す文字列の組です。
+
+    `domain` / `reads` / `writes` / `schedule` は複数ステートメントを含み得る
+    union 表現、`primary_domain` は `isl.Set` として読める先頭ステートメントの領域です。
+    `params` には生成時のサイズ指定を記録します。
+    """
+
+    name: str
+    params: tuple[tuple[str, int], ...]
+    domain: str
+    primary_domain: str
+    reads: str
+    writes: str
+    schedule: str
+
+    @property
+    def label(self) -> str:
+        sizes = ",".join(f"{key}={value}" for key, value in self.params)
+        return f"{self.name}[{sizes}]"
+
+
+def _union(pieces: Iterable[str]) -> str:
+    return "{ " + "; ".join(pieces) + " }"
+
+
+def gemm(size: int) -> Workload:
+    """`C[i, j] += A[i, k] * B[k, j]` の 3 重ループを生成します。"""
+    bounds = f"0 <= i < {size} and 0 <= j < {size} and 0 <= k < {size}"
+    domain = f"S[i, j, k] : {bounds}"
+    return Workload(
+        name="gemm",
+        params=(("size", size),),
+        domain=_union([domain]),
+        primary_domain=f"{{ [i, j, k] : {bounds} }}",
+        reads=_union(
+            [
+                f"S[i, j, k] -> C[i, j] : {bounds}",
+                f"S[i, j, k] -> A[i, k] : {bounds}",
+                f"S[i, j, k] -> B[k, j] : {bounds}",
+            ]
+        ),
+        writes=_union([f"S[i, j, k] -> C[i, j] : {bounds}"]),
+        schedule=_union([f"S[i, j, k] -> [i, j, k] : {bounds}"]),
+    )
+
+
+def conv2d_nchw(
+    batch: int,
+    in_channels: int,
+    out_channels: int,
+    height: int,
+    width: int,
+    kernel: int = 3,
+) -> Workload:
+    """
+    `O[n, k, h, w] += I[n, c, h + r, w + s] * W[k, c, r, s]`（padding なし）を生成します。
+    """
+    out_h = height - kernel + 1
+    out_w = width - kernel + 1
+    if out_h <= 0 or out_w <= 0:
+        raise ValueError("カーネルが入力より大きいため出力が空になります")
+    bounds = (
+        f"0 <= n < {batch} and 0 <= k < {out_channels} and 0 <= h < {out_h} "
+        f"and 0 <= w < {out_w} and 0 <= c < {in_channels} "
+        f"and 0 <= r < {kernel} and 0 <= s < {kernel}"
+    )
+    iters = "n, k, h, w, c, r, s"
+    return Workload(
+        name="conv2d_nchw",
+        params=(
+            ("batch", batch),
+            ("in_channels", in_channels),
+            ("out_channels", out_channels),
+            ("height", height),
+            ("width", width),
+            ("kernel", kernel),
+        ),
+        domain=_union([f"S[{iters}] : {bounds}"]),
+        primary_domain=f"{{ [{iters}] : {bounds} }}",
+        reads=_union(
+            [
+                f"S[{iters}] -> O[n, k, h, w] : {bounds}",
+                f"S[{iters}] -> I[n, c, h + r, w + s] : {bounds}",
+                f"S[{iters}] -> W[k, c, r, s] : {bounds}",
+            ]
+        ),
+        writes=_union([f"S[{iters}] -> O[n, k, h, w] : {bounds}"]),
+        schedule=_union([f"S[{iters}] -> [{iters}] : {bounds}"]),
+    )
+
+
+def jacobi_2d(size: int, steps: int) -> Workload:
+    """
+    5 点 Jacobi ステンシルを 2 ステートメント（計算 S とコピー T）で生成します。
+    """
+    bounds = f"0 <= t < {steps} and 1 <= i < {size - 1} and 1 <= j < {size - 1}"
+    return Workload(
+        name="jacobi_2d",
+        params=(("size", size), ("steps", steps)),
+        domain=_union([f"S[t, i, j] : {bounds}", f"T[t, i, j] : {bounds}"]),
+        primary_domain=f"{{ [t, i, j] : {bounds} }}",
+        reads=_union(
+            [
+                *(
+                    f"S[t, i, j] -> A[{index}] : {bounds}"
+                    for index in ("i, j", "i - 1, j", "i + 1, j", "i, j - 1", "i, j + 1")
+                ),
+                f"T[t, i, j] -> B[i, j] : {bounds}",
+            ]
+        ),
+        writes=_union(
+            [
+                f"S[t, i, j] -> B[i, j] : {bounds}",
+                f"T[t, i, j] -> A[i, j] : {bounds}",
+            ]
+        ),
+        schedule=_union(
+            [
+                f"S[t, i, j] -> [t, 0, i, j] : {bounds}",
+                f"T[t, i, j] -> [t, 1, i, j] : {bounds}",
+            ]
+        ),
+    )
+
+
+def pipeline(n_statements: int, size: int) -> Workload:
+    """
+    `A{k+1}[i] = f(A{k}[i - 1], A{k}[i])` を `n_statements` 段連ねたパイプラインを生成します。
+    """
+    if n_statements < 1:
+        raise ValueError("n_statements は 1 以上で指定してください")
+    bounds = f"0 <= i < {size}"
+    stmts = [f"S{k}" for k in range(n_statements)]
+    return Workload(
+        name="pipeline",
+        params=(("statements", n_statements), ("size", size)),
+        domain=_union(f"{s}[i] : {bounds}" for s in stmts),
+        primary_domain=f"{{ [i] : {bounds} }}",
+        reads=_union(
+            piece
+            for k, s in enumerate(stmts)
+            for piece in (
+                f"{s}[i] -> A{k}[i] : {bounds}",
+                f"{s}[i] -> A{k}[i - 1] : 1 <= i < {size}",
+            )
+        ),
+        writes=_union(f"{s}[i] -> A{k + 1}[i] : {bounds}" for k, s in enumerate(stmts)),
+        schedule=_union(f"{s}[i] -> [{k}, i] : {bounds}" for k, s in enumerate(stmts)),
+    )
+
+
+def generate_suite(
+    sizes: Iterable[int] = (16, 64, 256),
+    statement_counts: Iterable[int] = (2, 8, 32),
+) -> Iterator[Workload]:
+    """問題サイズとステートメント数を掛け合わせた標準ワークロード群を生成します。"""
+    sizes = tuple(sizes)
+    for size in sizes:
+        yield gemm(size)
+        yield conv2d_nchw(
+            batch=1,
+            in_channels=max(1, size // 8),
+            out_channels=max(1, size // 8),
+            height=size,
+            width=size,
+        )
+        yield jacobi_2d(size, steps=max(1, size // 16))
+    for n_statements in statement_counts:
+        for size in sizes:
+            yield pipeline(n_statements, size)
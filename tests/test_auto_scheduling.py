@@ -0,0 +1,103 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import auto_scheduling
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import workloads
+
+_DOMAIN = "{ S[i, j] : 0 <= i < 16 and 0 <= j < 16 }"
+_READS = "{ S[i, j] -> A[i, j - 1] : j >= 1 }"
+_WRITES = "{ S[i, j] -> A[i, j] }"
+
+
+class AutoSchedulingTest(unittest.TestCase):
+    def setUp(self):
+        self.deps = lvl02.construct_flow_dependences(_DOMAIN, _READS, _WRITES)
+
+    def test_compute_schedule_respects_dependences(self):
+        result = auto_scheduling.compute_schedule(_DOMAIN, self.deps)
+
+        self.assertEqual(result.status, "ok")
+        checker = lvl02.LegalityChecker(self.deps)
+        self.assertTrue(checker.check(result.schedule).legal)
+        self.assertGreaterEqual(
+            result.outer_parallelism,
+            1,
+            "i 方向には依存が無いため最外次元は並列になるはずです",
+        )
+
+    def test_dataflow_dependences_keep_in_place_kernels_legal(self):
+        w = workloads.jacobi_2d(6, 2)
+        dataflow = lvl02.compute_dataflow_dependences(w.domain, w.reads, w.writes, w.schedule)
+        checker = lvl02.LegalityChecker(dataflow.union())
+
+        flow_only = auto_scheduling.compute_schedule(w.domain, dataflow.raw)
+        self.assertFalse(
+            checker.check(flow_only.schedule).legal,
+            "フロー依存だけでは WAR/WAW に違反するスケジュールが返り得ます",
+        )
+
+        results = auto_scheduling.sweep_scheduler_options(w.domain, dataflow, backend="serial")
+        self.assertTrue(all(r.status == "ok" for r in results))
+        for result in results:
+            with self.subTest(options=result.options):
+                self.assertTrue(checker.check(result.schedule).legal)
+
+    def test_compute_schedule_without_dependences(self):
+        result = auto_scheduling.compute_schedule(_DOMAIN, None)
+        self.assertEqual(result.status, "ok")
+        self.assertTrue(result.schedule.get_domain().is_equal(isl.UnionSet(_DOMAIN)))
+
+    def test_options_do_not_leak_into_default_context(self):
+        before = isl.DEFAULT_CONTEXT.get_schedule_serialize_sccs()
+        auto_scheduling.compute_schedule(
+            _DOMAIN, self.deps, auto_scheduling.SchedulerOptions(serialize_sccs=True)
+        )
+        self.assertEqual(isl.DEFAULT_CONTEXT.get_schedule_serialize_sccs(), before)
+
+    def test_budget_exceeded(self):
+        result = auto_scheduling.compute_schedule(_DOMAIN, self.deps, max_operations=1)
+        self.assertEqual(result.status, "budget_exceeded")
+        self.assertIsNone(result.schedule)
+
+    def test_sweep_preserves_grid_order(self):
+        grid = auto_scheduling.option_grid(
+            algorithms=("isl", "feautrier"), outer_coincidence=(False,), serialize_sccs=(False,)
+        )
+        for backend in ("serial", "process"):
+            with self.subTest(backend=backend):
+                results = auto_scheduling.sweep_scheduler_options(
+                    _DOMAIN, self.deps, grid, backend=backend, max_workers=2
+                )
+
+                self.assertEqual([r.options for r in results], grid)
+                self.assertTrue(all(r.status == "ok" for r in results))
+                best = auto_scheduling.select_schedule(results)
+                self.assertGreaterEqual(best.outer_parallelism, 1)
+
+    def test_results_use_given_context(self):
+        ctx = isl.Context()
+
+        result = auto_scheduling.compute_schedule(_DOMAIN, None, ctx=ctx)
+        self.assertEqual(result.schedule.get_ctx(), ctx)
+
+        grid = auto_scheduling.option_grid(
+            algorithms=("isl",), outer_coincidence=(False,), serialize_sccs=(False,)
+        )
+        results = auto_scheduling.sweep_scheduler_options(
+            _DOMAIN, self.deps, grid, backend="thread", max_workers=2, ctx=ctx
+        )
+        self.assertTrue(all(r.status == "ok" for r in results))
+        self.assertTrue(all(r.schedule.get_ctx() == ctx for r in results))
+
+    def test_sweep_time_budget(self):
+        results = auto_scheduling.sweep_scheduler_options(
+            _DOMAIN, self.deps, backend="serial", time_budget_s=0.0
+        )
+        self.assertTrue(all(r.status == "timeout" for r in results))
+        self.assertIsNone(auto_scheduling.select_schedule(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
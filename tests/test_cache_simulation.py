@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+
+from src.isl_practice import cache_simulation
+from src.isl_practice import schedule_tree
+
+_N = 32
+_DOMAIN = f"{{ S[i, j, k] : 0 <= i < {_N} and 0 <= j < {_N} and 0 <= k < {_N} }}"
+_READS = "{ S[i, j, k] -> A[i, k]; S[i, j, k] -> B[k, j]; S[i, j, k] -> C[i, j] }"
+_WRITES = "{ S[i, j, k] -> C[i, j] }"
+
+
+def _reference_misses(lines: np.ndarray, config: cache_simulation.CacheConfig) -> int:
+    ways = [[] for _ in range(config.n_sets)]
+    misses = 0
+    for line in lines.tolist():
+        resident = ways[line % config.n_sets]
+        if line in resident:
+            resident.remove(line)
+        else:
+            misses += 1
+            if len(resident) == config.associativity:
+                del resident[0]
+        resident.append(line)
+    return misses
+
+
+class CacheSimulationTest(unittest.TestCase):
+    def setUp(self):
+        self.untiled = schedule_tree.schedule_from_map(_DOMAIN, "{ S[i, j, k] -> [i, j, k] }")
+        self.tiled = schedule_tree.tile_band(self.untiled, (0,), (8, 8, 8))
+        self.config = cache_simulation.CacheConfig(size_bytes=2048, line_bytes=32, associativity=4)
+
+    def test_trace_follows_schedule_order(self):
+        schedule = schedule_tree.schedule_from_map(
+            "{ S[i] : 0 <= i < 3 }", "{ S[i] -> [2 - i] }"
+        )
+        chunks = list(
+            cache_simulation.iter_address_trace(schedule, "{ S[i] -> A[i] }", "{ S[i] -> B[i] }")
+        )
+        addresses = np.concatenate([a for a, _ in chunks])
+        ids = np.concatenate([i for _, i in chunks])
+        # A は 0 バイト目から、B は次のキャッシュライン（64 バイト目）から配置されます。
+        self.assertEqual(addresses.tolist(), [8, 72, 4, 68, 0, 64])
+        self.assertEqual(ids.tolist(), [0, 1, 0, 1, 0, 1])
+
+    def test_matches_reference_lru_across_chunks(self):
+        addresses = np.concatenate(
+            [a for a, _ in cache_simulation.iter_address_trace(self.untiled, _READS, _WRITES)]
+        )
+        result = cache_simulation.simulate_schedule(
+            self.untiled, _READS, _WRITES, self.config, chunk_size=2000
+        )
+
+        self.assertEqual(result.total_accesses, 4 * _N**3)
+        self.assertEqual(result.accesses["C"], 2 * _N**3)
+        self.assertEqual(
+            result.total_misses,
+            _reference_misses(addresses // self.config.line_bytes, self.config),
+        )
+
+    def test_tiling_reduces_misses(self):
+        ranking = cache_simulation.rank_schedules(
+            {"untiled": self.untiled, "tiled": self.tiled}, _READS, _WRITES, self.config
+        )
+
+        self.assertEqual([name for name, _ in ranking], ["tiled", "untiled"])
+        self.assertEqual(ranking[0][1].total_accesses, ranking[1][1].total_accesses)
+
+    def test_invalid_cache_config(self):
+        with self.assertRaises(ValueError):
+            cache_simulation.CacheConfig(size_bytes=1000, line_bytes=64, associativity=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import json
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+from src.isl_practice import cli
+
+_JOBS = [
+    json.dumps({"id": "a", "op": "intersection", "args": ["{ [i] : 0 <= i < 5 }", "{ [i] : i > 2 }"]}),
+    "not json",
+    json.dumps({"op": "lexmin", "args": ["{ [i, j] : 0 <= i < 4 and j >= i }"]}),
+    "",
+    json.dumps({"id": "d", "op": "bogus"}),
+    json.dumps({"id": "e", "op": "level01.eliminate_dim", "args": ["{ [i] }"]}),
+]
+
+
+class CliTest(unittest.TestCase):
+    def test_results_in_input_order(self):
+        for workers in (None, 2):
+            with self.subTest(workers=workers):
+                records = list(cli.iter_results(_JOBS, workers=workers, max_in_flight=1))
+
+                self.assertEqual([r["id"] for r in records], ["a", 2, 3, "d", "e"])
+                self.assertEqual(records[0]["result"], "{ [i] : 3 <= i <= 4 }")
+                self.assertEqual(records[1]["error"]["type"], "InvalidJob")
+                self.assertEqual(records[2]["result"], "{ [0, 0] }")
+                self.assertEqual(records[3]["error"]["type"], "InvalidJob")
+                self.assertEqual(records[4]["error"]["type"], "TypeError")
+
+    def test_unordered_returns_every_result(self):
+        records = list(cli.iter_results(_JOBS, workers=2, ordered=False))
+        self.assertEqual(sorted(map(str, (r["id"] for r in records))), ["2", "3", "a", "d", "e"])
+
+    def test_iter_results_is_lazy(self):
+        def lines():
+            yield _JOBS[0]
+            raise AssertionError("先頭の結果を取り出す前に入力を読み切ってはいけません")
+
+        self.assertTrue(next(cli.iter_results(lines()))["ok"])
+
+    def test_ordered_queue_counts_invalid_lines(self):
+        consumed = []
+
+        def lines():
+            yield _JOBS[0]
+            for k in range(1000):
+                consumed.append(k)
+                yield "not json"
+
+        results = cli.iter_results(lines(), workers=1, max_in_flight=4)
+        self.assertTrue(next(results)["ok"])
+        self.assertLessEqual(len(consumed), 4, "先頭の結果を待つ間に読み進める行数は上限までです")
+        self.assertEqual(sum(1 for _ in results), 1000)
+
+    def test_help_does_not_import_islpy(self):
+        code = (
+            "import sys\n"
+            "from src.isl_practice import cli\n"
+            "try:\n"
+            "    cli.main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "sys.stderr.write(str('islpy' in sys.modules))\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(completed.stderr, "False")
+
+    def test_main_exit_code(self):
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            status = cli.main(["--list-operations"])
+        self.assertEqual(status, 0)
+        self.assertIn("level02.construct_flow_dependences", buffer.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from src.isl_practice import codegen
+from src.isl_practice import schedule_tree
+
+_GEMM_DOMAIN = "{ S[i, j, k] : 0 <= i < 24 and 0 <= j < 24 and 0 <= k < 24 }"
+_GEMM_BODY = {"S": "C[i][j] += A[i][k] * B[k][j];"}
+_GEMM_ARRAYS = (
+    codegen.ArraySpec("A", (24, 24)),
+    codegen.ArraySpec("B", (24, 24)),
+    codegen.ArraySpec("C", (24, 24)),
+)
+
+
+class CodegenTest(unittest.TestCase):
+    def setUp(self):
+        self.untiled = schedule_tree.schedule_from_map(_GEMM_DOMAIN, "{ S[i, j, k] -> [i, j, k] }")
+        self.tiled = schedule_tree.tile_band(self.untiled, (0,), (8, 8, 5))
+
+    def test_generate_loop_nest(self):
+        code = codegen.generate_loop_nest(self.untiled)
+        self.assertEqual(code.count("for ("), 3)
+        self.assertIn("S(c0, c1, c2);", code)
+
+    def test_build_program_binds_statement_bodies(self):
+        source = codegen.build_program(self.tiled, _GEMM_BODY, _GEMM_ARRAYS)
+        self.assertIn("static inline void S(int i, int j, int k)", source)
+        self.assertIn("#define min(x, y)", source)
+        self.assertIn("static float C[24][24];", source)
+
+    def test_build_program_requires_all_statements(self):
+        with self.assertRaises(ValueError):
+            codegen.build_program(self.untiled, {}, _GEMM_ARRAYS)
+
+    @unittest.skipIf(codegen.find_c_compiler() is None, "C コンパイラがありません")
+    def test_benchmark_tiled_vs_untiled(self):
+        results = codegen.benchmark_schedules(
+            {"untiled": self.untiled, "tiled": self.tiled},
+            _GEMM_BODY,
+            _GEMM_ARRAYS,
+            runs=3,
+        )
+
+        self.assertEqual(len(results["tiled"].times_s), 3)
+        report = codegen.compare_results(results, baseline="untiled")
+        self.assertTrue(
+            report["tiled"]["checksum_matches"],
+            "タイル化しても計算結果は変わってはいけません",
+        )
+        self.assertEqual(report["untiled"]["speedup"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import contexts
+from src.isl_practice import level01_iteration_sets as lvl01
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice.parse_cache import parse_set
+
+_DOMAIN = "{ S[i] : 0 <= i < 8 }"
+_READS = "{ S[i] -> A[i - 1] : i >= 1 }"
+_WRITES = "{ S[i] -> A[i] }"
+
+
+class ContextTest(unittest.TestCase):
+    def test_use_context_switches_and_restores(self):
+        self.assertIs(contexts.current_context(), isl.DEFAULT_CONTEXT)
+        ctx = isl.Context()
+        with contexts.use_context(ctx):
+            self.assertIs(contexts.current_context(), ctx)
+            self.assertEqual(parse_set("{ [i] : 0 <= i < 4 }").get_ctx(), ctx)
+        self.assertIs(contexts.current_context(), isl.DEFAULT_CONTEXT)
+
+    def test_parse_cache_is_keyed_by_context(self):
+        ctx = isl.Context()
+        text = "{ [i] : 0 <= i < 3 }"
+        self.assertEqual(parse_set(text, ctx).get_ctx(), ctx)
+        self.assertEqual(parse_set(text).get_ctx(), isl.DEFAULT_CONTEXT)
+
+    def test_transfer_moves_through_text(self):
+        ctx = isl.Context()
+        original = isl.UnionMap(_WRITES)
+        moved = contexts.transfer(original, ctx)
+        self.assertEqual(moved.get_ctx(), ctx)
+        self.assertEqual(str(moved), str(original))
+        self.assertIs(contexts.transfer(moved, ctx), moved)
+
+    def test_explicit_context_argument(self):
+        ctx = isl.Context()
+        deps = lvl02.construct_flow_dependences(_DOMAIN, _READS, _WRITES, ctx=ctx)
+        self.assertEqual(deps.get_ctx(), ctx)
+        self.assertTrue(lvl02.validate_schedule_legality(deps, "{ S[i] -> [i] }"))
+        self.assertEqual(
+            lvl02.compute_min_distance_vector(isl.Map.from_union_map(deps), max_operations=10_000),
+            (1,),
+        )
+
+    def test_thread_pool_gives_each_worker_its_own_context(self):
+        seen: dict[int, isl.Context] = {}
+        lock = threading.Lock()
+        barrier = threading.Barrier(3)
+
+        def work(_):
+            barrier.wait(timeout=10)
+            with lock:
+                seen[threading.get_ident()] = contexts.current_context()
+            return lvl01.canonical_intersection("{ [i] : 0 <= i < 5 }", "{ [i] : i > 2 }")
+
+        with contexts.ContextThreadPool(max_workers=3) as pool:
+            results = list(pool.map(work, range(3)))
+
+        self.assertEqual(results, ["{ [i] : 3 <= i <= 4 }"] * 3)
+        ctxs = list(seen.values())
+        self.assertEqual(len(ctxs), 3)
+        for idx, ctx in enumerate(ctxs):
+            self.assertFalse(ctx == isl.DEFAULT_CONTEXT)
+            for other in ctxs[idx + 1 :]:
+                self.assertFalse(ctx == other)
+
+
+if __name__ == "__main__":
+    unittest.main()
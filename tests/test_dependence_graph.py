@@ -0,0 +1,118 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import workloads
+from src.isl_practice.dependence_graph import IncrementalDependenceGraph
+from src.isl_practice.instrumentation import recording
+
+
+def _statement(workload: workloads.Workload, name: str) -> tuple[str, str, str]:
+    """ワークロードから 1 ステートメント分の領域・読み出し・書き込みを取り出します。"""
+    domain = isl.UnionSet(workload.domain)
+    reads = isl.UnionMap(workload.reads)
+    writes = isl.UnionMap(workload.writes)
+    only = isl.UnionSet(f"{{ {name}[i] }}")
+    return (
+        str(domain.intersect(only)),
+        str(reads.intersect_domain(only)),
+        str(writes.intersect_domain(only)),
+    )
+
+
+class IncrementalDependenceGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.workload = workloads.pipeline(6, 16)
+
+    def assertMatchesFullRecomputation(self, graph, domain, reads, writes):
+        expected = lvl02.construct_flow_dependences(domain, reads, writes)
+        if expected is None:
+            self.assertTrue(graph.dependences().is_empty())
+        else:
+            self.assertTrue(graph.dependences().is_equal(expected))
+
+    def test_seeded_graph_matches_construct_flow_dependences(self):
+        w = self.workload
+        graph = IncrementalDependenceGraph(w.domain, w.reads, w.writes)
+
+        self.assertEqual(sorted(graph.statements), [f"S{k}" for k in range(6)])
+        self.assertMatchesFullRecomputation(graph, w.domain, w.reads, w.writes)
+        breakdown = graph.by_array()
+        self.assertEqual(list(breakdown), [f"A{k}" for k in range(1, 6)])
+        self.assertTrue(
+            breakdown["A1"].is_equal(
+                isl.UnionMap("{ S0[i] -> S1[i] : 0 <= i < 16; S0[i] -> S1[i + 1] : 0 <= i < 15 }")
+            )
+        )
+        self.assertTrue(graph.between("S0", "S1").is_equal(breakdown["A1"]))
+        self.assertTrue(graph.between("S1", "S0").is_empty())
+
+    def test_add_statements_one_by_one(self):
+        graph = IncrementalDependenceGraph()
+        domain, reads, writes = isl.UnionSet("{ }"), isl.UnionMap("{ }"), isl.UnionMap("{ }")
+        counts = []
+        unions = []
+        for k in range(6):
+            piece = _statement(self.workload, f"S{k}")
+            with recording() as recorder:
+                graph.add_statement(*piece)
+                graph.dependences()
+            summary = recorder.summary()
+            counts.append(summary.get("isl:apply_range", {"count": 0})["count"])
+            unions.append(summary.get("isl:union", {"count": 0})["count"])
+            domain = domain.union(isl.UnionSet(piece[0]))
+            reads = reads.union(isl.UnionMap(piece[1]))
+            writes = writes.union(isl.UnionMap(piece[2]))
+            self.assertMatchesFullRecomputation(graph, str(domain), str(reads), str(writes))
+
+        self.assertEqual(counts[1:], [1] * 5, "追加ごとに触れる配列の組だけを計算するはずです")
+        self.assertEqual(unions[1:], [1] * 5, "依存全体の和は追加した組の分だけ広げるはずです")
+
+    def test_remove_and_replace_statement(self):
+        w = self.workload
+        graph = IncrementalDependenceGraph(w.domain, w.reads, w.writes)
+
+        self.assertTrue(graph.remove_statement("S2"))
+        self.assertFalse(graph.remove_statement("S2"))
+        self.assertNotIn("S2", graph)
+        self.assertNotIn("A3", graph.by_array())
+        self.assertTrue(graph.between("S1", "S2").is_empty())
+
+        domain, reads, writes = _statement(w, "S2")
+        graph.replace_statement(domain, reads, "{ S2[i] -> A9[i] : 0 <= i < 16 }")
+        self.assertNotIn("A3", graph.by_array())
+        graph.replace_statement(domain, reads, writes)
+        self.assertMatchesFullRecomputation(graph, w.domain, w.reads, w.writes)
+
+    def test_same_name_with_different_arity(self):
+        domain = "{ S[i] : 0 <= i < 8 }"
+        reads = "{ S[i] -> A[i - 1] : i >= 1 }"
+        writes = "{ S[i] -> A[i, i] }"
+        graph = IncrementalDependenceGraph(domain, reads, writes)
+
+        self.assertIsNone(lvl02.construct_flow_dependences(domain, reads, writes))
+        self.assertTrue(graph.dependences().is_empty())
+        self.assertEqual(graph.arrays, ("A",))
+
+        graph.add_statement("{ T[i] : 0 <= i < 8 }", "{ T[i] -> A[i, i] }")
+        self.assertTrue(graph.between("S", "T").is_equal(isl.UnionMap("{ S[i] -> T[i] : 0 <= i < 8 }")))
+        self.assertEqual(list(graph.by_array()), ["A"])
+
+    def test_self_dependences_and_validation(self):
+        graph = IncrementalDependenceGraph()
+        graph.add_statement(
+            "{ S[i] : 0 <= i < 8 }", "{ S[i] -> A[i - 1] : i >= 1 }", "{ S[i] -> A[i] }"
+        )
+        # construct_flow_dependences と同じく、反復領域に制限するのは書き込み側だけです。
+        self.assertTrue(
+            graph.dependences().is_equal(isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 8 }"))
+        )
+        with self.assertRaises(ValueError):
+            graph.add_statement("{ S[i] : 0 <= i < 8 }")
+        with self.assertRaises(ValueError):
+            graph.add_statement("{ T[i] : 0 <= i < 8 }", "{ U[i] -> A[i] }")
+
+
+if __name__ == "__main__":
+    unittest.main()
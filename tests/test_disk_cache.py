@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import islpy as isl
+
+from src.isl_practice import disk_cache
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice.contexts import use_context
+
+_DOMAIN = "{ S[i] : 0 <= i < 8 }"
+_READS = "{ S[i] -> A[i - 1] : i >= 1 }"
+_WRITES = "{ S[i] -> A[i] }"
+
+
+def _worker(directory: str, n: int) -> str:
+    cache = disk_cache.DiskCache(directory)
+    result = disk_cache.construct_flow_dependences(
+        f"{{ S[i] : 0 <= i < {n} }}", _READS, _WRITES, cache=cache
+    )
+    cache.close()
+    return str(result)
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = disk_cache.DiskCache(self._tmp.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def test_warm_call_returns_equal_result(self):
+        cold = disk_cache.construct_flow_dependences(_DOMAIN, _READS, _WRITES, cache=self.cache)
+        warm = disk_cache.construct_flow_dependences(
+            "{ S[i]: 0<=i<8 }", _READS, _WRITES, cache=self.cache
+        )
+
+        self.assertTrue(warm.is_equal(cold))
+        stats = self.cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_none_results_are_cached(self):
+        for _ in range(2):
+            result = disk_cache.construct_flow_dependences(
+                _DOMAIN, "{ S[i] -> A[i] }", "{ S[i] -> B[i] }", cache=self.cache
+            )
+            self.assertIsNone(result)
+        self.assertEqual(self.cache.stats().hits, 1)
+
+    def test_simplify_round_trip(self):
+        deps = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 4; S[i] -> S[i + 1] : 4 <= i < 7 }")
+        cold = disk_cache.simplify_dependence_domain(deps, cache=self.cache)
+        warm = disk_cache.simplify_dependence_domain(deps, cache=self.cache)
+        self.assertTrue(warm.is_equal(cold))
+        self.assertEqual(self.cache.stats().hits, 1)
+
+    def test_key_uses_text_without_simplifying(self):
+        deps = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 4; S[i] -> S[i + 1] : 4 <= i < 7 }")
+        text = str(deps)
+        self.cache.make_key("kind", deps)
+        disk_cache.simplify_dependence_domain(deps, cache=self.cache)
+        self.assertEqual(str(deps), text, "キャッシュ経由の呼び出しは引数を書き換えないはずです")
+
+    def test_hits_are_recorded_in_batches(self):
+        key = self.cache.make_key("kind", 1)
+        self.cache.put(key, "kind", "x")
+        self.cache.flush_every = 3
+        for _ in range(2):
+            self.assertTrue(self.cache.get(key)[0])
+
+        other = disk_cache.DiskCache(self._tmp.name)
+        try:
+            self.assertEqual(other.stats().hits, 0, "flush_every に達するまでは書き込みません")
+            self.cache.get(key)
+            self.assertEqual(other.stats().hits, 3)
+        finally:
+            other.close()
+        with self.assertRaises(ValueError):
+            disk_cache.DiskCache(self._tmp.name, flush_every=0)
+
+    def test_hit_and_miss_use_current_context(self):
+        domain = "[N] -> { S[i] : 0 <= i < N }"
+        ctx = isl.Context()
+        params = isl.Set("[N] -> { : N = 4 }", context=ctx)
+        expected = isl.UnionMap("[N] -> { S[i] -> S[i + 1] : N = 4 and 0 <= i <= 3 }", context=ctx)
+        with use_context(ctx):
+            for label in ("miss", "hit"):
+                with self.subTest(label):
+                    result = disk_cache.construct_flow_dependences(
+                        domain, _READS, _WRITES, cache=self.cache
+                    )
+                    self.assertEqual(result.get_ctx(), ctx)
+                    self.assertTrue(result.intersect_params(params).is_equal(expected))
+        self.assertEqual(self.cache.stats().hits, 1)
+
+    def test_key_depends_on_islpy_version(self):
+        key = self.cache.make_key("kind", "{ S[i] }")
+        self.cache.version = "0.0"
+        self.assertNotEqual(self.cache.make_key("kind", "{ S[i] }"), key)
+
+    def test_size_based_eviction(self):
+        self.cache.resize(max_bytes=200)
+        for n in range(8):
+            self.cache.put(self.cache.make_key("kind", n), "kind", "x" * 60)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats.total_bytes, 200)
+        self.assertEqual(stats.entries, 3)
+        self.assertEqual(stats.evictions, 5)
+        self.assertTrue(self.cache.get(self.cache.make_key("kind", 7))[0])
+        self.assertFalse(self.cache.get(self.cache.make_key("kind", 0))[0])
+
+    def test_shared_between_processes(self):
+        sizes = [4, 5, 6, 4, 5, 6, 4, 5]
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_worker, [self._tmp.name] * len(sizes), sizes))
+
+        for n, text in zip(sizes, results):
+            expected = lvl02.construct_flow_dependences(f"{{ S[i] : 0 <= i < {n} }}", _READS, _WRITES)
+            self.assertTrue(isl.UnionMap(text).is_equal(expected))
+        stats = self.cache.stats()
+        self.assertEqual(stats.entries, 3)
+        self.assertEqual(stats.hits + stats.misses, len(sizes))
+
+
+if __name__ == "__main__":
+    unittest.main()
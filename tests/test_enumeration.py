@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+import islpy as isl
+import numpy as np
+
+from src.isl_practice import enumeration
+
+
+def _reference_points(domain: str) -> list[tuple[int, ...]]:
+    points: list[tuple[int, ...]] = []
+    domain_set = isl.Set(domain)
+    n_dims = domain_set.dim(isl.dim_type.set)
+    domain_set.foreach_point(
+        lambda p: points.append(
+            tuple(p.get_coordinate_val(isl.dim_type.set, k).to_python() for k in range(n_dims))
+        )
+    )
+    return sorted(points)
+
+
+class EnumerationTest(unittest.TestCase):
+    def test_matches_foreach_point(self):
+        domains = [
+            "{ [i, j] : 0 <= i < 7 and 0 <= j <= i }",
+            "{ [i, j] : 0 <= i < 9 and 0 <= j < 9 and (i + j) mod 3 = 0 }",
+            "{ [i, j, k] : 0 <= i < 4 and i <= j < 6 and k = i + j }",
+            "{ [i, j] : 0 <= i < 3 and 0 <= j < 3 or 5 <= i < 8 and j = i - 4 }",
+            "{ [i] : -5 <= i <= 5 and exists (e : i = 4e + 1) }",
+            "{ [i, j] : 0 <= i < 10 and 0 <= j < 10 and 2j <= i }",
+        ]
+        for domain in domains:
+            with self.subTest(domain=domain):
+                points = enumeration.enumerate_points(domain)
+                self.assertEqual(points.dtype, np.int64)
+                self.assertEqual(
+                    [tuple(row) for row in points.tolist()],
+                    _reference_points(domain),
+                    "辞書式順序で全整数点を列挙してください",
+                )
+
+    def test_streaming_chunks_respect_chunk_size(self):
+        domain = "{ [i, j] : 0 <= i < 100 and 0 <= j < 50 }"
+        chunks = list(enumeration.iter_point_chunks(domain, chunk_size=500))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.shape[0] <= 500 for chunk in chunks))
+        self.assertEqual(sum(chunk.shape[0] for chunk in chunks), 5000)
+
+    def test_chunks_split_long_rows(self):
+        domain = "{ [i, j] : 0 <= i < 3 and 0 <= j < 1000 }"
+        chunks = list(enumeration.iter_point_chunks(domain, chunk_size=64))
+        self.assertTrue(all(chunk.shape[0] <= 64 for chunk in chunks))
+        points = np.concatenate(chunks)
+        self.assertEqual([tuple(row) for row in points.tolist()], _reference_points(domain))
+
+    def test_skewed_domain_work_follows_point_count(self):
+        domain = "{ [i, j, k] : 0 <= i < 200 and i <= j <= i + 1 and j - 1 <= k <= j + 1 }"
+        checked = []
+        original = enumeration._contains
+
+        def counting(matrices, points):
+            checked.append(points.shape[0])
+            return original(matrices, points)
+
+        with mock.patch.object(enumeration, "_contains", counting):
+            points = enumeration.enumerate_points(domain, chunk_size=128)
+
+        self.assertEqual([tuple(row) for row in points.tolist()], _reference_points(domain))
+        self.assertEqual(sum(checked), points.shape[0], "斜めの領域でも候補は点と同数のはずです")
+
+    def test_empty_and_zero_dimensional_sets(self):
+        self.assertEqual(enumeration.enumerate_points("{ [i, j] : i > j and j > i }").shape, (0, 2))
+        self.assertEqual(enumeration.enumerate_points("{ [] }").shape, (1, 0))
+
+    def test_rejects_unbounded_or_parametric(self):
+        with self.assertRaises(ValueError):
+            enumeration.enumerate_points("{ [i] : i >= 0 }")
+        with self.assertRaises(ValueError):
+            enumeration.enumerate_points("[N] -> { [i] : 0 <= i < N }")
+
+    def test_evaluate_multi_aff_with_floor(self):
+        pieces = []
+        isl.PwMultiAff.from_map(
+            isl.Map("{ [i, j] -> [4 * floor(i / 4), i - 4 * floor(i / 4), floor((i + j) / 3)] }")
+        ).foreach_piece(lambda dom, ma: pieces.append(ma))
+        points = enumeration.enumerate_points("{ [i, j] : -6 <= i < 6 and 0 <= j < 2 }")
+
+        values = enumeration.evaluate_multi_aff(pieces[0], points)
+
+        i, j = points[:, 0], points[:, 1]
+        np.testing.assert_array_equal(values[:, 0], 4 * np.floor_divide(i, 4))
+        np.testing.assert_array_equal(values[:, 1], np.mod(i, 4))
+        np.testing.assert_array_equal(values[:, 2], np.floor_divide(i + j, 3))
+
+    def test_contains_points(self):
+        points = np.array([[0, 0], [1, 2], [3, 3]], dtype=np.int64)
+        inside = enumeration.contains_points(isl.Set("{ [i, j] : i <= j and (i + j) mod 3 = 0 }"), points)
+        self.assertEqual(inside.tolist(), [True, True, True])
+        inside = enumeration.contains_points(isl.Set("{ [i, j] : j = 2i }"), points)
+        self.assertEqual(inside.tolist(), [True, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
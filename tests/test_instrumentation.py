@@ -0,0 +1,69 @@
+import json
+import pathlib
+import tempfile
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import instrumentation
+from src.isl_practice import level01_iteration_sets as lvl01
+from src.isl_practice import level02_dependence_analysis as lvl02
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_relation_complexity(self):
+        relation = isl.UnionMap(
+            "{ S[i] -> S[j] : 0 <= i < j < 4; T[i] -> T[i + 1] : exists (e : i = 2e) }"
+        )
+        complexity = instrumentation.relation_complexity(relation)
+        self.assertEqual(complexity["basic_sets"], 2)
+        self.assertGreater(complexity["constraints"], 0)
+        self.assertGreaterEqual(complexity["divs"], 1, "存在量化変数を数えてください")
+        self.assertIsNone(instrumentation.relation_complexity("{ [i] }"))
+
+    def test_no_events_outside_recording(self):
+        with instrumentation.recording() as recorder:
+            pass
+        lvl01.canonical_intersection("{ [i] : 0 <= i < 4 }", "{ [i] : i >= 2 }")
+        self.assertEqual(recorder.events, [])
+
+    def test_records_calls_and_isl_operations(self):
+        dependences = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 3 }")
+        with instrumentation.recording() as recorder:
+            lvl02.simplify_dependence_domain(dependences)
+            lvl02.validate_schedule_legality(dependences, "{ S[i] -> [i] }")
+
+        names = [(event.kind, event.name) for event in recorder.events]
+        self.assertIn(("call", "level02_dependence_analysis.simplify_dependence_domain"), names)
+        self.assertIn(("isl", "coalesce"), names)
+        self.assertIn(("isl", "deltas"), names)
+        self.assertIn(("isl", "lexmin"), names)
+
+        coalesce = next(e for e in recorder.events if e.name == "coalesce")
+        self.assertEqual(coalesce.inputs[0]["type"], "UnionMap")
+        self.assertIn("constraints", coalesce.output)
+        self.assertEqual(recorder.summary()["isl:coalesce"]["count"], 1)
+
+    def test_export_json_and_chrome_trace(self):
+        with instrumentation.recording() as recorder:
+            lvl01.find_lexmin_point("{ [i, j] : 0 <= i < 3 and 0 <= j < 3 }")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = pathlib.Path(tmp) / "events.json"
+            trace_path = pathlib.Path(tmp) / "trace.json"
+            recorder.write_json(json_path)
+            recorder.write_chrome_trace(trace_path)
+
+            events = json.loads(json_path.read_text())["events"]
+            trace = json.loads(trace_path.read_text())["traceEvents"]
+
+        self.assertEqual(len(events), len(recorder.events))
+        self.assertTrue(all(item["ph"] == "X" for item in trace))
+        self.assertEqual(
+            {item["cat"] for item in trace},
+            {"call", "isl"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -59,6 +59,49 @@ class Level01IterationSetsTest(unittest.TestCase):
             "存在しない領域の場合は None を返してください",
         )
 
+    def test_batch_canonical_intersection_preserves_order(self):
+        domains_a = [f"{{ [i] : 0 <= i < {n} }}" for n in range(1, 6)]
+        domains_b = ["{ [i] : i >= 3 }"] * len(domains_a)
+        expected = [lvl01.canonical_intersection(a, b) for a, b in zip(domains_a, domains_b)]
+
+        for backend in ("serial", "thread", "process"):
+            with self.subTest(backend=backend):
+                result = lvl01.batch_canonical_intersection(
+                    domains_a,
+                    domains_b,
+                    backend=backend,
+                    max_workers=2,
+                    chunksize=2,
+                )
+                self.assertEqual(result, expected, "入力順に結果を並べてください")
+
+    def test_batch_eliminate_dim_with_single_dimension(self):
+        domains = [
+            "{ [i, j] : 0 <= i < 4 and j = i + 1 }",
+            "{ [i, j] : i = j and i < j }",
+        ]
+        result = lvl01.batch_eliminate_dim(domains, "j", backend="process", max_workers=2)
+        self.assertEqual(isl.Set(result[0]), isl.Set("{ [i] : 0 <= i < 4 }"))
+        self.assertIsNone(result[1])
+
+    def test_batch_find_lexmin_point_returns_strings(self):
+        domains = [
+            "{ [i, j] : 0 <= i < 3 and 0 <= j < 3 and i + j >= 2 }",
+            "{ [i, j] : i > j and j > i }",
+        ]
+        result = lvl01.batch_find_lexmin_point(domains, backend="process", max_workers=2)
+        self.assertIsInstance(result[0], str)
+        point = isl.Set(result[0]).sample_point()
+        self.assertEqual(
+            [point.get_coordinate_val(isl.dim_type.set, i).to_python() for i in range(2)],
+            [0, 2],
+        )
+        self.assertIsNone(result[1])
+
+    def test_batch_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            lvl01.batch_find_lexmin_point(["{ [i] : i = 0 }"], backend="gpu")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -43,6 +43,76 @@ class Level02DependenceAnalysisTest(unittest.TestCase):
             "重なりの無いアクセスでは依存が存在しないため None を返してください",
         )
 
+    def test_construct_flow_dependences_value_based(self):
+        iteration_domain = "{ S[t, i] : 0 <= t < 3 and 0 <= i < 4 }"
+        read_accesses = "{ S[t, i] -> A[i] }"
+        write_accesses = "{ S[t, i] -> A[i] }"
+        schedule = "{ S[t, i] -> [t, i] }"
+
+        result = lvl02.construct_flow_dependences(
+            iteration_domain,
+            read_accesses,
+            write_accesses,
+            schedule=schedule,
+        )
+
+        expected = isl.UnionMap("{ S[t, i] -> S[t + 1, i] : 0 <= t < 2 and 0 <= i < 4 }")
+        self.assertTrue(
+            result.is_equal(expected),
+            "値ベース依存では直前の書き込みだけを結んでください",
+        )
+        memory_based = lvl02.construct_flow_dependences(
+            iteration_domain,
+            read_accesses,
+            write_accesses,
+        )
+        self.assertTrue(result.is_subset(memory_based))
+        self.assertFalse(result.is_equal(memory_based))
+
+    def test_compute_dataflow_dependences_reports_war_and_waw(self):
+        iteration_domain = "{ S[t, i] : 0 <= t < 3 and 0 <= i < 4 }"
+        read_accesses = "{ S[t, i] -> A[i - 1] : i > 0 }"
+        write_accesses = "{ S[t, i] -> A[i] }"
+        schedule = isl.Schedule.from_domain(isl.UnionSet(iteration_domain)).insert_partial_schedule(
+            isl.MultiUnionPwAff("[{ S[t, i] -> [(t)] }, { S[t, i] -> [(i)] }]")
+        )
+
+        deps = lvl02.compute_dataflow_dependences(
+            iteration_domain,
+            read_accesses,
+            write_accesses,
+            schedule,
+        )
+
+        self.assertIsNotNone(deps)
+        self.assertTrue(
+            deps.raw.is_equal(
+                isl.UnionMap("{ S[t, i] -> S[t, i + 1] : 0 <= t < 3 and 0 <= i < 3 }")
+            )
+        )
+        self.assertTrue(
+            deps.war.is_equal(
+                isl.UnionMap("{ S[t, i] -> S[t + 1, i - 1] : 0 <= t < 2 and 0 < i < 4 }")
+            ),
+            "WAR は次の書き込みまでの読み出しだけを結んでください",
+        )
+        self.assertTrue(
+            deps.waw.is_equal(
+                isl.UnionMap("{ S[t, i] -> S[t + 1, i] : 0 <= t < 2 and 0 <= i < 4 }")
+            )
+        )
+        self.assertTrue(deps.raw.is_subset(deps.union()))
+
+    def test_compute_dataflow_dependences_empty(self):
+        self.assertIsNone(
+            lvl02.compute_dataflow_dependences(
+                "{ S[i] : 0 <= i < 3 }",
+                "{ S[i] -> A[i] }",
+                "{ S[i] -> B[i] }",
+                "{ S[i] -> [i] }",
+            )
+        )
+
     def test_simplify_dependence_domain(self):
         dependences = isl.UnionMap.read_from_str(
             isl.DEFAULT_CONTEXT,
@@ -69,6 +139,58 @@ class Level02DependenceAnalysisTest(unittest.TestCase):
             "空の依存集合は None を返してください",
         )
 
+    def test_simplify_dependence_domain_budgeted_within_budget(self):
+        dependences = isl.UnionMap(
+            "{ S[i] -> S[j] : j = i + 1 and 0 <= i < 3 and j <= 3 }"
+        )
+
+        outcome = lvl02.simplify_dependence_domain_budgeted(dependences, max_operations=100_000)
+
+        self.assertEqual(outcome.truncated, ())
+        self.assertTrue(
+            outcome.result.is_equal(lvl02.simplify_dependence_domain(dependences))
+        )
+
+    def test_simplify_dependence_domain_budgeted_reports_truncation(self):
+        dependences = isl.UnionMap(
+            "{ S[i, j] -> S[i + 1, j2] : 0 <= i < 100 and 0 <= j <= j2 < 100; "
+            "S[i, j] -> S[i2, j] : 0 <= i < i2 < 100 and 0 <= j < 100 }"
+        )
+
+        outcome = lvl02.simplify_dependence_domain_budgeted(dependences, max_operations=1)
+
+        self.assertIn("coalesce", outcome.truncated)
+        self.assertIn("detect_equalities", outcome.truncated)
+        self.assertTrue(
+            outcome.result.is_equal(dependences),
+            "打ち切られた場合でも関係そのものは変えずに返してください",
+        )
+        self.assertEqual(
+            isl.DEFAULT_CONTEXT.get_max_operations(),
+            0,
+            "上限は呼び出し後に元へ戻してください",
+        )
+
+    def test_budget_exhaustion_returns_none(self):
+        dependence = isl.Map("{ [i, j] -> [i + 1, j + 2] : 0 <= i < 4 and 0 <= j < 4 }")
+        self.assertIsNone(lvl02.compute_min_distance_vector(dependence, max_operations=1))
+        self.assertEqual(
+            lvl02.compute_min_distance_vector(dependence, max_operations=100_000),
+            (1, 2),
+        )
+
+        dependences = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 3 }")
+        self.assertIsNone(
+            lvl02.validate_schedule_legality(
+                dependences, "{ S[i] -> [i] : 0 <= i < 4 }", max_operations=1
+            )
+        )
+        self.assertTrue(
+            lvl02.validate_schedule_legality(
+                dependences, "{ S[i] -> [i] : 0 <= i < 4 }", max_operations=100_000
+            )
+        )
+
     def test_compute_min_distance_vector(self):
         dependence = isl.Map.read_from_str(
             isl.DEFAULT_CONTEXT,
@@ -116,6 +238,149 @@ class Level02DependenceAnalysisTest(unittest.TestCase):
             "依存を壊すスケジュールは非法と判定してください",
         )
 
+    def test_legality_checker_matches_validate(self):
+        dependences = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 3 }")
+        checker = lvl02.LegalityChecker(dependences)
+        candidates = ["{ S[i] -> [i] : 0 <= i < 4 }", "{ S[i] -> [-i] : 0 <= i < 4 }"]
+
+        reports = checker.check_many(candidates)
+
+        self.assertEqual(
+            [report.legal for report in reports],
+            [lvl02.validate_schedule_legality(dependences, c) for c in candidates],
+        )
+        self.assertIsNone(reports[0].violated)
+        self.assertEqual(reports[1].dimension, 0)
+        self.assertTrue(reports[1].violated.is_equal(isl.Map("{ S[i] -> S[i + 1] : 0 <= i < 3 }")))
+
+    def test_legality_checker_reports_violated_map_and_dimension(self):
+        dependences = isl.UnionMap(
+            "{ S[i, j] -> S[i, j + 1] : 0 <= i < 4 and 0 <= j < 3; "
+            "T[i, j] -> T[i + 1, j - 1] : 0 <= i < 3 and 0 < j < 4 }"
+        )
+        checker = lvl02.LegalityChecker(dependences)
+        self.assertEqual(len(checker), 2)
+
+        interchanged = "{ S[i, j] -> [j, i]; T[i, j] -> [j, i] }"
+        report = checker.check(interchanged)
+
+        self.assertFalse(report.legal)
+        self.assertEqual(report.violated.get_tuple_name(isl.dim_type.in_), "T")
+        self.assertEqual(report.dimension, 0, "最外次元で負の距離が現れるはずです")
+
+        zero_distance = "{ S[i, j] -> [i, 0]; T[i, j] -> [i, j] }"
+        report = checker.check(zero_distance)
+        self.assertFalse(report.legal)
+        self.assertIsNone(report.dimension, "全次元で距離 0 の場合は次元を None にしてください")
+
+    def test_legality_checker_first_legal(self):
+        checker = lvl02.LegalityChecker(isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 3 }"))
+        self.assertEqual(
+            checker.first_legal(["{ S[i] -> [-i] }", "{ S[i] -> [0] }", "{ S[i] -> [2i] }"]),
+            2,
+        )
+        self.assertIsNone(checker.first_legal(["{ S[i] -> [-i] }"]))
+
+    def test_shard_accesses_by_array_orders_by_cost(self):
+        reads = (
+            "{ S[i, j] -> A[i, j - 1] : j >= 1; S[i, j] -> A[i - 1, j] : i >= 1; "
+            "T[i] -> B[i - 1] : i >= 1; T[i] -> C[i] }"
+        )
+        writes = "{ S[i, j] -> A[i, j]; T[i] -> B[i]; U[i] -> D[i] }"
+
+        shards = lvl02.shard_accesses_by_array(reads, writes)
+
+        self.assertEqual([shard.array for shard in shards], ["A", "B"], "読み書き両方がある配列だけです")
+        self.assertGreater(shards[0].cost, shards[1].cost)
+        self.assertTrue(isl.UnionMap(shards[1].writes).is_equal(isl.UnionMap("{ T[i] -> B[i] }")))
+
+    def test_construct_flow_dependences_sharded_matches_unsharded(self):
+        domain = "{ S[i] : 0 <= i < 8; T[i] : 0 <= i < 8 }"
+        reads = "{ S[i] -> A[i - 1] : i >= 1; T[i] -> A[i]; T[i] -> B[i - 2] : i >= 2 }"
+        writes = "{ S[i] -> A[i]; T[i] -> B[i] }"
+        schedule_map = "{ S[i] -> [i, 0]; T[i] -> [i, 1] }"
+        tree = isl.Schedule("{ domain: \"%s\", child: { schedule: \"[%s]\" } }" % (
+            domain, "{ S[i] -> [(i)]; T[i] -> [(i)] }"
+        ))
+
+        for backend in ("serial", "thread", "process"):
+            with self.subTest(backend=backend):
+                for schedule in (None, schedule_map):
+                    expected = lvl02.construct_flow_dependences(domain, reads, writes, schedule)
+                    result = lvl02.construct_flow_dependences_sharded(
+                        domain, reads, writes, schedule, backend=backend, max_workers=2
+                    )
+                    self.assertTrue(result.is_equal(expected))
+
+        expected = lvl02.construct_flow_dependences(domain, reads, writes, tree)
+        result = lvl02.construct_flow_dependences_sharded(domain, reads, writes, tree, backend="serial")
+        self.assertTrue(result.is_equal(expected))
+        self.assertIsNone(
+            lvl02.construct_flow_dependences_sharded(domain, "{ T[i] -> C[i] }", writes, backend="serial")
+        )
+
+    def test_construct_flow_dependences_sharded_mixed_parameters(self):
+        domain = "[N] -> { S[i] : 0 <= i < N }"
+        reads = "[N] -> { S[i] -> A[i - 1] : i >= 1 }"
+        writes = "{ S[i] -> A[i] }"
+
+        self.assertEqual([shard.array for shard in lvl02.shard_accesses_by_array(reads, writes)], ["A"])
+        expected = lvl02.construct_flow_dependences(domain, reads, writes)
+        result = lvl02.construct_flow_dependences_sharded(domain, reads, writes, backend="serial")
+        self.assertIsNotNone(result, "片側だけがパラメータを持つ配列も同じシャードに入るはずです")
+        self.assertTrue(result.is_equal(expected))
+
+    def test_relation_size(self):
+        size = lvl02.relation_size(
+            isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 7; T[i] -> T[i] : i = 0 or i = 5 }")
+        )
+        self.assertEqual(size.basic_sets, 3)
+        self.assertLess(lvl02.RelationSize(1, 9), lvl02.RelationSize(2, 0))
+
+    def test_compact_relation_without_context(self):
+        relation = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 7 and i < 9; S[i] -> S[i + 1] : i = 7 }")
+
+        report = lvl02.compact_relation(relation)
+
+        self.assertTrue(report.result.is_equal(relation))
+        self.assertEqual(report.after, lvl02.RelationSize(1, 3))
+        self.assertEqual(report.removed_basic_sets, 1)
+        self.assertNotIn("gist", report.steps)
+
+        minimal = lvl02.compact_relation(report.result)
+        self.assertEqual(minimal.steps, (), "すでに最小なら入力をそのまま返します")
+
+    def test_compact_relation_with_domain_context(self):
+        domain = "{ S[i, j] : 0 <= i < 8 and 0 <= j < 8 }"
+        context = isl.UnionSet(domain)
+        dependences = lvl02.construct_flow_dependences(
+            domain, "{ S[i, j] -> A[i - 1, j] : i >= 1 }", "{ S[i, j] -> A[i, j] }"
+        )
+        schedule = isl.UnionMap("{ S[i, j] -> [i, j] : 0 <= i < 8 and 0 <= j < 8 }")
+
+        deps = lvl02.compact_relation(dependences, domain)
+        theta = lvl02.compact_relation(schedule, context)
+
+        self.assertIn("gist", deps.steps)
+        self.assertGreater(deps.removed_constraints, 0)
+        self.assertGreater(theta.removed_constraints, 0)
+
+        def restrict(relation: isl.UnionMap) -> isl.UnionMap:
+            return relation.intersect_domain(context).intersect_range(context)
+
+        self.assertTrue(restrict(deps.result).is_equal(restrict(dependences)))
+        self.assertTrue(theta.result.intersect_domain(context).is_equal(schedule))
+
+        for candidate in ("{ S[i, j] -> [i, j] }", "{ S[i, j] -> [-i, j] }"):
+            with self.subTest(schedule=candidate):
+                self.assertEqual(
+                    lvl02.validate_schedule_legality(deps.result, candidate, context=context),
+                    lvl02.validate_schedule_legality(dependences, candidate),
+                )
+
+        # context に空間が無い写像（ここではスケジュールの値域）は gist の対象外で、落とされません。
+        self.assertFalse(theta.result.is_empty())
+
 
 if __name__ == "__main__":
     unittest.main()
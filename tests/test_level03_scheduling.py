@@ -3,6 +3,7 @@ import unittest
 import islpy as isl
 
 from src.isl_practice import level03_scheduling as lvl03
+from src.isl_practice.schedule_tree import schedule_from_map
 
 
 class Level03SchedulingTest(unittest.TestCase):
@@ -156,6 +157,51 @@ class Level03SchedulingTest(unittest.TestCase):
                 )
                 sub = sub.get_child(0)
 
+    def test_plan_filter_fusion_fuses_producer_consumer(self):
+        domain = "{ S[i] : 0 <= i < 4; T[i] : 0 <= i < 4 }"
+        schedule_map = "{ S[i] -> [i]; T[i] -> [i] }"
+        filters = ("{ S[i] }", "{ T[i] }")
+        reads = "{ T[i] -> A[i] }"
+        writes = "{ S[i] -> A[i]; T[i] -> B[i] }"
+
+        plan = lvl03.plan_filter_fusion(domain, schedule_map, filters, reads, writes)
+
+        self.assertIsNotNone(plan)
+        self.assertEqual(plan.groups, ((0, 1),))
+        self.assertEqual(plan.score, 4, "共有する A の 4 要素が再利用量になるはずです")
+        band = plan.schedule.get_root().get_child(0)
+        self.assertEqual(band.get_type(), isl.schedule_node_type.band)
+        self.assertEqual(band.get_child(0).get_type(), isl.schedule_node_type.sequence)
+        expected = isl.UnionMap("{ S[i] -> [i, 0] : 0 <= i < 4; T[i] -> [i, 1] : 0 <= i < 4 }")
+        self.assertTrue(plan.schedule.get_map().is_equal(expected))
+
+        auto = lvl03.arrange_filters_with_strategy(
+            domain, schedule_map, filters, "auto", reads, writes
+        )
+        self.assertTrue(auto.get_map().is_equal(expected))
+
+    def test_plan_filter_fusion_splits_illegal_or_unrelated_filters(self):
+        domain = "{ S[i] : 0 <= i < 4; T[i] : 0 <= i < 3; U[i] : 0 <= i < 4 }"
+        schedule_map = "{ S[i] -> [i]; T[i] -> [i]; U[i] -> [i] }"
+        filters = ("{ S[i] }", "{ T[i] }", "{ U[i] }")
+        # T[i] は S[i + 1] の結果を読むため、同じループに入れると依存に違反します。
+        reads = "{ T[i] -> A[i + 1] }"
+        writes = "{ S[i] -> A[i]; T[i] -> B[i]; U[i] -> C[i] }"
+
+        plan = lvl03.plan_filter_fusion(domain, schedule_map, filters, reads, writes)
+
+        self.assertEqual(plan.groups, ((0,), (1,), (2,)))
+        self.assertEqual(plan.score, 0)
+        seq = plan.schedule.get_root().get_child(0)
+        self.assertEqual(seq.get_type(), isl.schedule_node_type.sequence)
+        self.assertEqual(seq.n_children(), 3)
+
+    def test_arrange_filters_auto_requires_accesses(self):
+        domain = "{ S[i] : 0 <= i < 4 }"
+        self.assertIsNone(
+            lvl03.arrange_filters_with_strategy(domain, "{ S[i] -> [i] }", (domain,), "auto")
+        )
+
     def test_collect_vectorization_candidates(self):
         domain = (
             "{ S[i, j] : 0 <= i < 2 and 0 <= j < 4; "
@@ -198,6 +244,56 @@ class Level03SchedulingTest(unittest.TestCase):
             "coincident 指定が無ければ空辞書を返してください",
         )
 
+    def test_rank_vectorization_candidates_prefers_unit_stride(self):
+        domain = "{ S[i, j] : 0 <= i < 8 and 0 <= j < 8 }"
+        schedule = schedule_from_map(domain, "{ S[i, j] -> [i, j] }")
+        reads = "{ S[i, j] -> A[i, j]; S[i, j] -> x[i] }"
+        writes = "{ S[i, j] -> C[i, j] }"
+
+        ranked = lvl03.rank_vectorization_candidates(
+            schedule, {"S": [(0, 0), (0, 1)]}, reads, writes
+        )
+
+        self.assertEqual([(c.depth, c.member) for c in ranked], [(0, 1), (0, 0)])
+        inner = {stride.array: stride.kind for stride in ranked[0].accesses}
+        self.assertEqual(inner, {"A": "unit", "x": "broadcast", "C": "unit"})
+        self.assertEqual(ranked[0].efficiency, 1.0)
+        outer = {stride.array: stride.kind for stride in ranked[1].accesses}
+        self.assertEqual(outer, {"A": "gather", "x": "unit", "C": "scatter"})
+        self.assertEqual(ranked[1].accesses[0].delta, (1, 0))
+        self.assertLess(ranked[1].efficiency, ranked[0].efficiency)
+
+    def test_rank_vectorization_candidates_penalizes_reductions(self):
+        domain = "{ S[i, j, k] : 0 <= i < 8 and 0 <= j < 8 and 0 <= k < 8 }"
+        schedule = schedule_from_map(domain, "{ S[i, j, k] -> [i, j, k] }")
+        reads = "{ S[i, j, k] -> C[i, j]; S[i, j, k] -> A[i, k]; S[i, j, k] -> B[k, j] }"
+        writes = "{ S[i, j, k] -> C[i, j] }"
+
+        ranked = lvl03.rank_vectorization_candidates(
+            schedule, {"S": [(0, 1), (0, 2)]}, reads, writes
+        )
+
+        self.assertEqual([c.member for c in ranked], [1, 2])
+        k = ranked[1]
+        kinds = {(stride.array, stride.is_write): stride.kind for stride in k.accesses}
+        self.assertEqual(kinds[("C", True)], "reduction", "k に沿った C への書き込みは縮約です")
+        self.assertEqual(kinds[("C", False)], "broadcast")
+        costs = lvl03.VECTOR_ACCESS_COSTS
+        self.assertAlmostEqual(
+            k.efficiency,
+            4 / (costs["broadcast"] + costs["unit"] + costs["gather"] + costs["reduction"]),
+        )
+
+    def test_rank_vectorization_candidates_skips_unknown_bands(self):
+        domain = "{ S[i] : 0 <= i < 8 }"
+        schedule = schedule_from_map(domain, "{ S[i] -> [i] }")
+
+        ranked = lvl03.rank_vectorization_candidates(
+            schedule, {"S": [(1, 0), (0, 3)], "T": [(0, 0)]}, "{ S[i] -> A[2i] }", "{ }"
+        )
+
+        self.assertEqual(ranked, [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level04_ast_generation as lvl04
+from src.isl_practice.level04_ast_generation import Block, For, If, Int, Op, User, Var
+from src.isl_practice.schedule_tree import schedule_from_map, tile_band
+
+_DOMAIN = "{ S[i, j] : 0 <= i < 10 and 0 <= j < 11 }"
+_SCHEDULE = "{ S[i, j] -> [i, j] }"
+
+
+def _points(domain: isl.UnionSet) -> set[tuple[str, tuple[int, ...]]]:
+    points = set()
+
+    def add(point: isl.Point) -> None:
+        space = point.get_space()
+        coords = tuple(
+            point.get_coordinate_val(isl.dim_type.set, k).to_python()
+            for k in range(space.dim(isl.dim_type.set))
+        )
+        points.add((space.get_tuple_name(isl.dim_type.set), coords))
+
+    domain.foreach_point(add)
+    return points
+
+
+def _call(name: str, *args) -> User:
+    return User(Op("call", (Var(name), *args)))
+
+
+class Level04AstGenerationTest(unittest.TestCase):
+    def setUp(self):
+        self.schedule = schedule_from_map(_DOMAIN, _SCHEDULE)
+
+    def test_full_tiles(self):
+        tiled = tile_band(self.schedule, (0,), (4, 4))
+        full = lvl04.full_tiles(tiled, (0,), (4, 4))
+
+        self.assertTrue(full.is_equal(isl.Set("{ [t0, t1] : t0 = 0 or t0 = 4 }").intersect(
+            isl.Set("{ [t0, t1] : t1 = 0 or t1 = 4 }")
+        )))
+        self.assertIsNone(lvl04.full_tiles(self.schedule, (0,), (4, 4)), "点バンドが無い場合は None です")
+
+    def test_generate_tiled_ast_removes_guards_from_full_tiles(self):
+        result = lvl04.generate_tiled_ast(self.schedule, (0,), (4, 4), unroll_factor=2)
+
+        self.assertEqual(result.conditionals_before, (1,))
+        self.assertIn(
+            0, result.conditionals_generated, "isolate で分離した完全タイルは条件分岐を含まないはずです"
+        )
+        self.assertEqual(result.conditionals_after, result.conditionals_generated)
+        self.assertEqual((result.total_before, result.total_generated, result.total_after), (1, 3, 3))
+
+        calls = list(lvl04.execute(result.ast))
+        self.assertEqual(len(calls), len(set(calls)))
+        self.assertEqual(set(calls), _points(isl.UnionSet(_DOMAIN)))
+        self.assertEqual(calls, list(lvl04.execute(lvl04.build_ast(result.schedule))))
+        self.assertIn("for (int", result.code)
+
+    def test_generate_tiled_ast_drops_guards_left_by_isl(self):
+        # unroll した端数タイルで、isl は外側の `if (c0 >= 2)` から導ける
+        # `if (c0 + c2 >= 2)` を残します。
+        domain = "{ S[i, j] : 0 <= i < 13 and 0 <= j < 5 and 2j <= i + 6 }"
+        result = lvl04.generate_tiled_ast(
+            schedule_from_map(domain, _SCHEDULE), (0,), (2, 2), unroll_factor=2
+        )
+
+        generated = lvl04.build_ast(result.schedule)
+        self.assertEqual(lvl04.innermost_conditionals(generated), result.conditionals_generated)
+        self.assertEqual(result.total_generated - result.total_after, 1)
+        self.assertNotIn("if (c0 + c2 >= 2)", result.code)
+        self.assertEqual(list(lvl04.execute(result.ast)), list(lvl04.execute(generated)))
+        self.assertEqual(set(lvl04.execute(result.ast)), _points(isl.UnionSet(domain)))
+
+    def test_generate_tiled_ast_parametric(self):
+        schedule = schedule_from_map("[N] -> { S[i] : 0 <= i < N }", "[N] -> { S[i] -> [i] }")
+        result = lvl04.generate_tiled_ast(
+            schedule, (0,), (8,), unroll_factor=4, context="[N] -> { : 16 <= N <= 1024 }"
+        )
+
+        for n in (16, 37, 64):
+            calls = list(lvl04.execute(result.ast, {"N": n}))
+            self.assertEqual(calls, [("S", (i,)) for i in range(n)])
+
+    def test_unroll_point_loop(self):
+        tiled = tile_band(self.schedule, (0,), (4, 4))
+        self.assertIs(lvl04.unroll_point_loop(tiled, (0, 0), 1), tiled)
+        self.assertIsNone(lvl04.unroll_point_loop(tiled, (0, 0), 0))
+        self.assertIsNone(lvl04.unroll_point_loop(tiled, (0, 0, 0, 0), 2))
+
+        unrolled = lvl04.unroll_point_loop(tiled, (0, 0), 2)
+        split = unrolled.get_root().get_child(0).get_child(0)
+        self.assertEqual(split.band_n_member(), 1, "最内メンバーは別バンドに分割されるはずです")
+        inner = split.get_child(0).get_child(0)
+        self.assertEqual(inner.band_member_get_ast_loop_type(0), isl.ast_loop_type.unroll)
+
+    def test_simplify_ast_removes_redundant_guards_and_dead_code(self):
+        c = Var("c")
+        body = Block(
+            (
+                If(Op("le", (c, Int(9))), _call("S", c)),
+                If(
+                    Op("ge", (c, Int(10))),
+                    _call("T", c),
+                    _call("U", Op("min", (Int(3), Op("sub", (Int(9), c))))),
+                ),
+                If(Op("le", (c, Int(2))), If(Op("le", (c, Int(4))), _call("V", c))),
+            )
+        )
+        loop = For("c", Int(0), Op("le", (c, Int(5))), 1, body)
+        dead = For("d", Int(4), Op("le", (Var("d"), Int(3))), 1, _call("W", Var("d")))
+        tree = Block((dead, loop))
+
+        simplified = lvl04.simplify_ast(tree)
+
+        self.assertEqual(lvl04.innermost_conditionals(tree), (0, 5))
+        self.assertEqual(lvl04.innermost_conditionals(simplified), (1,))
+        self.assertIsInstance(simplified, For, "実行されないループは取り除かれるはずです")
+        self.assertEqual(
+            lvl04.to_c(simplified),
+            "for (int c = 0; c <= 5; c += 1) {\n"
+            "  S(c);\n"
+            "  U(3);\n"
+            "  if (c <= 2)\n"
+            "    V(c);\n"
+            "}\n",
+        )
+        self.assertEqual(list(lvl04.execute(simplified)), list(lvl04.execute(tree)))
+
+    def test_expr_to_c_keeps_parentheses_for_mixed_multiplicative_operators(self):
+        c = Var("c")
+        cases = [
+            (Op("mul", (Int(4), Op("pdiv_q", (Op("add", (c, Int(3))), Int(4))))), "4 * ((c + 3) / 4)"),
+            (Op("mul", (Var("a"), Op("pdiv_r", (c, Int(4))))), "a * (c % 4)"),
+            (Op("pdiv_q", (c, Op("mul", (Int(2), Int(4))))), "c / (2 * 4)"),
+            (Op("mul", (Op("pdiv_q", (c, Int(4))), Int(2))), "c / 4 * 2"),
+            (Op("mul", (Var("a"), Op("mul", (c, Int(2))))), "a * c * 2"),
+            (Op("add", (Var("a"), Op("add", (c, Int(2))))), "a + c + 2"),
+            (Op("sub", (Var("a"), Op("add", (c, Int(2))))), "a - (c + 2)"),
+        ]
+        for expr, expected in cases:
+            with self.subTest(expected=expected):
+                self.assertEqual(lvl04.expr_to_c(expr), expected)
+        self.assertEqual(
+            lvl04.to_c(_call("S", Op("mul", (Int(4), Op("pdiv_q", (c, Int(4))))))),
+            "S(4 * (c / 4));\n",
+        )
+
+    def test_simplify_ast_uses_parameter_bounds(self):
+        n = Var("N")
+        tree = For("c", Int(0), Op("lt", (Var("c"), n)), 1, If(Op("ge", (n, Int(4))), _call("S", Var("c"))))
+
+        self.assertIsInstance(lvl04.simplify_ast(tree).body, If)
+        self.assertIsInstance(lvl04.simplify_ast(tree, {"N": (8, None)}).body, User)
+        self.assertIsNone(lvl04.simplify_ast(tree, {"N": (0, 0)}))
+
+
+if __name__ == "__main__":
+    unittest.main()
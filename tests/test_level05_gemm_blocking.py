@@ -0,0 +1,110 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import level04_ast_generation as lvl04
+from src.isl_practice import level05_gemm_blocking as lvl05
+from src.isl_practice import workloads
+from src.isl_practice.tile_autotuning import CacheCapacity
+
+
+class Level05GemmBlockingTest(unittest.TestCase):
+    def test_analyze_gemm(self):
+        w = workloads.gemm(16)
+        shape = lvl05.analyze_gemm(w.domain, w.reads, w.writes)
+        self.assertEqual(shape, lvl05.GemmShape("S", 0, 1, 2, (16, 16, 16), "A", "B", "C"))
+
+        # C が列優先なら、連続方向の列は i になります。
+        shape = lvl05.analyze_gemm(
+            "{ T[k, i, j] : 0 <= i < 8 and 0 <= j < 4 and 0 <= k < 2 }",
+            "{ T[k, i, j] -> X[i, k]; T[k, i, j] -> Y[k, j]; T[k, i, j] -> Z[j, i] }",
+            "{ T[k, i, j] -> Z[j, i] }",
+        )
+        self.assertEqual((shape.row, shape.col, shape.reduction), (2, 1, 0))
+        self.assertEqual(shape.extents, (4, 8, 2))
+        self.assertEqual((shape.a, shape.b), ("Y", "X"))
+
+        j = workloads.jacobi_2d(8, 1)
+        self.assertIsNone(lvl05.analyze_gemm(j.domain, j.reads, j.writes))
+        self.assertIsNone(
+            lvl05.analyze_gemm(
+                "[N] -> { S[i, j, k] : 0 <= i, j, k < N }",
+                "[N] -> { S[i, j, k] -> A[i, k]; S[i, j, k] -> B[k, j] }",
+                "[N] -> { S[i, j, k] -> C[i, j] }",
+            ),
+            "反復数が定数でない場合は None です",
+        )
+
+    def test_register_blockings_fit_in_registers(self):
+        machine = lvl05.MachineModel()
+        blockings = lvl05.register_blockings(machine)
+
+        self.assertIn((6, 16), blockings)
+        self.assertNotIn((7, 16), blockings)
+        for mr, nr in blockings:
+            self.assertEqual(nr % machine.vector_width, 0)
+            cost = lvl05.estimate_cost(
+                lvl05.GemmShape("S", 0, 1, 2, (96, 96, 96), "A", "B", "C"),
+                lvl05.GemmBlocking(mr, nr, 96, 96, 96),
+                machine,
+            )
+            self.assertLessEqual(cost.registers, machine.vector_registers)
+
+    def test_cost_model_penalizes_latency_and_edge_tiles(self):
+        machine = lvl05.MachineModel()
+        shape = lvl05.GemmShape("S", 0, 1, 2, (96, 96, 96), "A", "B", "C")
+
+        small = lvl05.estimate_cost(shape, lvl05.GemmBlocking(1, 8, 96, 96, 96), machine)
+        large = lvl05.estimate_cost(shape, lvl05.GemmBlocking(6, 16, 96, 96, 96), machine)
+        self.assertLess(small.efficiency, 1.0, "累積レジスタが少ないと FMA のレイテンシが隠れません")
+        self.assertEqual(large.efficiency, 1.0)
+        self.assertLess(large.total, small.total)
+
+        ragged = lvl05.GemmShape("S", 0, 1, 2, (97, 96, 96), "A", "B", "C")
+        self.assertGreater(
+            lvl05.estimate_cost(ragged, lvl05.GemmBlocking(6, 16, 96, 102, 96), machine).compute_cycles,
+            large.compute_cycles,
+        )
+
+    def test_choose_cache_blocking(self):
+        machine = lvl05.MachineModel(l3=None)
+        shape = lvl05.GemmShape("S", 0, 1, 2, (1000, 500, 2000), "A", "B", "C")
+
+        blocking = lvl05.choose_cache_blocking(shape, machine, 6, 16)
+
+        size = machine.element_bytes
+        self.assertLessEqual((6 + 16) * blocking.kc * size, machine.l1.usable_bytes)
+        self.assertLessEqual(blocking.mc * blocking.kc * size, machine.l2.usable_bytes)
+        self.assertEqual(blocking.mc % 6, 0)
+        self.assertEqual(blocking.nc, 512, "L3 が無ければ N を NR の倍数に切り上げた値です")
+
+    def test_generate_gemm_schedules(self):
+        w = workloads.gemm(20)
+        machine = lvl05.MachineModel(vector_width=4, l1=CacheCapacity(1024), l2=CacheCapacity(4096))
+
+        candidates = lvl05.generate_gemm_schedules(w.domain, w.reads, w.writes, machine, limit=3)
+
+        self.assertEqual(len(candidates), 3)
+        totals = [candidate.cost.total for candidate in candidates]
+        self.assertEqual(totals, sorted(totals))
+
+        dataflow = lvl02.compute_dataflow_dependences(w.domain, w.reads, w.writes, w.schedule)
+        expected = {("S", (i, j, k)) for i in range(20) for j in range(20) for k in range(20)}
+        for candidate in candidates:
+            with self.subTest(blocking=candidate.blocking):
+                self.assertTrue(lvl02.validate_schedule_legality(dataflow.union(), candidate.schedule))
+                calls = list(lvl04.execute(lvl04.build_ast(candidate.schedule)))
+                self.assertEqual(len(calls), len(expected))
+                self.assertEqual(set(calls), expected)
+
+        micro = candidates[0].schedule.get_root().get_child(0).get_child(0).get_child(0).get_child(0)
+        self.assertEqual(micro.band_n_member(), 2)
+        self.assertEqual(micro.band_member_get_ast_loop_type(1), isl.ast_loop_type.unroll)
+
+        j = workloads.jacobi_2d(8, 1)
+        self.assertIsNone(lvl05.generate_gemm_schedules(j.domain, j.reads, j.writes))
+
+
+if __name__ == "__main__":
+    unittest.main()
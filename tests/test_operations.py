@@ -0,0 +1,39 @@
+import unittest
+
+from src.isl_practice import operations
+
+
+class OperationsTest(unittest.TestCase):
+    def test_registry_covers_public_level_functions(self):
+        names = operations.list_operations()
+        self.assertIn("level01.canonical_intersection", names)
+        self.assertIn("level02.construct_flow_dependences", names)
+        self.assertIn("level03.apply_band_tiling", names)
+        self.assertFalse(any(name.split(".")[1].startswith("_") for name in names))
+        self.assertNotIn("level02.run_with_budget", names, "import した関数は登録しないでください")
+
+    def test_isl_arguments_are_parsed_from_strings(self):
+        result = operations.execute(
+            "level02.simplify_dependence_domain",
+            ["{ S[i] -> S[i + 1] : 0 <= i < 2; S[i] -> S[i + 1] : 2 <= i < 4 }"],
+        )
+        self.assertEqual(result, "{ S[i] -> S[1 + i] : 0 <= i <= 3 }")
+
+    def test_dataclass_results_are_encoded(self):
+        result = operations.execute(
+            "level02.compute_dataflow_dependences",
+            ["{ S[i] : 0 <= i < 4 }", "{ S[i] -> A[i - 1] }", "{ S[i] -> A[i] }"],
+            {"schedule": "{ S[i] -> [i] }"},
+        )
+        self.assertEqual(set(result), {"raw", "war", "waw"})
+        self.assertIsInstance(result["raw"], str)
+
+    def test_errors(self):
+        with self.assertRaises(KeyError):
+            operations.execute("level01.unknown")
+        with self.assertRaises(TypeError):
+            operations.execute("level01.canonical_intersection", ["{ [i] }"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level01_iteration_sets as lvl01
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import parametric
+from src.isl_practice.contexts import use_context
+
+
+class ParametricTest(unittest.TestCase):
+    def test_parametric_flow_dependences_specialize(self):
+        result = parametric.parametric_flow_dependences(
+            "[N] -> { S[i] : 0 <= i < N }",
+            "[N] -> { S[i] -> A[i - 1] : 1 <= i < N }",
+            "[N] -> { S[i] -> A[i] : 0 <= i < N }",
+        )
+
+        self.assertIsNotNone(result)
+        self.assertEqual(result.params, ("N",))
+        for size in (4, 9):
+            with self.subTest(N=size):
+                concrete = lvl02.construct_flow_dependences(
+                    f"{{ S[i] : 0 <= i < {size} }}",
+                    f"{{ S[i] -> A[i - 1] : 1 <= i < {size} }}",
+                    f"{{ S[i] -> A[i] : 0 <= i < {size} }}",
+                )
+                self.assertTrue(
+                    result.specialize(N=size).is_equal(concrete),
+                    "具体値を代入した結果が直接解析した結果と一致しません",
+                )
+        self.assertIsNone(result.specialize(N=1), "依存が空になる具体値では None を返してください")
+
+    def test_specialize_outside_the_parsing_context(self):
+        ctx = isl.Context()
+        with use_context(ctx):
+            result = parametric.parametric_flow_dependences(
+                "[N] -> { S[i] : 0 <= i < N }",
+                "[N] -> { S[i] -> A[i - 1] : 1 <= i < N }",
+                "[N] -> { S[i] -> A[i] : 0 <= i < N }",
+            )
+        direct = parametric.parametric_flow_dependences(
+            "[N] -> { S[i] : 0 <= i < N }",
+            "[N] -> { S[i] -> A[i - 1] : 1 <= i < N }",
+            "[N] -> { S[i] -> A[i] : 0 <= i < N }",
+            ctx=ctx,
+        )
+
+        expected = isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i <= 2 }", context=ctx)
+        for candidate in (result, direct):
+            specialized = candidate.specialize(N=4)
+            self.assertEqual(specialized.get_ctx(), ctx)
+            self.assertTrue(specialized.is_equal(expected))
+
+    def test_specialization_cache_counts_hits(self):
+        result = parametric.parametric_lexmin("[N] -> { [i] : 2 <= i < N }")
+        result.specialize(N=5)
+        result.specialize(N=5)
+        result.specialize(N=6)
+
+        self.assertEqual((result.hits, result.misses), (1, 2))
+
+    def test_parametric_lexmin_is_piecewise(self):
+        domain = "[N, M] -> { [i, j] : 0 <= i < N and M <= j < N and i + j >= 2 }"
+        result = parametric.parametric_lexmin(domain)
+
+        self.assertIsInstance(result.symbolic, isl.PwMultiAff)
+        self.assertGreater(result.symbolic.n_piece(), 1)
+        for n, m in ((5, 0), (5, 3), (2, 0)):
+            with self.subTest(N=n, M=m):
+                concrete = (
+                    f"{{ [i, j] : 0 <= i < {n} and {m} <= j < {n} and i + j >= 2 }}"
+                )
+                point = lvl01.find_lexmin_point(concrete)
+                expected = tuple(
+                    point.get_coordinate_val(isl.dim_type.set, k).to_python()
+                    for k in range(2)
+                )
+                self.assertEqual(result.specialize(N=n, M=m), expected)
+
+    def test_parametric_lexmin_empty_instance(self):
+        result = parametric.parametric_lexmin("[N] -> { [i] : 0 <= i < N }")
+        self.assertIsNone(result.specialize(N=0), "空になる具体値では None を返してください")
+        self.assertIsNone(parametric.parametric_lexmin("[N] -> { [i] : i < 0 and i > 0 }"))
+
+    def test_parametric_min_distance_vector(self):
+        dependence = isl.Map("[K] -> { [i, j] -> [i + 1, j + K] : 0 <= i < 4 and 0 <= j < 4 }")
+        result = parametric.parametric_min_distance_vector(dependence)
+        self.assertEqual(result.specialize(K=3), (1, 3))
+        self.assertEqual(result.specialize(K=-2), (1, -2))
+
+    def test_specialize_rejects_wrong_parameters(self):
+        result = parametric.parametric_lexmin("[N] -> { [i] : 0 <= i < N }")
+        with self.assertRaises(ValueError):
+            result.specialize(M=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
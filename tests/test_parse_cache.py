@@ -0,0 +1,81 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level01_iteration_sets as lvl01
+from src.isl_practice import parse_cache
+
+
+class ParseCacheTest(unittest.TestCase):
+    def test_normalize_text_ignores_whitespace(self):
+        self.assertEqual(
+            parse_cache.normalize_text("{ S[i] :  0 <= i < 4 }"),
+            parse_cache.normalize_text("{S[i]:0<=i<4}"),
+            "空白の違いだけのテキストは同じキーに正規化してください",
+        )
+        self.assertIn(
+            " and ",
+            parse_cache.normalize_text("{ [i] : i >= 0   and  i < 4 }"),
+            "キーワード間の空白は保持してください",
+        )
+
+    def test_hit_and_miss_counters(self):
+        cache = parse_cache.ParseCache()
+        first = cache.get(isl.Set, "{ [i] : 0 <= i < 4 }")
+        second = cache.get(isl.Set, "{ [i] : 0<=i<4 }")
+
+        self.assertIs(first, second, "正規化後に同じテキストはキャッシュから返してください")
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = parse_cache.ParseCache(max_entries=2)
+        cache.get(isl.Set, "{ [i] : 0 <= i < 1 }")
+        cache.get(isl.Set, "{ [i] : 0 <= i < 2 }")
+        cache.get(isl.Set, "{ [i] : 0 <= i < 1 }")
+        cache.get(isl.Set, "{ [i] : 0 <= i < 3 }")
+
+        stats = cache.stats()
+        self.assertEqual(stats.entries, 2)
+        self.assertEqual(stats.evictions, 1)
+        cache.get(isl.Set, "{ [i] : 0 <= i < 1 }")
+        self.assertEqual(
+            cache.stats().hits,
+            2,
+            "最近使ったエントリは追い出されてはいけません",
+        )
+
+    def test_eviction_by_constraint_count(self):
+        cache = parse_cache.ParseCache(max_constraints=3)
+        cache.get(isl.Set, "{ [i] : 0 <= i < 4 }")
+        cache.get(isl.Set, "{ [j] : 0 <= j < 8 }")
+
+        stats = cache.stats()
+        self.assertEqual(stats.entries, 1)
+        self.assertLessEqual(stats.constraints, 3)
+
+    def test_disabled_cache_parses_every_time(self):
+        cache = parse_cache.ParseCache()
+        cache.enabled = False
+        first = cache.get(isl.UnionMap, "{ S[i] -> A[i] }")
+        second = cache.get(isl.UnionMap, "{ S[i] -> A[i] }")
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_equal(second))
+        self.assertEqual(cache.stats().misses, 0)
+
+    def test_level_functions_share_default_cache(self):
+        cache = parse_cache.get_parse_cache()
+        cache.clear()
+        domain_a = "{ [i, j] : 0 <= i < 4 and 0 <= j < 4 }"
+        domain_b = "{ [i, j] : i = j }"
+
+        lvl01.canonical_intersection(domain_a, domain_b)
+        lvl01.canonical_intersection(domain_a, domain_b)
+
+        self.assertEqual(cache.stats().hits, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
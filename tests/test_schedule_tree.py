@@ -0,0 +1,42 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import schedule_tree
+
+
+class ScheduleTreeTest(unittest.TestCase):
+    def test_schedule_from_map_builds_single_band(self):
+        schedule = schedule_tree.schedule_from_map(
+            "{ S[i, j] : 0 <= i < 4 and 0 <= j < 4 }",
+            "{ S[i, j] -> [j, i] }",
+        )
+        band = schedule_tree.node_at(schedule, (0,))
+        self.assertEqual(band.get_type(), isl.schedule_node_type.band)
+        self.assertEqual(band.band_n_member(), 2)
+        self.assertTrue(
+            schedule.get_map().is_equal(
+                isl.UnionMap("{ S[i, j] -> [j, i] : 0 <= i < 4 and 0 <= j < 4 }")
+            )
+        )
+
+    def test_node_at_invalid_path(self):
+        schedule = schedule_tree.schedule_from_map("{ S[i] : 0 <= i < 4 }", "{ S[i] -> [i] }")
+        self.assertIsNone(schedule_tree.node_at(schedule, (0, 0, 3)))
+
+    def test_tile_band(self):
+        schedule = schedule_tree.schedule_from_map(
+            "{ S[i, j] : 0 <= i < 8 and 0 <= j < 8 }",
+            "{ S[i, j] -> [i, j] }",
+        )
+        tiled = schedule_tree.tile_band(schedule, (0,), (2, 4))
+        outer = schedule_tree.node_at(tiled, (0,))
+        inner = schedule_tree.node_at(tiled, (0, 0))
+        self.assertEqual(outer.band_n_member(), 2)
+        self.assertEqual(inner.get_type(), isl.schedule_node_type.band)
+        self.assertIsNone(schedule_tree.tile_band(schedule, (0,), (2,)))
+        self.assertIsNone(schedule_tree.tile_band(schedule, (), (2, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import client
+from src.isl_practice import server
+
+_DOMAIN_A = "{ [i] : 0 <= i < 5 }"
+_DOMAIN_B = "{ [i] : i > 2 }"
+
+
+async def _drain() -> None:
+    """ループ上の残りのタスク（接続の後始末など）を完了させます。"""
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+
+class DispatchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = server.AnalysisServer(backend="serial")
+
+    def test_dispatch_ok_and_error(self):
+        ok = asyncio.run(
+            self.server.dispatch(
+                {"id": 7, "op": "level01.canonical_intersection", "args": [_DOMAIN_A, _DOMAIN_B]}
+            )
+        )
+        self.assertEqual(ok, {"id": 7, "ok": True, "result": "{ [i] : 3 <= i <= 4 }"})
+
+        error = asyncio.run(self.server.dispatch({"id": 8, "op": "level03.apply_band_tiling", "args": []}))
+        self.assertFalse(error["ok"])
+        self.assertEqual(error["error"]["type"], "TypeError")
+        self.assertEqual(self.server.errors, 1)
+
+    def test_thread_backend_uses_worker_contexts(self):
+        threaded = server.AnalysisServer(backend="thread", max_workers=2)
+        try:
+
+            async def run():
+                requests = [
+                    {"id": k, "op": "level01.canonical_intersection", "args": [_DOMAIN_A, _DOMAIN_B]}
+                    for k in range(8)
+                ]
+                return await asyncio.gather(*(threaded.dispatch(r) for r in requests))
+
+            responses = asyncio.run(run())
+        finally:
+            threaded.close()
+        self.assertEqual({r["result"] for r in responses}, {"{ [i] : 3 <= i <= 4 }"})
+
+
+class UnixSocketTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "isl.sock")
+        self.server = server.AnalysisServer(backend="process", max_workers=2)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.serving = asyncio.run_coroutine_threadsafe(self.server.serve_unix(self.path), self.loop)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.serving.cancel()
+        asyncio.run_coroutine_threadsafe(_drain(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+        self.server.close()
+        self.loop.close()
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        with client.AnalysisClient.connect(self.path, timeout=30) as conn:
+            self.assertTrue(conn.ping())
+            self.assertIn("level02.construct_flow_dependences", conn.call("operations"))
+            result = conn.call("level01.canonical_intersection", _DOMAIN_A, _DOMAIN_B)
+            self.assertEqual(result, "{ [i] : 3 <= i <= 4 }")
+            with self.assertRaises(client.RemoteError) as ctx:
+                conn.call("level01.no_such_function")
+            self.assertEqual(ctx.exception.error_type, "KeyError")
+
+
+class TerminationTest(unittest.TestCase):
+    def test_sigterm_shuts_down_worker_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "isl.sock")
+            process = subprocess.Popen(
+                [sys.executable, "-m", "src.isl_practice.server", "--socket", path, "--workers", "1"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            try:
+                deadline = time.monotonic() + 30
+                while not os.path.exists(path) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                with client.AnalysisClient.connect(path, timeout=30) as conn:
+                    conn.call("level01.canonical_intersection", _DOMAIN_A, _DOMAIN_B)
+
+                process.send_signal(signal.SIGTERM)
+                # ワーカーが残ると継承したパイプが閉じられず、EOF まで読めません。
+                process.communicate(timeout=30)
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+                process.stderr.close()
+            self.assertEqual(process.returncode, 0)
+
+
+class StdioTest(unittest.TestCase):
+    def test_spawned_server(self):
+        with client.AnalysisClient.spawn(backend="serial") as conn:
+            deps = conn.call(
+                "level02.construct_flow_dependences",
+                "{ S[i] : 0 <= i < 4 }",
+                "{ S[i] -> A[i - 1] : 1 <= i <= 3 }",
+                "{ S[i] -> A[i] : 0 <= i < 4 }",
+            )
+            self.assertTrue(isl.UnionMap(deps).is_equal(isl.UnionMap("{ S[i] -> S[i + 1] : 0 <= i < 3 }")))
+            self.assertEqual(conn.call("stats")["requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
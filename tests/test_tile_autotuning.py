@@ -0,0 +1,76 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import schedule_tree
+from src.isl_practice import tile_autotuning as tuning
+from src.isl_practice import workloads
+
+
+class TileAutotuningTest(unittest.TestCase):
+    def setUp(self):
+        self.workload = workloads.gemm(32)
+        self.schedule = schedule_tree.schedule_from_map(
+            self.workload.domain, self.workload.schedule
+        )
+
+    def test_footprint_of_single_tile(self):
+        iterations, footprint = tuning._evaluate_tile(
+            self.workload.domain,
+            str(schedule_tree.node_at(self.schedule, (0,)).band_get_partial_schedule_union_map()),
+            self.workload.reads,
+            (0, 0, 0),
+            (4, 8, 2),
+        )
+        self.assertEqual(iterations, 4 * 8 * 2)
+        self.assertEqual(footprint, {"A": 4 * 2, "B": 2 * 8, "C": 4 * 8})
+
+    def test_autotune_picks_fitting_candidate(self):
+        cache = tuning.CacheCapacity(capacity_bytes=4 * 1024, element_bytes=4, utilization=1.0)
+        choice = tuning.autotune_band_tiling(
+            self.schedule,
+            (0,),
+            self.workload.reads,
+            self.workload.writes,
+            cache,
+            candidate_sizes=(4, 8, 16),
+        )
+
+        self.assertIsInstance(choice.schedule, isl.Schedule)
+        best = choice.table[0]
+        self.assertEqual(best.tile_sizes, choice.tile_sizes)
+        self.assertTrue(best.fits)
+        self.assertLessEqual(best.footprint_bytes, cache.usable_bytes)
+        self.assertTrue(
+            all(best.reuse >= other.reuse for other in choice.table if other.fits),
+            "収まる候補の中で再利用率が最大のものを選んでください",
+        )
+        self.assertEqual(len(choice.table), 4**3, "各次元 3 候補 + ループ長の直積を評価します")
+
+        tiled_band = schedule_tree.node_at(choice.schedule, (0, 0))
+        self.assertEqual(tiled_band.get_type(), isl.schedule_node_type.band)
+        self.assertTrue(choice.schedule.get_map().is_injective())
+
+    def test_autotune_parallel_matches_serial(self):
+        cache = tuning.CacheCapacity(capacity_bytes=2 * 1024)
+        serial = tuning.autotune_band_tiling(
+            self.schedule, (0,), self.workload.reads, self.workload.writes, cache,
+            candidate_sizes=(8, 16),
+        )
+        parallel = tuning.autotune_band_tiling(
+            self.schedule, (0,), self.workload.reads, self.workload.writes, cache,
+            candidate_sizes=(8, 16), backend="process", max_workers=2, chunksize=4,
+        )
+        self.assertEqual(serial.table, parallel.table)
+
+    def test_autotune_rejects_non_band(self):
+        cache = tuning.CacheCapacity(capacity_bytes=1024)
+        self.assertIsNone(
+            tuning.autotune_band_tiling(
+                self.schedule, (), self.workload.reads, self.workload.writes, cache
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import islpy as isl
+import numpy as np
+
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import uniform_dependences as uni
+
+
+class UniformDependencesTest(unittest.TestCase):
+    def test_extract_uniform_dependences(self):
+        dependences = isl.UnionMap(
+            "{ S[i, j] -> S[i + 1, j - 2] : 0 <= i < 4 and 2 <= j < 8; "
+            "S[i, j] -> S[i, j + 1] : 0 <= i < 4 and 0 <= j < 7; "
+            "S[i, j] -> S[i', j] : 0 <= i < i' < 4 and 0 <= j < 8; "
+            "T[k] -> T[k + 3] : 0 <= k < 5 }"
+        )
+
+        analysis = uni.extract_uniform_dependences(dependences)
+
+        self.assertEqual(analysis.distances.dtype, np.int64)
+        rows = {
+            (name, tuple(row))
+            for name, row in zip(analysis.statements, analysis.distances.tolist())
+        }
+        self.assertEqual(rows, {("S", (1, -2)), ("S", (0, 1)), ("T", (3, 0))})
+        self.assertEqual(len(analysis.non_uniform), 1, "距離が可変の依存は別扱いにしてください")
+
+    def test_parametric_and_cross_statement_are_non_uniform(self):
+        dependences = isl.UnionMap(
+            "[N] -> { S[i] -> S[i + N] : 0 <= i < 4; S[i] -> T[i + 1] : 0 <= i < 4 }"
+        )
+        analysis = uni.extract_uniform_dependences(dependences)
+        self.assertEqual(analysis.distances.shape, (0, 0))
+        self.assertEqual(len(analysis.non_uniform), 2)
+
+    def test_lex_positive_rows(self):
+        vectors = np.array([[0, 1], [1, -5], [0, 0], [-1, 3], [0, -1]], dtype=np.int64)
+        self.assertEqual(
+            uni.lex_positive_rows(vectors).tolist(),
+            [True, True, False, False, False],
+        )
+
+    def test_uniform_legality_matches_isl(self):
+        dependences = isl.UnionMap(
+            "{ S[i, j] -> S[i + 1, j - 1] : 0 <= i < 3 and 1 <= j < 4; "
+            "S[i, j] -> S[i, j + 1] : 0 <= i < 4 and 0 <= j < 3 }"
+        )
+        analysis = uni.extract_uniform_dependences(dependences)
+        identity = np.eye(2, dtype=np.int64)
+        interchange = np.array([[0, 1], [1, 0]], dtype=np.int64)
+        skewed_interchange = np.array([[1, 1], [1, 0]], dtype=np.int64)
+
+        for transform in (identity, interchange, skewed_interchange):
+            with self.subTest(transform=transform.tolist()):
+                expected = lvl02.validate_schedule_legality(
+                    dependences,
+                    uni.affine_schedule_map({"S": transform}),
+                )
+                self.assertEqual(
+                    uni.validate_affine_schedule_legality(analysis, transform),
+                    expected,
+                )
+
+    def test_non_uniform_fallback_uses_isl(self):
+        dependences = isl.UnionMap(
+            "{ S[i] -> S[i + 1] : 0 <= i < 3; S[i] -> T[j] : 0 <= i < j < 4 }"
+        )
+        analysis = uni.extract_uniform_dependences(dependences)
+        self.assertEqual(len(analysis.non_uniform), 1)
+
+        transforms = {
+            "S": np.array([[1], [0]], dtype=np.int64),
+            "T": np.array([[-1], [0]], dtype=np.int64),
+        }
+        self.assertFalse(
+            uni.validate_affine_schedule_legality(analysis, transforms),
+            "S→T 依存の向きを逆転させるスケジュールは違法と判定してください",
+        )
+        transforms["T"] = np.array([[1], [0]], dtype=np.int64)
+        self.assertTrue(uni.validate_affine_schedule_legality(analysis, transforms))
+        transforms["S"] = np.array([[-1], [0]], dtype=np.int64)
+        self.assertFalse(
+            uni.validate_affine_schedule_legality(analysis, transforms),
+            "一様依存の違反は行列積だけで検出してください",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
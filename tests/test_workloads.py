@@ -0,0 +1,59 @@
+import unittest
+
+import islpy as isl
+
+from src.isl_practice import level02_dependence_analysis as lvl02
+from src.isl_practice import workloads
+
+
+class WorkloadsTest(unittest.TestCase):
+    def test_generated_workloads_parse(self):
+        for workload in workloads.generate_suite(sizes=(8,), statement_counts=(3,)):
+            with self.subTest(workload=workload.label):
+                domain = isl.UnionSet(workload.domain)
+                self.assertFalse(domain.is_empty())
+                isl.Set(workload.primary_domain)
+                for relation in (workload.reads, workload.writes, workload.schedule):
+                    self.assertTrue(
+                        isl.UnionMap(relation).domain().is_subset(domain),
+                        "アクセス・スケジュールは反復領域内に収めてください",
+                    )
+
+    def test_gemm_dependences_are_legal_for_identity_schedule(self):
+        workload = workloads.gemm(4)
+        deps = lvl02.construct_flow_dependences(
+            workload.domain,
+            workload.reads,
+            workload.writes,
+            schedule=workload.schedule,
+        )
+        self.assertTrue(
+            deps.is_equal(
+                isl.UnionMap(
+                    "{ S[i, j, k] -> S[i, j, k + 1] : 0 <= i < 4 and 0 <= j < 4 and 0 <= k < 3 }"
+                )
+            )
+        )
+        self.assertTrue(lvl02.validate_schedule_legality(deps, workload.schedule))
+
+    def test_jacobi_reads_five_points(self):
+        workload = workloads.jacobi_2d(size=6, steps=1)
+        reads = isl.UnionMap(workload.reads).intersect_domain(
+            isl.UnionSet("{ S[0, 2, 2] }")
+        )
+        self.assertEqual(reads.range().as_set().count_val().to_python(), 5)
+
+    def test_pipeline_scales_statement_count(self):
+        workload = workloads.pipeline(5, 10)
+        self.assertEqual(workload.label, "pipeline[statements=5,size=10]")
+        self.assertEqual(isl.UnionSet(workload.domain).n_set(), 5)
+
+    def test_invalid_sizes_raise(self):
+        with self.assertRaises(ValueError):
+            workloads.pipeline(0, 4)
+        with self.assertRaises(ValueError):
+            workloads.conv2d_nchw(1, 1, 1, 2, 2, kernel=3)
+
+
+if __name__ == "__main__":
+    unittest.main()